@@ -0,0 +1,98 @@
+import asyncio
+import random
+import time
+
+from loadGenerator import arrival_offsets, CONSTANT, _worker_id, _intended_start, _client_rng
+
+
+async def run_async_closed_loop(request, clients, duration=None, iterations=None, think_time=0.0, seed=None, first_client_id=0,
+                                stop=None):
+    """
+    Simulates many clients on one event loop, each awaiting request back to back.
+
+    The asyncio counterpart of loadGenerator.run_closed_loop: a client is a coroutine
+    instead of a thread, so several thousand of them fit on one client VM. How many
+    requests are actually in flight at the database is bounded by the connection pool
+    (or the process limit for shell commands) that request awaits.
+
+    :param request: Coroutine function without arguments, e.g. a lambda returning execute_query_async(...).
+    :param clients: Number of simulated clients.
+    :param duration: Wall clock seconds to run for, None to only limit by iterations.
+    :param iterations: Requests per client, None to only limit by duration.
+    :param think_time: Seconds a client pauses after each request.
+    :param seed: Base seed, the client with id i uses seed + i (see loadGenerator.worker_rng). None for unseeded generators.
+    :param first_client_id: Id of the first client, the others are numbered consecutively.
+    :param stop: Optional threading.Event that ends the run before the duration passed.
+    :return: List of (client_id, started, finished) wall clock timestamps, one per request.
+    """
+    if duration is None and iterations is None:
+        raise ValueError("A closed-loop run needs a duration, a number of iterations or both.")
+
+    records = []
+    loop = asyncio.get_running_loop()
+    deadline = None if duration is None else loop.time() + duration
+
+    async def client(client_id):
+        # every client runs as its own task, so this is what loadGenerator.current_worker_id returns in it
+        _worker_id.set(client_id)
+        _client_rng.set(random.Random(None if seed is None else seed + client_id))
+        count = 0
+        while iterations is None or count < iterations:
+            if deadline is not None and loop.time() >= deadline:
+                break
+            if stop is not None and stop.is_set():
+                break
+            started = time.time()
+            try:
+                await request()
+            except Exception as error:
+                print(f"Error in async client {client_id}:", error)
+            records.append((client_id, started, time.time()))
+            count += 1
+            if think_time:
+                await asyncio.sleep(think_time)
+
+    await asyncio.gather(*(client(i) for i in range(first_client_id, first_client_id + clients)))
+    return records
+
+
+async def run_async_open_loop(request, rate, duration, arrival=CONSTANT, max_in_flight=10000, seed=None, stop=None):
+    """
+    Starts request at a target rate for a fixed duration, independently of completion.
+
+    The asyncio counterpart of loadGenerator.run_open_loop. Every arrival becomes its own
+    task; at most max_in_flight of them run at the same time, the rest wait on a semaphore.
+    The run ends early once the optional threading.Event stop is set.
+
+    :return: List of (scheduled, started, finished) wall clock timestamps, one per request.
+    """
+    records = []
+    tasks = set()
+    semaphore = asyncio.Semaphore(max_in_flight)
+
+    async def timed_request(scheduled):
+        _intended_start.set(scheduled)
+        async with semaphore:
+            started = time.time()
+            try:
+                await request()
+            except Exception as error:
+                print("Error in async open-loop request:", error)
+            records.append((scheduled, started, time.time()))
+
+    loop = asyncio.get_running_loop()
+    run_start = loop.time()
+    run_start_wall = time.time()
+    for offset in arrival_offsets(rate, duration, arrival, random.Random(seed)):
+        delay = run_start + offset - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if stop is not None and stop.is_set():
+            break
+        task = asyncio.create_task(timed_request(run_start_wall + offset))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+    return records
+
@@ -0,0 +1,481 @@
+import asyncio
+import functools
+import glob
+import os
+import threading
+from datetime import datetime, timedelta
+
+from loadGenerator import run_open_loop, summarize_open_loop, run_closed_loop, summarize_closed_loop, worker_rng, ARRIVAL_PROCESSES, CONSTANT
+from asyncDriver import run_async_closed_loop, run_async_open_loop
+from queryRegistry import expect_rows
+from parameterCorpus import ParameterCorpus, draw_position, draw_seconds
+from densityGrid import DensityGrid
+from temporalHistogram import TemporalHistogram, DEFAULT_FILE, as_datetime
+from parameterBatch import ParameterBatches, DEFAULT_BLOCK_SIZE, DATETIME, ISO
+from engineAdapter import run_query, run_query_async
+from latencyHistogram import save_run, HistogramSet
+from warmup import start_warmup, finish_warmup, run_limits
+from workloadSpec import workload_options, workload_runs, choose_query
+from processDriver import split_evenly
+
+MODES = ("batch", "open_loop", "closed_loop")
+BACKENDS = ("threads", "asyncio")
+
+
+def add_load_arguments(parser, rate=10.0, max_workers=64, backend_help=None):
+    """
+    Adds the options of the execution modes, the warm-up and the coordinated omission
+    correction every driver shares. --backend is only offered with a backend_help, the
+    drivers without an asyncio backend run their clients as threads.
+    """
+    parser.add_argument("--mode", choices=MODES, default="batch",
+                        help="'batch' runs each query type once per thread, 'open_loop' sends queries at a fixed rate, "
+                             "'closed_loop' keeps workers sending queries back to back")
+    parser.add_argument("--rate", type=float, default=rate, help="Target queries per second per query type (open_loop)")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds each query type is run for (open_loop, closed_loop)")
+    parser.add_argument("--arrival", choices=ARRIVAL_PROCESSES, default=CONSTANT,
+                        help="Spacing of the requests, evenly spaced or Poisson distributed (open_loop)")
+    parser.add_argument("--max-workers", type=int, default=max_workers, help="Maximum number of queries in flight (open_loop)")
+    if backend_help:
+        parser.add_argument("--backend", choices=BACKENDS, default="threads", help=backend_help)
+        parser.add_argument("--workers", type=int, default=None,
+                            help="Number of long-lived workers or simulated asyncio clients (closed_loop), "
+                                 "defaults to the thread count of the query type")
+    else:
+        parser.set_defaults(backend="threads")
+        parser.add_argument("--workers", type=int, default=None,
+                            help="Number of long-lived workers (closed_loop), defaults to the thread count of the query type")
+    parser.add_argument("--iterations", type=int, default=None,
+                        help="Queries per worker instead of a duration (closed_loop)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Seconds a worker pauses between queries (closed_loop)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Seed for the Poisson arrival process and the per-worker query parameters (closed_loop)")
+    parser.add_argument("--warmup", type=float, default=0.0,
+                        help="Seconds of warm-up per query type, its queries are tagged and excluded (open_loop, closed_loop)")
+    parser.add_argument("--steady-state", action="store_true",
+                        help="After --warmup, keep warming up until latency and throughput are stable")
+    parser.add_argument("--steady-state-window", type=float, default=5.0,
+                        help="Seconds per window compared by the steady-state detector, three windows have to agree")
+    parser.add_argument("--steady-state-tolerance", type=float, default=0.1,
+                        help="Maximum coefficient of variation of the window latencies and throughputs")
+    parser.add_argument("--max-warmup", type=float, default=300.0,
+                        help="Seconds after which measuring begins even without a steady state")
+    parser.add_argument("--correct-omission", action="store_true",
+                        help="Additionally report latencies corrected for coordinated omission (closed_loop)")
+    parser.add_argument("--expected-interval", type=float, default=None,
+                        help="Seconds between two requests of a worker assumed by the correction, "
+                             "defaults to the median latency plus the think time (closed_loop)")
+    parser.add_argument("--run-id", default=None,
+                        help="Id written with every measurement, defaults to the start time plus a random suffix")
+
+
+def add_parameter_arguments(parser, selective_query_types=None, data_files=None):
+    """
+    Adds --corpus and, for query types that draw their parameters through a BenchmarkDriver,
+    the options shaping them: --selectivity for the spatial selective_query_types (e.g.
+    "surrounding and bounding_box"), time windows from a temporal histogram of the
+    data_files and --batch-parameters. Without selective_query_types only --corpus is
+    offered and the other options keep their defaults.
+    """
+    parser.add_argument("--corpus", default=None,
+                        help="Replay the query parameters of a corpus written by benchmark/common/parameterCorpus.py")
+    if not selective_query_types:
+        parser.set_defaults(density_grid=None, selectivity=None, time_histogram=None, data_files=data_files,
+                            window_rows=None, recent_skew=None, batch_parameters=False, batch_size=DEFAULT_BLOCK_SIZE)
+        return
+    parser.add_argument("--density-grid", default=None,
+                        help="Density grid written by benchmark/common/densityGrid.py, needed for --selectivity")
+    parser.add_argument("--selectivity", type=int, default=None,
+                        help=f"Size {selective_query_types} to return about this many points, "
+                             "e.g. 10, 1000 or 100000, and log the expected rows with every query")
+    parser.add_argument("--time-histogram", nargs="?", default=None,
+                        const=None if data_files is None else os.path.join(os.path.dirname(data_files), DEFAULT_FILE),
+                        help="Temporal histogram (benchmark/common/temporalHistogram.py) that gives the period and draws the "
+                             "time windows where the data is, built from --data-files and cached next to them if it is "
+                             "missing or outdated")
+    parser.add_argument("--data-files", default=data_files, help="Prepared point files the temporal histogram is built from")
+    parser.add_argument("--window-rows", type=int, default=None,
+                        help="Size the time windows to contain about this many points instead of the interval length")
+    parser.add_argument("--recent-skew", type=float, default=None,
+                        help="Let the time windows end on average this many hours before the end of the data, "
+                             "like realtime queries for the latest data")
+    parser.add_argument("--batch-parameters", action="store_true",
+                        help="Generate positions, ids and time windows in blocks with NumPy in a background thread, "
+                             "for high request rates (not with --corpus)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BLOCK_SIZE,
+                        help="Parameters generated per block (--batch-parameters)")
+
+
+@functools.lru_cache(maxsize=16)
+def parse_period(period_start, period_end):
+    """The period as datetime objects, parsed once instead of for every time window."""
+    return datetime.strptime(period_start, "%Y-%m-%d %H:%M:%S"), datetime.strptime(period_end, "%Y-%m-%d %H:%M:%S")
+
+
+def random_period_window(rng, period_start, period_end, length):
+    """
+    A random start and end time of length within the period ('YYYY-MM-DD HH:MM:SS' strings)
+    as datetime objects.
+    """
+    period_start_dt, period_end_dt = parse_period(period_start, period_end)
+    if length > period_end_dt - period_start_dt:
+        raise ValueError("The specified duration exceeds the total period duration.")
+    latest_start = period_end_dt - length
+    random_start = period_start_dt + timedelta(seconds=draw_seconds(rng, int((latest_start - period_start_dt).total_seconds())))
+    return random_start, random_start + length
+
+
+class BenchmarkDriver:
+    """
+    The part of a benchmark driver that does not depend on its engine: draws the parameters
+    of the query types and runs them in the execution mode of the command line or the
+    workload spec, with warm-up (see warmup.py), summaries and the coordinated omission
+    correction. A driver keeps its query types and engine-specific options, creates one
+    BenchmarkDriver for its QueryRegistry and sets its adapter and record_writer before
+    running workloads:
+
+        QUERY_TYPES = QueryRegistry()
+        driver = BenchmarkDriver(QUERY_TYPES, "2021-03-31 17:22:20", "2023-05-31 18:33:25", timedelta(hours=2))
+
+        @QUERY_TYPES.register("spatial_surrounding")
+        def spatial_surrounding(limit):
+            poslong, poslat = driver.position()
+            ...
+
+    :param registry: QueryRegistry of the query types.
+    :param period_start: Start of the dataset time bounds of the time windows, 'YYYY-MM-DD HH:MM:SS'.
+    :param period_end: End of the dataset time bounds, 'YYYY-MM-DD HH:MM:SS'.
+    :param interval: Default length of a time window as a timedelta, only query types that
+                     draw time windows need the period and interval.
+    :param execute: Optional function(query_type, limit) that runs a request instead of
+                    engineAdapter.run_query, for query types the adapter does not run.
+    """
+
+    def __init__(self, registry, period_start=None, period_end=None, interval=None, execute=None):
+        self.registry = registry
+        self.period_start = period_start
+        self.period_end = period_end
+        self.interval = interval
+        self.execute = execute
+        # Set by the driver: parsed command line options (of the current workload), engine
+        # adapter, record writer and, for --backend asyncio with a long-lived connection, the
+        # event loop the adapter is connected on (None connects the adapter for every run)
+        self.options = None
+        self.adapter = None
+        self.record_writer = None
+        self.event_loop = None
+        # Closed-loop histograms corrected for coordinated omission (--correct-omission)
+        self.corrected_histograms = HistogramSet()
+        # Points per cell of the dataset (--density-grid), sizes the spatial queries for --selectivity
+        self.density_grid = None
+        # Points per hour of the dataset (--time-histogram), gives the period and draws the time windows
+        self.temporal_histogram = None
+        # Positions, ids and time windows generated in blocks in the background (--batch-parameters)
+        self.parameter_batches = None
+
+    ############################### setup ###############################
+
+    def configure(self, parser, options, workload_spec=None):
+        """
+        Sets up the query parameters of the main driver process from its command line options
+        (see add_parameter_arguments), invalid combinations end with parser.error. With a
+        workload spec its query types are checked against the registry, its settings are
+        validated like the options and its period sets the time bounds.
+        """
+        workloads = [] if workload_spec is None else workload_spec.workloads
+        query_types = [query.query_type for workload in workloads for query in workload.queries]
+        self.registry.check(query_types)
+        if options.corpus and options.batch_parameters:
+            parser.error("--batch-parameters draws new parameters, it cannot be combined with --corpus")
+        if options.selectivity or any("selectivity" in workload.settings for workload in workloads):
+            if not options.density_grid:
+                parser.error("--selectivity needs a --density-grid")
+        for setting in ("window_rows", "recent_skew"):
+            if getattr(options, setting) or any(setting in workload.settings for workload in workloads):
+                if not options.time_histogram:
+                    parser.error(f"--{setting.replace('_', '-')} needs a --time-histogram")
+
+        self.options = options
+        if options.corpus:
+            self.registry.replay(ParameterCorpus(options.corpus))
+            self.registry.corpus.load(query_types)
+        if options.time_histogram:
+            self.temporal_histogram = TemporalHistogram.cached(options.time_histogram, sorted(glob.glob(options.data_files)))
+            print("Period of the time queries from the temporal histogram: {} to {}".format(*self.temporal_histogram.extent()))
+        options.period = None if workload_spec is None else workload_spec.period
+        self._load(options, options.seed)
+
+    def configure_shard(self, options, shard_index, processes):
+        """
+        configure for one of several driver processes (see processDriver.py): the shard
+        replays its share of the corpus and seeds its parameter batches of its own.
+        """
+        self.options = options
+        if options.corpus:
+            self.registry.replay(ParameterCorpus(options.corpus, shard_index, processes))
+        if options.time_histogram:
+            self.temporal_histogram = TemporalHistogram.load(options.time_histogram)
+        self._load(options, None if options.seed is None else options.seed + shard_index)
+
+    def _load(self, options, seed):
+        if options.density_grid:
+            self.density_grid = DensityGrid.load(options.density_grid)
+        if options.batch_parameters:
+            self.parameter_batches = ParameterBatches(options.batch_size, seed)
+        self.set_period(options.period)
+
+    def set_period(self, period):
+        """
+        Sets the dataset time bounds of the time windows from the period of a workload spec,
+        with --time-histogram the time extent of the data replaces its start and end.
+        """
+        if period is not None:
+            self.period_start = period.start or self.period_start
+            self.period_end = period.end or self.period_end
+            self.interval = period.interval or self.interval
+        if self.temporal_histogram is not None:
+            self.period_start, self.period_end = self.temporal_histogram.extent()
+
+    def close(self):
+        """Stops the parameter batches, returns the blocks generated on the request path or None without --batch-parameters."""
+        if self.parameter_batches is None:
+            return None
+        self.parameter_batches.close()
+        return self.parameter_batches.misses
+
+    ############################### query parameters ###############################
+
+    def position(self):
+        """
+        A random position in Berlin as (longitude, latitude), replayed from the parameter
+        corpus with --corpus, taken from the batches with --batch-parameters.
+        """
+        if self.parameter_batches is not None:
+            return self.parameter_batches.position()
+        return draw_position(worker_rng())
+
+    def integer(self, low, high):
+        """rng.randint of the worker, taken from the batches with --batch-parameters."""
+        if self.parameter_batches is not None:
+            return self.parameter_batches.integer(low, high)
+        return worker_rng().randint(low, high)
+
+    def uniform(self, low, high):
+        """rng.uniform of the worker, taken from the batches with --batch-parameters."""
+        if self.parameter_batches is not None:
+            return self.parameter_batches.uniform(low, high)
+        return worker_rng().uniform(low, high)
+
+    def selective_shape(self, shape):
+        """
+        Centre and size of a spatial query that returns about --selectivity points, drawn from
+        the density grid by its surrounding (radius in meters) or bounding_box (half edge in
+        degrees) generator. The expected number of rows is logged with the request. None
+        without --selectivity, the query type then keeps its own size.
+        """
+        if self.density_grid is None or not self.options.selectivity:
+            return None
+        poslong, poslat, size, expected = getattr(self.density_grid, shape)(worker_rng(), self.options.selectivity)
+        expect_rows(round(expected))
+        return poslong, poslat, size
+
+    def time_window(self, length=None, expect=False, style=DATETIME):
+        """
+        A random time window of length (default: the interval) within the period, as datetime
+        objects, or ISO 8601 literals with style ISO. With --batch-parameters it is taken from
+        the batches.
+
+        With --time-histogram the window is drawn from the temporal histogram instead: at a random
+        quantile of the data, with --window-rows sized to about that many points if it has the
+        default length and with --recent-skew ending shortly before the end of the data. With
+        expect the points it contains are logged as the expected rows of the query.
+        """
+        length = length or self.interval
+        if self.temporal_histogram is not None:
+            rows = self.options.window_rows if length == self.interval else None
+            recent = self.options.recent_skew * 3600 if self.options.recent_skew else None
+            start, end, expected = self.temporal_histogram.random_window(worker_rng(), rows, length.total_seconds(), recent)
+            if expect:
+                expect_rows(round(expected))
+            window = as_datetime(start), as_datetime(end)
+        elif self.parameter_batches is not None:
+            return self.parameter_batches.time_window(self.period_start, self.period_end, length, style)
+        else:
+            window = random_period_window(worker_rng(), self.period_start, self.period_end, length)
+        if style == ISO:
+            return tuple(value.strftime("%Y-%m-%dT%H:%M:%SZ") for value in window)
+        return window
+
+    ############################### execution ###############################
+
+    def execute_workload_query(self, queries):
+        """
+        Executes one query of a workload, its only query type or one drawn by weight from a mix,
+        through the engine adapter (see engineAdapter.run_query), which logs it to the record writer.
+        """
+        entry = choose_query(queries, worker_rng())
+        if self.execute is not None:
+            self.execute(entry.query_type, entry.limit)
+        else:
+            run_query(self.adapter, self.registry, entry.query_type, entry.limit, self.record_writer)
+
+    async def execute_workload_query_async(self, queries):
+        """asyncio variant of execute_workload_query."""
+        entry = choose_query(queries, worker_rng())
+        await run_query_async(self.adapter, self.registry, entry.query_type, entry.limit, self.record_writer)
+
+    def run_threads(self, num_threads, queries):
+        threads = []
+        for i in range(num_threads):
+            thread = threading.Thread(target=self.execute_workload_query, args=(queries,))
+            thread.start()
+            threads.append(thread)
+
+        for thread in threads:
+            thread.join()
+
+    def run_workloads(self, workload_spec, base_options, run_workload=None):
+        """
+        Runs every workload of the spec with its own settings (see workloadSpec.workload_options),
+        its query types one after another or as a mix, with run_workload (default: self.run_workload).
+        """
+        for workload in workload_spec.workloads:
+            self.options = workload_options(base_options, workload)
+            for label, queries, num_threads in workload_runs(workload):
+                (run_workload or self.run_workload)(num_threads, label, queries)
+
+    def run_workload(self, num_threads, label, queries):
+        """
+        Runs one query type, or a mix of query types drawn by weight (see workloadSpec.py), in
+        the execution mode chosen on the command line or in the workload spec. Summaries and the
+        warm-up refer to the run by label, the measurements keep their query types.
+
+        In "batch" mode num_threads threads each execute the query once (run_threads). In
+        "open_loop" mode queries are sent at --rate per second for --duration seconds,
+        regardless of how long earlier queries take. In "closed_loop" mode --workers (default
+        num_threads) long-lived workers each run the query back to back for --duration seconds
+        or --iterations queries. With --backend asyncio the same modes run as coroutines on one
+        event loop (see run_load_async).
+        """
+        self.summarize(label, queries, self.run_load(num_threads, label, queries), self.options.workers or num_threads)
+
+    def run_load(self, num_threads, label, queries, workers=None, first_worker_id=0, rate=None, seed=None):
+        """
+        Runs one query type or mix in this process, see run_workload. With a warm-up the run lasts
+        until --duration seconds were measured after it. A driver process of several (see
+        processDriver.py) passes its share of the workers and the rate, its first worker id and seed.
+
+        :return: List of (worker_id, started, finished) records in closed_loop mode,
+                 (scheduled, started, finished) in open_loop mode and an empty list in batch mode,
+                 without the warm-up.
+        """
+        options = self.options
+        workers = (options.workers or num_threads) if workers is None else workers
+        rate = options.rate if rate is None else rate
+        seed = options.seed if seed is None else seed
+        warmup = start_warmup(options, self.record_writer, [entry.query_type for entry in queries])
+        duration, stop = run_limits(options, warmup)
+        if options.backend == "asyncio":
+            run = self.run_load_async(num_threads, queries, workers, first_worker_id, rate, seed, duration, stop)
+            if self.event_loop is not None:
+                records = self.event_loop.run_until_complete(run)
+            else:
+                records = asyncio.run(self._connected(run))
+        elif options.mode == "closed_loop":
+            records = run_closed_loop(
+                lambda: self.execute_workload_query(queries),
+                workers,
+                duration=None if options.iterations else duration,
+                iterations=options.iterations,
+                think_time=options.think_time,
+                worker_context=self.adapter.worker_context,
+                seed=seed,
+                first_worker_id=first_worker_id,
+                stop=stop
+            )
+        elif options.mode == "open_loop":
+            records = run_open_loop(
+                lambda: self.execute_workload_query(queries),
+                rate, duration, options.arrival, options.max_workers, seed, stop
+            )
+        else:
+            self.run_threads(num_threads, queries)
+            records = []
+        return finish_warmup(self.record_writer, label, warmup, records)
+
+    async def _connected(self, run):
+        """Awaits run with the asyncio connections of the adapter, which belong to the event loop of one run."""
+        await self.adapter.connect_async()
+        try:
+            return await run
+        finally:
+            await self.adapter.close_async()
+
+    async def run_load_async(self, num_threads, queries, workers, first_worker_id, rate, seed, duration, stop):
+        """
+        asyncio counterpart of run_load. Batch mode lets num_threads simulated clients
+        send one query each, closed_loop runs workers simulated clients back to back.
+        """
+        options = self.options
+        request = lambda: self.execute_workload_query_async(queries)
+        if options.mode == "open_loop":
+            return await run_async_open_loop(request, rate, duration, options.arrival, options.max_workers, seed, stop)
+        if options.mode == "closed_loop":
+            return await run_async_closed_loop(
+                request,
+                workers,
+                duration=None if options.iterations else duration,
+                iterations=options.iterations,
+                think_time=options.think_time,
+                seed=seed,
+                first_client_id=first_worker_id,
+                stop=stop
+            )
+        await run_async_closed_loop(request, num_threads, iterations=1)
+        return []
+
+    def summarize(self, label, queries, records, workers):
+        """
+        Prints the summary of an open- or closed-loop run from its records and, with
+        --correct-omission, keeps the corrected histograms of its closed-loop query types.
+        """
+        options = self.options
+        if options.mode == "closed_loop":
+            summarize_closed_loop(label, records, workers)
+        elif options.mode == "open_loop":
+            summarize_open_loop(label, records, options.rate, options.duration)
+        if options.mode == "closed_loop" and options.correct_omission:
+            for entry in queries:
+                self.corrected_histograms.histograms[entry.query_type] = self.record_writer.corrected_histogram(
+                    entry.query_type, options.expected_interval, options.think_time
+                )
+
+    def closed_loop_workers(self, workload_spec, processes=1):
+        """
+        Most closed-loop worker threads one of processes driver processes runs at the same
+        time. Every pooled worker holds its connection for its whole run, so the pool needs at
+        least this many, otherwise the extra workers wait for a connection until the others finished.
+        """
+        largest = 0
+        for workload in workload_spec.workloads:
+            settings = workload_options(self.options, workload)
+            if settings.mode != "closed_loop" or settings.backend != "threads":
+                continue
+            for _, _, num_threads in workload_runs(workload):
+                largest = max(largest, split_evenly(settings.workers or num_threads, processes, 0))
+        return largest
+
+    def save_histograms(self, histograms_file, corrected_file=None):
+        """
+        Closes the record writer, prints the latency percentiles of the run and saves its
+        histograms to histograms_file, with --correct-omission also the corrected ones (to
+        corrected_file, default histograms_file) under the run id plus "-corrected".
+        """
+        record_writer = self.record_writer
+        record_writer.close()
+        print(record_writer.histograms.summary())
+        save_run(histograms_file, record_writer.run_id, record_writer.histograms)
+        if self.options.correct_omission:
+            print("Latencies corrected for coordinated omission:")
+            print(self.corrected_histograms.summary())
+            save_run(corrected_file or histograms_file, record_writer.run_id + "-corrected", self.corrected_histograms)
@@ -0,0 +1,152 @@
+import threading
+import queue
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import extensions
+
+# Connection modes
+POOLED = "pooled"
+PER_QUERY = "per_query"
+CONNECTION_MODES = (POOLED, PER_QUERY)
+
+
+class ConnectionPool:
+    """
+    Hands out PostgreSQL connections (MobilityDB/PostGIS) to benchmark workers.
+
+    In "pooled" mode at most pool_size connections are opened lazily and kept open for the
+    whole run. A worker that already holds a connection gets the same one back when it asks
+    again, so a worker that wraps its loop in connection() keeps one persistent connection.
+    In "per_query" mode every checkout opens a fresh connection and closes it afterwards,
+    which is what the benchmark scripts did before and includes TCP + auth + backend fork.
+
+    :param connect_kwargs: Keyword arguments passed to psycopg2.connect.
+    :param pool_size: Maximum number of connections checked out at the same time (pooled mode).
+    :param mode: Either "pooled" or "per_query".
+    :param reconnect: Replace connections lost to an error instead of failing the checkout.
+    """
+
+    def __init__(self, connect_kwargs, pool_size=4, mode=POOLED, reconnect=True):
+        if mode not in CONNECTION_MODES:
+            raise ValueError(f"Unknown connection mode '{mode}', expected one of {CONNECTION_MODES}.")
+        if pool_size < 1:
+            raise ValueError("The pool size has to be at least 1.")
+
+        self.connect_kwargs = connect_kwargs
+        self.pool_size = pool_size
+        self.mode = mode
+        self.reconnect = reconnect
+
+        self.connections_opened = 0
+        self.reconnects = 0
+
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self):
+        start = time.time()
+        connection = psycopg2.connect(**self.connect_kwargs)
+        self._local.connect_duration += time.time() - start
+        with self._lock:
+            self.connections_opened += 1
+        return connection
+
+    def _reopen(self, connection):
+        """Replaces a connection that was closed by an error (or by the server)."""
+        if not self.reconnect:
+            raise psycopg2.InterfaceError("Connection was lost and reconnect is disabled.")
+        self._close_quietly(connection)
+        with self._lock:
+            self.reconnects += 1
+        return self._connect()
+
+    def _checkout(self):
+        if self.mode == PER_QUERY:
+            return self._connect()
+
+        self._slots.acquire()
+        try:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if connection.closed:
+                connection = self._reopen(connection)
+            return connection
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _checkin(self, connection):
+        try:
+            if self.mode == PER_QUERY or self._closed or connection.closed:
+                self._close_quietly(connection)
+                return
+            # end the read transaction so the pooled connection does not sit idle in transaction
+            if connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    connection.rollback()
+                except psycopg2.Error:
+                    self._close_quietly(connection)
+                    return
+            self._idle.put(connection)
+        finally:
+            if self.mode == POOLED:
+                self._slots.release()
+
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager yielding a connection for the calling thread.
+
+        Nested calls from the same thread reuse the connection of the outermost call. On a
+        database error the open transaction is rolled back, and a connection that was lost is
+        replaced on the next checkout if reconnect is enabled.
+        """
+        owner = getattr(self._local, "connection", None) is None
+        if owner:
+            self._local.connect_duration = 0.0
+            self._local.connection = self._checkout()
+        elif self._local.connection.closed:
+            self._local.connection = self._reopen(self._local.connection)
+        connection = self._local.connection
+
+        try:
+            yield connection
+        except psycopg2.Error:
+            if not connection.closed:
+                try:
+                    connection.rollback()
+                except psycopg2.Error:
+                    self._close_quietly(connection)
+            raise
+        finally:
+            if owner:
+                connection = self._local.connection
+                self._local.connection = None
+                self._checkin(connection)
+
+    def last_connect_duration(self):
+        """Seconds the calling thread spent opening connections for its current/last checkout."""
+        return getattr(self._local, "connect_duration", 0.0)
+
+    def close_all(self):
+        """Closes all idle connections; connections still in use are closed when returned."""
+        self._closed = True
+        while True:
+            try:
+                self._close_quietly(self._idle.get_nowait())
+            except queue.Empty:
+                break
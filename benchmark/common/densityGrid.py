@@ -0,0 +1,222 @@
+import argparse
+import bisect
+import csv
+import glob
+import json
+import math
+
+from parameterCorpus import BERLIN
+
+GRID_VERSION = 1
+# Edge length of a cell in degrees, about 140 m x 220 m in Berlin
+DEFAULT_CELL_SIZE = 0.002
+# Columns of the latitude and longitude in the prepared point files (merged*.csv)
+LATITUDE_COLUMN = 2
+LONGITUDE_COLUMN = 3
+# Meters per degree of latitude
+METERS_PER_DEGREE = 111320.0
+# Bounds of the radius and half box size searched for a target number of points
+MIN_RADIUS = 1.0
+MAX_RADIUS = 50000.0
+SEARCH_STEPS = 40
+# Horizontal strips a circle is approximated by
+CIRCLE_STRIPS = 16
+# Centres drawn until one reaches the target within this factor
+TARGET_TOLERANCE = 2.0
+CENTRE_ATTEMPTS = 20
+
+
+class DensityGrid:
+    """
+    Number of data points per cell of a regular grid over the area of the dataset.
+
+    Built once from the prepared point files (merged*.csv, see data/prepareCyclingData.py)
+    and saved as JSON, the grid estimates how many points a spatial query returns without
+    asking the database. Points are assumed to be spread evenly within a cell: a summed-area
+    table gives the points in any box in constant time, a circle is counted as a stack of
+    CIRCLE_STRIPS boxes.
+
+    The generators (surrounding, bounding_box) draw query centres weighted by density, so
+    they land where the data is, and size the query to return about a target number of
+    points, which is returned with it as the expected number of rows.
+
+    :param bounds: (min longitude, min latitude, max longitude, max latitude) of the grid.
+    :param cell_size: Edge length of a cell in degrees.
+    :param counts: Points per cell, one list per row from south to north.
+    """
+
+    def __init__(self, bounds, cell_size, counts):
+        self.bounds = tuple(bounds)
+        self.cell_size = cell_size
+        self.counts = counts
+        self.rows = len(counts)
+        self.columns = len(counts[0]) if counts else 0
+        self.points = sum(sum(row) for row in counts)
+        self._summed = self._summed_area_table()
+        # cumulative counts of the cells in row-major order, to draw cells weighted by density
+        self._cumulative = []
+        total = 0
+        for row in counts:
+            for count in row:
+                total += count
+                self._cumulative.append(total)
+
+    @classmethod
+    def empty(cls, bounds=BERLIN, cell_size=DEFAULT_CELL_SIZE):
+        columns = math.ceil((bounds[2] - bounds[0]) / cell_size)
+        rows = math.ceil((bounds[3] - bounds[1]) / cell_size)
+        return cls(bounds, cell_size, [[0] * columns for _ in range(rows)])
+
+    @classmethod
+    def from_point_files(cls, paths, bounds=BERLIN, cell_size=DEFAULT_CELL_SIZE):
+        """Counts the points of the prepared point files, points outside of the bounds are skipped."""
+        grid = cls.empty(bounds, cell_size)
+        counts = grid.counts
+        skipped = 0
+        for path in paths:
+            with open(path, newline="") as file:
+                for row in csv.reader(file):
+                    try:
+                        lat = float(row[LATITUDE_COLUMN])
+                        lon = float(row[LONGITUDE_COLUMN])
+                    except (IndexError, ValueError):
+                        skipped += 1
+                        continue
+                    column = int((lon - bounds[0]) / cell_size)
+                    row_index = int((lat - bounds[1]) / cell_size)
+                    if 0 <= column < grid.columns and 0 <= row_index < grid.rows:
+                        counts[row_index][column] += 1
+                    else:
+                        skipped += 1
+        if skipped:
+            print(f"Skipped {skipped} rows outside of the bounds or without a position")
+        return cls(bounds, cell_size, counts)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as file:
+            data = json.load(file)
+        if data.get("version") != GRID_VERSION:
+            raise ValueError(f"{path} is a density grid of version {data.get('version')}, expected version {GRID_VERSION}.")
+        return cls(data["bounds"], data["cell_size"], data["counts"])
+
+    def save(self, path, sources=()):
+        with open(path, "w") as file:
+            json.dump({
+                "version": GRID_VERSION,
+                "bounds": self.bounds,
+                "cell_size": self.cell_size,
+                "points": self.points,
+                "sources": list(sources),
+                "counts": self.counts,
+            }, file)
+
+    def _summed_area_table(self):
+        table = [[0] * (self.columns + 1) for _ in range(self.rows + 1)]
+        for row in range(self.rows):
+            running = 0
+            for column in range(self.columns):
+                running += self.counts[row][column]
+                table[row + 1][column + 1] = table[row][column + 1] + running
+        return table
+
+    def _points_below(self, x, y):
+        """Points south-west of (x, y) in cell units, bilinear within a cell as the points are spread evenly."""
+        x = min(max(x, 0.0), self.columns)
+        y = min(max(y, 0.0), self.rows)
+        column, row = min(int(x), self.columns - 1), min(int(y), self.rows - 1)
+        fx, fy = x - column, y - row
+        table = self._summed
+        return (table[row][column] * (1 - fx) * (1 - fy) + table[row][column + 1] * fx * (1 - fy)
+                + table[row + 1][column] * (1 - fx) * fy + table[row + 1][column + 1] * fx * fy)
+
+    def count_box(self, xmin, ymin, xmax, ymax):
+        """Estimated number of points in a box given in degrees."""
+        x0, x1 = (xmin - self.bounds[0]) / self.cell_size, (xmax - self.bounds[0]) / self.cell_size
+        y0, y1 = (ymin - self.bounds[1]) / self.cell_size, (ymax - self.bounds[1]) / self.cell_size
+        return (self._points_below(x1, y1) - self._points_below(x0, y1)
+                - self._points_below(x1, y0) + self._points_below(x0, y0))
+
+    def count_radius(self, lon, lat, meters):
+        """Estimated number of points within meters of a position."""
+        dlat = meters / METERS_PER_DEGREE
+        dlon = meters / (METERS_PER_DEGREE * math.cos(math.radians(lat)))
+        points = 0.0
+        for strip in range(CIRCLE_STRIPS):
+            # width of the circle at the middle of the strip, in units of the radius
+            low, high = -1 + 2 * strip / CIRCLE_STRIPS, -1 + 2 * (strip + 1) / CIRCLE_STRIPS
+            half_width = math.sqrt(1 - ((low + high) / 2) ** 2)
+            points += self.count_box(lon - half_width * dlon, lat + low * dlat, lon + half_width * dlon, lat + high * dlat)
+        return points
+
+    def random_position(self, rng):
+        """A random position, drawn with the density of the data: a cell by its count, then uniform within it."""
+        if not self.points:
+            return rng.uniform(self.bounds[0], self.bounds[2]), rng.uniform(self.bounds[1], self.bounds[3])
+        cell = bisect.bisect_right(self._cumulative, rng.uniform(0, self.points - 1e-9))
+        row, column = divmod(cell, self.columns)
+        return (self.bounds[0] + (column + rng.random()) * self.cell_size,
+                self.bounds[1] + (row + rng.random()) * self.cell_size)
+
+    @staticmethod
+    def _search(count, target, low, high):
+        """Size in [low, high] for which the growing function count reaches target, bisected in log space."""
+        if count(high) <= target:
+            return high
+        for _ in range(SEARCH_STEPS):
+            middle = math.sqrt(low * high)
+            if count(middle) < target:
+                low = middle
+            else:
+                high = middle
+        return high
+
+    def _sized(self, rng, target, count, low, high):
+        best = None
+        for _ in range(CENTRE_ATTEMPTS):
+            lon, lat = self.random_position(rng)
+            size = self._search(lambda value: count(lon, lat, value), target, low, high)
+            expected = count(lon, lat, size)
+            candidate = (lon, lat, size, expected)
+            if target / TARGET_TOLERANCE <= expected <= target * TARGET_TOLERANCE:
+                return candidate
+            if best is None or abs(math.log((expected + 1) / (target + 1))) < abs(math.log((best[3] + 1) / (target + 1))):
+                best = candidate
+        return best
+
+    def surrounding(self, rng, target):
+        """
+        A circle with about target points: a centre drawn by density and the radius in meters
+        that reaches target there. Centres where no radius comes within a factor of
+        TARGET_TOLERANCE of target are redrawn.
+
+        :return: Tuple of longitude, latitude, radius and the expected number of points.
+        """
+        return self._sized(rng, target, self.count_radius, MIN_RADIUS, MAX_RADIUS)
+
+    def bounding_box(self, rng, target):
+        """
+        A square box with about target points, see surrounding.
+
+        :return: Tuple of the longitude and latitude of its centre, half its edge length in
+                 degrees and the expected number of points.
+        """
+        count = lambda lon, lat, half: self.count_box(lon - half, lat - half, lon + half, lat + half)
+        return self._sized(rng, target, count, MIN_RADIUS / METERS_PER_DEGREE, MAX_RADIUS / METERS_PER_DEGREE)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Builds the density grid of the prepared point files (merged*.csv).")
+    parser.add_argument("files", nargs="*", default=["../../data/merged*.csv"], help="Point files, globs are expanded")
+    parser.add_argument("--out", default="density_grid.json", help="File the grid is saved to")
+    parser.add_argument("--cell-size", type=float, default=DEFAULT_CELL_SIZE, help="Edge length of a cell in degrees")
+    options = parser.parse_args()
+
+    paths = sorted(path for pattern in options.files for path in glob.glob(pattern))
+    if not paths:
+        parser.error(f"No point files match {options.files}.")
+    grid = DensityGrid.from_point_files(paths, cell_size=options.cell_size)
+    grid.save(options.out, paths)
+    occupied = sum(1 for row in grid.counts for count in row if count)
+    print(f"Counted {grid.points} points of {len(paths)} files in {grid.rows} x {grid.columns} cells "
+          f"({occupied} occupied), saved to {options.out}")
@@ -0,0 +1,112 @@
+from contextlib import nullcontext
+
+from loadGenerator import current_worker_id, current_intended_start
+from queryRegistry import expected_rows
+
+
+class EngineAdapter:
+    """
+    Interface between the benchmark drivers and one database engine.
+
+    An adapter connects to the engine, executes the requests built by the query types of a
+    QueryRegistry, streams and counts their results and reports the phases of every request
+    as a resultStream.QueryTiming. Drivers do not time or log queries themselves, they hand
+    requests to run_query (or run_query_async), which is the one hot path every engine
+    shares. Implementations: postgresAdapter.py (MobilityDB, PostGIS) and geomesaAdapter.py.
+    """
+
+    # Name of the engine, and the connection mode and execution mode written with each measurement
+    name = None
+    connection_mode = None
+    async_connection_mode = None
+    execution_mode = "literal"
+
+    def connect(self):
+        """Prepares the connections of the threaded backend."""
+        raise NotImplementedError
+
+    def execute(self, request):
+        """Executes one request, consumes its whole result and returns its QueryTiming."""
+        raise NotImplementedError
+
+    def close(self):
+        """Closes the connections of the threaded backend."""
+        raise NotImplementedError
+
+    async def connect_async(self):
+        """Prepares the connections of the asyncio backend."""
+        raise NotImplementedError
+
+    async def execute_async(self, request):
+        """asyncio counterpart of execute."""
+        raise NotImplementedError
+
+    async def close_async(self):
+        """Closes the connections of the asyncio backend."""
+        raise NotImplementedError
+
+    def last_connect_duration(self):
+        """Seconds the calling thread spent connecting for its last request."""
+        return 0.0
+
+    def worker_context(self):
+        """Context manager a closed-loop worker runs in, e.g. to keep one connection."""
+        return nullcontext()
+
+
+def log_timing(record_writer, adapter, query_type, limit, timing, connection_mode, connect_duration, expected=None):
+    """
+    Hands one measurement to the record_writer: the total duration, the connection mode and
+    time spent connecting, the phases and result size of the request, the worker that ran it,
+    in open-loop mode the time it was scheduled for and the number of rows its builder
+    expected, if it estimated them.
+    """
+    record_writer.write(
+        query_type, limit, timing.start, timing.end, timing.end - timing.start, connection_mode, connect_duration,
+        timing.executed - timing.start, timing.first_row - timing.start, timing.fetch_duration, timing.rows, timing.bytes,
+        current_worker_id(), current_intended_start(), adapter.execution_mode, expected
+    )
+
+
+def run_query(adapter, registry, query_type, limit, record_writer):
+    """
+    Builds one request of query_type with fresh parameters, executes it through the adapter
+    and logs its timing. Errors are printed and the request is not logged.
+
+    :return: QueryTiming of the request, None if it failed.
+    """
+    request = registry.build(query_type, limit)
+    return run_request(adapter, query_type, limit, request, record_writer, expected_rows())
+
+
+def run_request(adapter, query_type, limit, request, record_writer, expected=None):
+    """
+    Executes an already built request of query_type through the adapter and logs its
+    timing, e.g. to run the same request against several adapters. expected is the number
+    of rows its builder expected (queryRegistry.expected_rows), if any.
+
+    :return: QueryTiming of the request, None if it failed.
+    """
+    try:
+        timing = adapter.execute(request)
+    except Exception as error:
+        print(f"Error executing query '{query_type}':", error)
+        return None
+    # connect_duration is only non-zero if this request had to open a connection
+    log_timing(
+        record_writer, adapter, query_type, limit, timing, adapter.connection_mode, adapter.last_connect_duration(), expected
+    )
+    return timing
+
+
+async def run_query_async(adapter, registry, query_type, limit, record_writer):
+    """asyncio counterpart of run_query, for --backend asyncio."""
+    try:
+        request = registry.build(query_type, limit)
+        expected = expected_rows()
+        timing = await adapter.execute_async(request)
+    except Exception as error:
+        print(f"Error executing query '{query_type}':", error)
+        return None
+    log_timing(record_writer, adapter, query_type, limit, timing, adapter.async_connection_mode, 0.0, expected)
+    return timing
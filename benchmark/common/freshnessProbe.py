@@ -0,0 +1,205 @@
+import math
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from ingestStrategies import renumber
+from temporalHistogram import parse_timestamp
+
+# Query types of the measurements, the label of the engine and deployment is appended
+LAG_QUERY_TYPE = "freshness_lag"
+WRITE_QUERY_TYPE = "freshness_write"
+# Histogram file shared by the freshness runs of all engines, so they can be compared with latencyHistogram.py
+HISTOGRAMS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "freshness-histograms.json")
+DEFAULT_SPEEDUP = 10.0
+DEFAULT_FEEDS = 4
+DEFAULT_MARKER_EVERY = 10
+DEFAULT_PROBE_INTERVAL = 0.05
+DEFAULT_PROBE_TIMEOUT = 30.0
+# Meters and seconds around a marker a probe searches, a small spatiotemporal_surrounding query
+PROBE_RADIUS = 25
+PROBE_WINDOW = 1.0
+
+# A point written by a feed whose visibility is probed: the point row (see ingestStrategies.point_row)
+# with its rewritten timestamp and the wall clock time its write was sent
+Marker = namedtuple("Marker", ["row", "written"])
+
+
+def live_timestamp(seconds):
+    """The timestamp written for a point sent at seconds since the epoch: UTC without a time zone."""
+    return datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None)
+
+
+def ride_offsets(ride):
+    """Seconds of every point of a ride after its first point, from datetimes or timestamps of the point files."""
+    seconds = [
+        (row[7] - datetime(1970, 1, 1)).total_seconds() if isinstance(row[7], datetime) else parse_timestamp(row[7])
+        for row in ride
+    ]
+    return [max(value - seconds[0], 0.0) for value in seconds]
+
+
+class FreshnessRun:
+    """
+    Replays rides as live point feeds and measures how long every marker point takes from its
+    write until a query finds it.
+
+    feeds threads each replay one ride after another, renumbered from first_ride_id: the
+    points are sent speedup times faster than they were recorded, every one with the time it
+    is sent as its timestamp, as a live feed of GPS points. Every marker_every-th point of a
+    ride is a marker. Once its write was sent, a prober polls the engine every probe_interval
+    seconds with a query for the marker's position, time and ride until it returns it, or
+    gives up after probe_timeout seconds.
+
+    The freshness lag of a marker is the time from sending its write to the start of the
+    first probe that found it; the probe before bounds it from below, so its resolution is
+    probe_interval plus the latency of a probe. Lags are logged as freshness_lag_<label>
+    (the rows being the probes it took), the writes of all points as freshness_write_<label>.
+
+    :param write_point: Function writing one point row, called by the feeds.
+    :param probe: Function returning whether a Marker is visible.
+    :param rides: Rides (lists of point rows, see ingestStrategies) replayed in turn.
+    :param record_writer: RecordWriter the lags and writes are logged to.
+    :param label: Engine and deployment, e.g. mobilitydb_single, appended to the query types.
+    :param connection_mode: Written as the connection mode of the measurements.
+    :param first_ride_id: Ride id of the first ride replayed, the next ones are numbered consecutively.
+    :param probers: Maximum number of markers probed at the same time.
+    """
+
+    def __init__(self, write_point, probe, rides, record_writer, label, connection_mode, first_ride_id,
+                 speedup=DEFAULT_SPEEDUP, feeds=DEFAULT_FEEDS, marker_every=DEFAULT_MARKER_EVERY,
+                 probe_interval=DEFAULT_PROBE_INTERVAL, probe_timeout=DEFAULT_PROBE_TIMEOUT, probers=32):
+        if speedup <= 0:
+            raise ValueError("The speedup has to be greater than 0.")
+        self.write_point = write_point
+        self.probe = probe
+        self.rides = [(ride, ride_offsets(ride)) for ride in rides]
+        self.record_writer = record_writer
+        self.lag_query_type = f"{LAG_QUERY_TYPE}_{label}"
+        self.write_query_type = f"{WRITE_QUERY_TYPE}_{label}"
+        self.connection_mode = connection_mode
+        self.first_ride_id = first_ride_id
+        self.speedup = speedup
+        self.feeds = feeds
+        self.marker_every = marker_every
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.probers = probers
+        self.rides_replayed = 0
+        self.points_written = 0
+        self.write_errors = 0
+        self.markers = 0
+        self.missed = 0
+
+        self._next_ride = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._executor = None
+
+    def _take_ride(self):
+        with self._lock:
+            index = self._next_ride
+            self._next_ride += 1
+        ride, offsets = self.rides[index % len(self.rides)]
+        return renumber(ride, self.first_ride_id + index), offsets
+
+    def _feed(self, rides):
+        """Replays rides rides (None for no limit) one after another until the run is stopped."""
+        replayed = 0
+        while not self._stop.is_set() and (rides is None or replayed < rides):
+            ride, offsets = self._take_ride()
+            ride_start = time.perf_counter()
+            for index, (row, offset) in enumerate(zip(ride, offsets)):
+                delay = ride_start + offset / self.speedup - time.perf_counter()
+                if delay > 0 and self._stop.wait(delay):
+                    return
+                written = time.time()
+                row = row[:7] + (live_timestamp(written),) + row[8:]
+                try:
+                    self.write_point(row)
+                except Exception as error:
+                    with self._lock:
+                        self.write_errors += 1
+                    print("Error writing a point:", error)
+                    continue
+                acknowledged = time.time()
+                self.record_writer.write(
+                    self.write_query_type, 1, written, acknowledged, acknowledged - written, self.connection_mode,
+                    0.0, acknowledged - written, acknowledged - written, 0.0, 1, 0, -1
+                )
+                with self._lock:
+                    self.points_written += 1
+                if index % self.marker_every == 0:
+                    with self._lock:
+                        self.markers += 1
+                    self._executor.submit(self._probe_marker, Marker(row, written))
+            replayed += 1
+            with self._lock:
+                self.rides_replayed += 1
+
+    def _probe_marker(self, marker):
+        deadline = marker.written + self.probe_timeout
+        probes = 0
+        while True:
+            started = time.time()
+            if started > deadline:
+                with self._lock:
+                    self.missed += 1
+                return
+            probes += 1
+            try:
+                visible = self.probe(marker)
+            except Exception as error:
+                print("Error probing a marker:", error)
+                visible = False
+            if visible:
+                lag = started - marker.written
+                self.record_writer.write(
+                    self.lag_query_type, self.marker_every, marker.written, started, lag, self.connection_mode,
+                    0.0, lag, lag, 0.0, probes, 0, -1
+                )
+                return
+            time.sleep(self.probe_interval)
+
+    def run(self, duration=None, rides=None):
+        """
+        Replays the rides for duration seconds or rides rides per feed, waits for the probes
+        of the markers written so far and returns the wall clock seconds of the replay.
+        """
+        if duration is None and rides is None:
+            raise ValueError("A freshness run needs a duration, a number of rides or both.")
+        self._executor = ThreadPoolExecutor(max_workers=self.probers, thread_name_prefix="freshness-probe")
+        feeds = [
+            threading.Thread(target=self._feed, args=(rides,), name=f"freshness-feed-{i}")
+            for i in range(self.feeds)
+        ]
+        started = time.perf_counter()
+        for feed in feeds:
+            feed.start()
+        timer = None
+        if duration is not None:
+            timer = threading.Timer(duration, self._stop.set)
+            timer.start()
+        for feed in feeds:
+            feed.join()
+        elapsed = time.perf_counter() - started
+        if timer is not None:
+            timer.cancel()
+        self._executor.shutdown(wait=True)
+        return elapsed
+
+    def summary(self, elapsed):
+        """Points written, their rate and the markers that never became visible as text."""
+        return (f"replayed {self.rides_replayed} rides at {self.speedup:g}x real time with {self.feeds} feeds: "
+                f"{self.points_written} points in {elapsed:.1f}s ({self.points_written / max(elapsed, 1e-9):.1f} points/s, "
+                f"{self.write_errors} failed), {self.markers} markers, {self.missed} not visible within {self.probe_timeout:g}s")
+
+
+def probe_window(marker):
+    """Start and end of the time window a probe of marker searches, whole seconds around its timestamp."""
+    timestamp = marker.row[7]
+    seconds = (timestamp - datetime(1970, 1, 1)).total_seconds()
+    return live_timestamp(math.floor(seconds - PROBE_WINDOW)), live_timestamp(math.ceil(seconds + PROBE_WINDOW))
@@ -0,0 +1,97 @@
+import math
+from collections import defaultdict
+
+from parameterCorpus import BERLIN
+
+# Meters per degree of latitude
+METERS_PER_DEGREE = 111320.0
+# Edge length of a cell of the index in degrees, about 700 m x 1100 m in Berlin
+DEFAULT_CELL_SIZE = 0.01
+DEFAULT_VERTICES = 8
+DEFAULT_MIN_RADIUS = 100.0
+DEFAULT_MAX_RADIUS = 1000.0
+
+
+def random_geofence(rng, lon, lat, radius, vertices=DEFAULT_VERTICES):
+    """
+    A star-shaped polygon around (lon, lat): vertices corners at increasing angles, each at
+    between half and the full radius (meters) from the centre, so zones are irregular like
+    hand-drawn ones but never self-intersecting. Returned as a list of (lon, lat), not closed.
+    """
+    lat_degrees = radius / METERS_PER_DEGREE
+    lon_degrees = lat_degrees / math.cos(math.radians(lat))
+    corners = []
+    for index in range(vertices):
+        angle = 2 * math.pi * (index + rng.uniform(0.0, 0.8)) / vertices
+        scale = rng.uniform(0.5, 1.0)
+        corners.append((lon + lon_degrees * scale * math.cos(angle), lat + lat_degrees * scale * math.sin(angle)))
+    return corners
+
+
+def generate_geofences(rng, count, min_radius=DEFAULT_MIN_RADIUS, max_radius=DEFAULT_MAX_RADIUS,
+                       vertices=DEFAULT_VERTICES):
+    """count geofences at random positions in Berlin, as a list of corner lists indexed by their fence id."""
+    return [
+        random_geofence(rng, rng.uniform(BERLIN[0], BERLIN[2]), rng.uniform(BERLIN[1], BERLIN[3]),
+                        rng.uniform(min_radius, max_radius), vertices)
+        for _ in range(count)
+    ]
+
+
+def polygon_wkt(corners):
+    """The WKT of a geofence, closed by repeating its first corner."""
+    return "POLYGON((" + ", ".join(f"{lon} {lat}" for lon, lat in corners + corners[:1]) + "))"
+
+
+def contains(corners, lon, lat):
+    """Whether (lon, lat) lies inside the polygon, by counting the edges a ray to the east crosses."""
+    inside = False
+    previous_lon, previous_lat = corners[-1]
+    for corner_lon, corner_lat in corners:
+        if (corner_lat > lat) != (previous_lat > lat):
+            crossing = corner_lon + (lat - corner_lat) * (previous_lon - corner_lon) / (previous_lat - corner_lat)
+            if lon < crossing:
+                inside = not inside
+        previous_lon, previous_lat = corner_lon, corner_lat
+    return inside
+
+
+class GeofenceIndex:
+    """
+    In-memory spatial index of geofences, as an alerting service would keep them.
+
+    Every geofence is registered in the cells of a regular grid its bounding box overlaps. A
+    point only looks up its own cell, tests the bounding boxes of the geofences registered
+    there and runs the point-in-polygon test for those it falls into, so the cost of a
+    point depends on the geofences near it rather than on all of them.
+
+    :param geofences: Corner lists (see random_geofence), the fence id of one is its index.
+    :param cell_size: Edge length of a cell in degrees.
+    """
+
+    def __init__(self, geofences, cell_size=DEFAULT_CELL_SIZE):
+        self.geofences = geofences
+        self.cell_size = cell_size
+        self._cells = defaultdict(list)
+        for fence_id, corners in enumerate(geofences):
+            lons = [lon for lon, _ in corners]
+            lats = [lat for _, lat in corners]
+            box = (min(lons), min(lats), max(lons), max(lats))
+            for column in range(self._cell(box[0]), self._cell(box[2]) + 1):
+                for row in range(self._cell(box[1]), self._cell(box[3]) + 1):
+                    self._cells[(column, row)].append((fence_id, box, corners))
+
+    def _cell(self, degrees):
+        return math.floor(degrees / self.cell_size)
+
+    def containing(self, lon, lat):
+        """Fence ids of the geofences (lon, lat) lies in."""
+        return [
+            fence_id
+            for fence_id, box, corners in self._cells.get((self._cell(lon), self._cell(lat)), ())
+            if box[0] <= lon <= box[2] and box[1] <= lat <= box[3] and contains(corners, lon, lat)
+        ]
+
+    def candidates(self):
+        """Average number of geofences registered per occupied cell, the bounding boxes a point tests."""
+        return sum(len(entries) for entries in self._cells.values()) / max(len(self._cells), 1)
@@ -0,0 +1,380 @@
+import asyncio
+import queue
+import re
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+from engineAdapter import EngineAdapter
+from resultStream import QueryTiming
+
+# One export of the GeoMesa shell: the feature type, the CQL filter and the feature limit (-1 for no limit)
+ExportRequest = namedtuple("ExportRequest", ["feature_type", "cql", "limit"])
+
+# GeoMesa Accumulo export on the manager, the feature limit, filter and feature type are appended
+EXPORT_COMMAND = "/opt/geomesa-accumulo/bin/geomesa-accumulo export -i test -z localhost -u root  -p test -c example"
+
+# Bytes read from the output of an export per read call
+EXPORT_CHUNK_SIZE = 64 * 1024
+# Output formats (-F) the export can stream to stdout, and the ones whose features are lines
+# after one header line. For all others the features are taken from the summary the export logs.
+EXPORT_FORMATS = ("csv", "tsv", "json", "bin", "arrow", "avro")
+LINE_FORMATS = ("csv", "tsv")
+# Summary line of the export on stderr, e.g. "Feature export complete to standard out for 50 features in 812ms"
+EXPORT_LOG_FEATURES = re.compile(rb"for (\d+) features")
+
+# Port of the GeoTools query server (geomesa/geotools/.../QueryServer.java) on the manager
+DEFAULT_SERVER_PORT = 7070
+# Seconds to wait for the ssh tunnel to the query server
+TUNNEL_TIMEOUT = 30.0
+
+
+class ExportStream:
+    """
+    Counts the features and bytes of the output of an export while it is read, without
+    keeping it, so exports without a limit do not have to fit into the driver's memory.
+
+    The default export format is CSV with one header line, every further line is one
+    feature. The first feature has arrived once the first line after the header is complete.
+    Binary formats are not split into features: the first feature is the first chunk and the
+    number of features is read from the log of the export (read_log).
+
+    :param header_lines: Lines before the first feature.
+    :param line_based: Whether the output has one feature per line.
+    """
+
+    def __init__(self, header_lines=1, line_based=True):
+        self.header_lines = header_lines
+        self.line_based = line_based
+        self.lines = 0
+        self.bytes = 0
+        self.first_feature = None
+        self.fetch_duration = 0.0
+        self.logged_features = None
+        # the last chunk ended inside a line, which counts as a line at the end of the output
+        self._open_line = False
+
+    def feed(self, chunk, fetch_start, fetch_end):
+        """Counts one chunk of the output that was read between fetch_start and fetch_end."""
+        self.fetch_duration += fetch_end - fetch_start
+        self.bytes += len(chunk)
+        if not self.line_based:
+            if self.first_feature is None:
+                self.first_feature = fetch_end
+            return
+        self.lines += chunk.count(b"\n")
+        self._open_line = not chunk.endswith(b"\n")
+        if self.first_feature is None and self.lines > self.header_lines:
+            self.first_feature = fetch_end
+
+    def read_log(self, log):
+        """Takes the number of features from the summary in the log (stderr) of the export."""
+        counts = EXPORT_LOG_FEATURES.findall(log)
+        if counts:
+            self.logged_features = int(counts[-1])
+
+    def features(self):
+        """Features of the output read so far."""
+        if self.logged_features is not None:
+            return self.logged_features
+        if not self.line_based:
+            return 0
+        return max(self.lines + self._open_line - self.header_lines, 0)
+
+    def timing(self, start, executed, end):
+        """QueryTiming of the export, the first row is the first feature."""
+        return QueryTiming(start, executed, self.first_feature or end, end, self.fetch_duration, self.features(), self.bytes)
+
+
+class GeoMesaShellAdapter(EngineAdapter):
+    """
+    Adapter for GeoMesa Accumulo, running every request as a GeoMesa shell export over ssh.
+
+    Requests are ExportRequests. The output of the export is streamed and counted by an
+    ExportStream: executed is the time the ssh process was started, first_row the arrival
+    of the first feature and the size the length of the output. There are no connections to
+    keep, every request starts its own ssh session.
+
+    With an export_format the export writes that format (-F) and the format is written as
+    the execution mode of its measurements. For formats that are not line based the log of
+    the export is captured to read the number of features from it.
+
+    :param ssh_target: user@host of the GeoMesa manager.
+    :param export_format: One of EXPORT_FORMATS, None for the default format (CSV).
+    """
+
+    name = "geomesa"
+    connection_mode = "ssh"
+    async_connection_mode = "ssh"
+
+    def __init__(self, ssh_target, export_format=None):
+        if export_format is not None and export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format '{export_format}', expected one of {EXPORT_FORMATS}.")
+        self.ssh_target = ssh_target
+        self.export_format = export_format
+        if export_format is not None:
+            self.execution_mode = export_format
+        self.line_based = export_format is None or export_format in LINE_FORMATS
+
+    def export_command(self, request):
+        """The ssh command that runs one export."""
+        limit = "" if request.limit == -1 else f" -m {request.limit}"
+        export_format = "" if self.export_format is None else f" -F {self.export_format}"
+        return (f"ssh {self.ssh_target} '{EXPORT_COMMAND}{limit}{export_format} "
+                f"-q \"{request.cql}\" -f {request.feature_type}'")
+
+    def _log_file(self):
+        """File the log of a binary export is written to, None to leave it on the console."""
+        return None if self.line_based else tempfile.TemporaryFile()
+
+    @staticmethod
+    def _finish(stream, returncode, log_file):
+        log = b""
+        if log_file is not None:
+            log_file.seek(0)
+            log = log_file.read()
+            log_file.close()
+            stream.read_log(log)
+        if returncode != 0:
+            # the last line of a captured log usually says why
+            message = log.strip().splitlines()[-1].decode(errors="replace") if log.strip() else ""
+            print(f"Export exited with code {returncode}", message)
+
+    def connect(self):
+        pass
+
+    def execute(self, request):
+        stream = ExportStream(line_based=self.line_based)
+        log_file = self._log_file()
+        start = time.time()
+        process = subprocess.Popen(self.export_command(request), shell=True, stdout=subprocess.PIPE, stderr=log_file)
+        executed = time.time()
+        try:
+            while True:
+                fetch_start = time.time()
+                chunk = process.stdout.read1(EXPORT_CHUNK_SIZE)
+                fetch_end = time.time()
+                if not chunk:
+                    break
+                stream.feed(chunk, fetch_start, fetch_end)
+        except BaseException:
+            process.kill()
+            raise
+        finally:
+            process.stdout.close()
+            returncode = process.wait()
+        end = time.time()
+        self._finish(stream, returncode, log_file)
+        return stream.timing(start, executed, end)
+
+    def close(self):
+        pass
+
+    async def connect_async(self):
+        pass
+
+    async def execute_async(self, request):
+        stream = ExportStream(line_based=self.line_based)
+        log_file = self._log_file()
+        start = time.time()
+        process = await asyncio.create_subprocess_shell(
+            self.export_command(request), stdout=asyncio.subprocess.PIPE, stderr=log_file
+        )
+        executed = time.time()
+        try:
+            while True:
+                fetch_start = time.time()
+                chunk = await process.stdout.read(EXPORT_CHUNK_SIZE)
+                fetch_end = time.time()
+                if not chunk:
+                    break
+                stream.feed(chunk, fetch_start, fetch_end)
+        except BaseException:
+            process.kill()
+            await process.wait()
+            raise
+        returncode = await process.wait()
+        end = time.time()
+        self._finish(stream, returncode, log_file)
+        return stream.timing(start, executed, end)
+
+    async def close_async(self):
+        pass
+
+
+class GeoMesaServerAdapter(EngineAdapter):
+    """
+    Adapter for GeoMesa Accumulo through the long-lived GeoTools query server on the manager.
+
+    The server keeps one DataStore open, so a request costs a line over an open socket
+    instead of an ssh handshake and a JVM start. Remote drivers reach the server, which only
+    listens on the manager's loopback interface, through one persistent ssh tunnel. Sockets
+    are kept open and reused, each one is used by one worker at a time.
+
+    Requests are ExportRequests. Features can also be written (write, flush), which the
+    server answers like a query. The server runs the query, counts the features and their
+    size and returns its own timings: executed and first_row are the server's planning and
+    first-feature times added to the client start, fetch_duration is the time the server
+    spent reading features, and end - start is the latency seen by the client.
+
+    :param ssh_target: user@host of the GeoMesa manager, None to connect to host directly.
+    :param port: Port of the query server, also used as the local end of the tunnel.
+    :param host: Host of the query server when there is no tunnel.
+    """
+
+    name = "geomesa"
+    connection_mode = "server"
+    async_connection_mode = "async_server"
+
+    def __init__(self, ssh_target=None, port=DEFAULT_SERVER_PORT, host="localhost"):
+        self.ssh_target = ssh_target
+        self.port = port
+        self.host = "localhost" if ssh_target else host
+        self.tunnel = None
+        self._idle = queue.LifoQueue()
+        self._async_idle = []
+        self._local = threading.local()
+
+    def _open_tunnel(self):
+        """Forwards the local port to the query server on the manager and waits until it accepts connections."""
+        if self.ssh_target is None or self.tunnel is not None:
+            return
+        self.tunnel = subprocess.Popen(
+            ["ssh", "-N", "-o", "ExitOnForwardFailure=yes", "-L", f"{self.port}:localhost:{self.port}", self.ssh_target]
+        )
+        deadline = time.time() + TUNNEL_TIMEOUT
+        while True:
+            if self.tunnel.poll() is not None:
+                raise RuntimeError(f"ssh tunnel to {self.ssh_target} exited with code {self.tunnel.returncode}")
+            try:
+                socket.create_connection((self.host, self.port), timeout=1.0).close()
+                return
+            except OSError:
+                if time.time() > deadline:
+                    raise RuntimeError(f"Query server not reachable through the ssh tunnel to {self.ssh_target}")
+                time.sleep(0.2)
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        start = time.time()
+        connection = socket.create_connection((self.host, self.port))
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._local.connect_duration += time.time() - start
+        return connection, connection.makefile("rb")
+
+    @staticmethod
+    def _close_quietly(connection):
+        sock, reader = connection
+        try:
+            reader.close()
+            sock.close()
+        except OSError:
+            pass
+
+    @staticmethod
+    def request_line(request):
+        """The protocol line of one request."""
+        return f"{request.feature_type}\t{request.limit}\t{request.cql}\n".encode()
+
+    @staticmethod
+    def _timing(start, end, response):
+        fields = response.decode().rstrip("\n").split("\t")
+        if fields[0] != "OK":
+            message = fields[1] if len(fields) > 1 else "connection closed"
+            raise RuntimeError(f"Query server: {message}")
+        features, size = int(fields[1]), int(fields[2])
+        planned, first, total = (float(value) / 1000 for value in fields[3:6])
+        return QueryTiming(start, start + planned, start + first, end, total - planned, features, size)
+
+    def connect(self):
+        self._open_tunnel()
+
+    @staticmethod
+    def write_line(feature_type, values):
+        """
+        The protocol line that writes one feature: its attribute values in the order of the
+        schema, geometries as WKT, dates as epoch milliseconds and None for null.
+        """
+        return ("WRITE\t" + feature_type + "\t" + "\t".join("" if value is None else str(value) for value in values) + "\n").encode()
+
+    def execute(self, request):
+        return self._send(self.request_line(request))
+
+    def write(self, feature_type, values):
+        """
+        Writes one feature through the server's writer of feature_type (see write_line). The
+        server buffers it until flush, or until GeoMesa's batch writer sends it by itself.
+        """
+        return self._send(self.write_line(feature_type, values))
+
+    def flush(self, feature_type):
+        """Sends the features written to feature_type so far to Accumulo."""
+        return self._send(f"FLUSH\t{feature_type}\n".encode())
+
+    def _send(self, line):
+        self._local.connect_duration = 0.0
+        connection = self._checkout()
+        sock, reader = connection
+        try:
+            start = time.time()
+            sock.sendall(line)
+            response = reader.readline()
+            end = time.time()
+        except OSError:
+            self._close_quietly(connection)
+            raise
+        if not response:
+            self._close_quietly(connection)
+        else:
+            self._idle.put(connection)
+        return self._timing(start, end, response)
+
+    def close(self):
+        while True:
+            try:
+                self._close_quietly(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        if self.tunnel is not None:
+            self.tunnel.terminate()
+            self.tunnel.wait()
+            self.tunnel = None
+
+    async def connect_async(self):
+        # the sockets of the asyncio backend belong to the event loop they are opened on
+        self._open_tunnel()
+
+    async def execute_async(self, request):
+        if self._async_idle:
+            reader, writer = self._async_idle.pop()
+        else:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            start = time.time()
+            writer.write(self.request_line(request))
+            await writer.drain()
+            response = await reader.readline()
+            end = time.time()
+        except OSError:
+            writer.close()
+            raise
+        if not response:
+            writer.close()
+        else:
+            self._async_idle.append((reader, writer))
+        return self._timing(start, end, response)
+
+    async def close_async(self):
+        # the tunnel stays open for the next run, close() ends it
+        while self._async_idle:
+            _, writer = self._async_idle.pop()
+            writer.close()
+
+    def last_connect_duration(self):
+        return getattr(self._local, "connect_duration", 0.0)
@@ -0,0 +1,186 @@
+import csv
+import io
+from datetime import timedelta
+
+from parameterCorpus import BERLIN
+
+# Strategies
+ROW = "row"
+VALUES = "values"
+EXECUTE_VALUES = "execute_values"
+COPY = "copy"
+STRATEGIES = (ROW, VALUES, EXECUTE_VALUES, COPY)
+# Rows per INSERT statement of execute_values, the default of psycopg2.extras.execute_values
+EXECUTE_VALUES_PAGE_SIZE = 100
+
+# Columns of the point and trip tables (see the setupRideData.sh scripts of the deployments)
+POINT_COLUMNS = ("ride_id", "rider_id", "latitude", "longitude", "x", "y", "z", "timestamp", "point_geom")
+TRIP_COLUMNS = ("ride_id", "rider_id", "trip")
+# Columns of the prepared point files (merged*.csv), point_geom is computed after loading them
+FILE_POINT_COLUMNS = POINT_COLUMNS[:-1]
+
+# Seconds between two points of a synthetic ride, as in the SimRa data, and the largest step in degrees
+POINT_INTERVAL = 3
+STEP_DEGREES = 0.0002
+
+
+def _column_list(columns):
+    return ", ".join(columns)
+
+
+def _placeholders(columns):
+    return "(" + ", ".join(["%s"] * len(columns)) + ")"
+
+
+def insert_row_by_row(cursor, table, columns, rows):
+    """One INSERT statement, and round trip, per row."""
+    statement = f"INSERT INTO {table} ({_column_list(columns)}) VALUES {_placeholders(columns)}"
+    for row in rows:
+        cursor.execute(statement, row)
+
+
+def insert_values(cursor, table, columns, rows):
+    """One INSERT statement with all rows in its VALUES list, the values are inlined by the client."""
+    placeholders = _placeholders(columns)
+    values = b", ".join(cursor.mogrify(placeholders, row) for row in rows)
+    cursor.execute(f"INSERT INTO {table} ({_column_list(columns)}) VALUES ".encode() + values)
+
+
+def insert_execute_values(cursor, table, columns, rows):
+    """psycopg2.extras.execute_values: one INSERT statement per EXECUTE_VALUES_PAGE_SIZE rows."""
+    from psycopg2.extras import execute_values
+    execute_values(cursor, f"INSERT INTO {table} ({_column_list(columns)}) VALUES %s", rows,
+                   page_size=EXECUTE_VALUES_PAGE_SIZE)
+
+
+def insert_copy(cursor, table, columns, rows):
+    """COPY FROM STDIN of the rows written as CSV to an in-memory buffer."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({_column_list(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+INSERTERS = {
+    ROW: insert_row_by_row,
+    VALUES: insert_values,
+    EXECUTE_VALUES: insert_execute_values,
+    COPY: insert_copy,
+}
+
+
+def insert_rows(connection, strategy, table, columns, rows):
+    """
+    Inserts rows into table with one of the STRATEGIES as one transaction, which is rolled
+    back if an insert fails.
+
+    :param connection: psycopg2 connection.
+    :param strategy: One of STRATEGIES.
+    :param columns: Names of the columns the values of a row are inserted into.
+    :param rows: Sequence of tuples.
+    """
+    if strategy not in INSERTERS:
+        raise ValueError(f"Unknown ingest strategy '{strategy}', expected one of {STRATEGIES}.")
+    cursor = connection.cursor()
+    try:
+        INSERTERS[strategy](cursor, table, columns, rows)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def copy_file(connection, table, path, columns=None, delimiter=",", header=False):
+    """Streams a CSV file into table with COPY FROM STDIN as one transaction, returns the rows copied."""
+    column_list = f" ({_column_list(columns)})" if columns else ""
+    options = f"FORMAT csv, DELIMITER '{delimiter}'" + (", HEADER" if header else "")
+    cursor = connection.cursor()
+    try:
+        with open(path, newline="") as file:
+            cursor.copy_expert(f"COPY {table}{column_list} FROM STDIN WITH ({options})", file)
+        connection.commit()
+        return cursor.rowcount
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def first_free_ride_id(connection, points_table="cycling_data", trips_table="cycling_trips"):
+    """One more than the highest ride id of the point and trip tables, so inserted rides can be told apart and removed."""
+    cursor = connection.cursor()
+    cursor.execute(f"SELECT GREATEST((SELECT MAX(ride_id) FROM {points_table}), (SELECT MAX(ride_id) FROM {trips_table}));")
+    highest = cursor.fetchone()[0]
+    connection.commit()
+    cursor.close()
+    return 0 if highest is None else int(highest) + 1
+
+
+def remove_rides(connection, table, first_ride_id):
+    """Deletes the rides inserted from first_ride_id on, see first_free_ride_id."""
+    cursor = connection.cursor()
+    cursor.execute(f"DELETE FROM {table} WHERE ride_id >= %s;", (first_ride_id,))
+    connection.commit()
+    cursor.close()
+
+
+def point_row(ride_id, rider_id, lon, lat, timestamp, x=1.0, y=1.0, z=1.0):
+    """A row of the point table, its point_geom an EWKT literal that every strategy sends as text."""
+    return (ride_id, rider_id, lat, lon, x, y, z, timestamp, f"SRID=4326;POINT({lon} {lat})")
+
+
+def synthetic_ride(rng, ride_id, rider_id, points, start):
+    """
+    Rows of a ride of points positions, a random walk from a random position in Berlin with
+    one position every POINT_INTERVAL seconds from start (datetime).
+    """
+    lon, lat = rng.uniform(BERLIN[0], BERLIN[2]), rng.uniform(BERLIN[1], BERLIN[3])
+    rows = []
+    for index in range(points):
+        rows.append(point_row(ride_id, rider_id, lon, lat, start + timedelta(seconds=index * POINT_INTERVAL)))
+        lon = min(max(lon + rng.uniform(-STEP_DEGREES, STEP_DEGREES), BERLIN[0]), BERLIN[2])
+        lat = min(max(lat + rng.uniform(-STEP_DEGREES, STEP_DEGREES), BERLIN[1]), BERLIN[3])
+    return rows
+
+
+def read_rides(paths, rides=None):
+    """
+    Rides of the prepared point files (merged*.csv), as lists of rows of the point table.
+    Consecutive rows with the same ride id form a ride, rows without a valid position are skipped.
+
+    :param rides: Number of rides read at most, None for all.
+    """
+    ride = []
+    read = 0
+    for path in paths:
+        with open(path, newline="") as file:
+            for row in csv.reader(file):
+                try:
+                    ride_id, rider_id, lat, lon = (float(value) for value in row[:4])
+                    x, y, z = (float(value) if value else None for value in row[4:7])
+                    timestamp = row[7]
+                except (IndexError, ValueError):
+                    continue
+                if ride and ride[0][0] != ride_id:
+                    yield ride
+                    read += 1
+                    if rides is not None and read >= rides:
+                        return
+                    ride = []
+                ride.append(point_row(ride_id, rider_id, lon, lat, timestamp, x, y, z))
+    if ride:
+        yield ride
+
+
+def renumber(ride, ride_id):
+    """The rows of a ride with another ride id."""
+    return [(ride_id,) + row[1:] for row in ride]
+
+
+def trip_row(ride):
+    """The row of the trips table of a ride: ride id, rider id and the trip as a tgeogpoint sequence literal."""
+    instants = ", ".join(f"Point({row[3]} {row[2]})@{row[7]}" for row in ride)
+    return (ride[0][0], ride[0][1], "{[" + instants + "]}")
@@ -0,0 +1,164 @@
+import itertools
+import math
+import random
+import threading
+import time
+from datetime import datetime
+
+import psycopg2
+
+from connectionPool import ConnectionPool
+from loadGenerator import run_open_loop, current_worker_id, current_intended_start, CONSTANT
+from ingestStrategies import COPY, POINT_COLUMNS, TRIP_COLUMNS, insert_rows, synthetic_ride, renumber, trip_row, \
+    first_free_ride_id, remove_rides
+from resultStream import row_size
+
+# Query type the rides of an ingest stream are logged as
+INGEST_QUERY_TYPE = "ingest_ride"
+# Points of a synthetic ride, about ten minutes at one point every three seconds
+DEFAULT_RIDE_POINTS = 200
+
+
+class IngestStream:
+    """
+    Inserts rides into the point and trip tables at a target rate in the background, while
+    the benchmark queries run, as new rides keep being uploaded in production.
+
+    Rides arrive open-loop (see loadGenerator.run_open_loop) at rate rides per second and
+    are inserted by up to writers threads with connections of their own, so reads and writes
+    do not wait for each other's connections. A ride is either synthetic (a random walk
+    starting at the current time) or replayed from templates, renumbered with a fresh ride
+    id. Its points and its trip are inserted with strategy (see ingestStrategies.py) and
+    the whole ride is logged to the record_writer as INGEST_QUERY_TYPE with the number of
+    points as limit and the strategy as execution mode.
+
+    :param connect_kwargs: Keyword arguments passed to psycopg2.connect.
+    :param rate: Target rides per second.
+    :param record_writer: RecordWriter the rides are logged to.
+    :param writers: Maximum number of rides inserted at the same time.
+    :param strategy: Insert strategy of the points and trips.
+    :param templates: Rides (lists of point rows) replayed in turn, None for synthetic rides.
+    :param points: Points of a synthetic ride.
+    :param points_table: Table the points are inserted into.
+    :param trips_table: Table the trips are inserted into.
+    :param seed: Seed of the synthetic rides and the arrival process.
+    """
+
+    def __init__(self, connect_kwargs, rate, record_writer, writers=4, strategy=COPY, templates=None,
+                 points=DEFAULT_RIDE_POINTS, points_table="cycling_data", trips_table="cycling_trips", seed=None):
+        if rate <= 0:
+            raise ValueError("The ingest rate has to be greater than 0.")
+        self.rate = rate
+        self.record_writer = record_writer
+        self.strategy = strategy
+        self.templates = templates
+        self.points = points
+        self.points_table = points_table
+        self.trips_table = trips_table
+        self.seed = seed
+        self.connection_pool = ConnectionPool(connect_kwargs, pool_size=writers)
+        self.writers = writers
+        self.first_ride_id = None
+        self.rides = 0
+        self.points_inserted = 0
+        self.errors = 0
+        self.elapsed = 0.0
+        # autovacuum and autoanalyze runs of the tables while the stream ran
+        self.vacuums = 0
+        self.analyzes = 0
+
+        self._ride_ids = None
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._counts_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._started = None
+
+    def _next_ride(self):
+        ride_id = next(self._ride_ids)
+        if self.templates:
+            return renumber(self.templates[(ride_id - self.first_ride_id) % len(self.templates)], ride_id)
+        with self._rng_lock:
+            return synthetic_ride(self._rng, ride_id, self._rng.randint(1, 30), self.points,
+                                  datetime.now().replace(microsecond=0))
+
+    def _insert_ride(self):
+        ride = self._next_ride()
+        trip = trip_row(ride)
+        start = time.time()
+        try:
+            with self.connection_pool.connection() as connection:
+                execute_start = time.time()
+                insert_rows(connection, self.strategy, self.points_table, POINT_COLUMNS, ride)
+                insert_rows(connection, self.strategy, self.trips_table, TRIP_COLUMNS, [trip])
+                end = time.time()
+        except (Exception, psycopg2.Error):
+            with self._counts_lock:
+                self.errors += 1
+            raise
+        self.record_writer.write(
+            INGEST_QUERY_TYPE, len(ride), start, end, end - start, self.connection_pool.mode,
+            self.connection_pool.last_connect_duration(), end - execute_start, end - execute_start, 0.0,
+            len(ride) + 1, sum(row_size(row) for row in ride) + row_size(trip), current_worker_id(),
+            current_intended_start(), execution_mode=self.strategy
+        )
+        with self._counts_lock:
+            self.rides += 1
+            self.points_inserted += len(ride)
+
+    def _maintenance_counts(self, connection):
+        """
+        Autovacuum and autoanalyze runs of the point and trip tables so far. The statistics are
+        those of the server the stream connects to, in a Citus deployment the shards are
+        vacuumed on the workers and not counted.
+        """
+        cursor = connection.cursor()
+        cursor.execute(
+            "SELECT COALESCE(SUM(autovacuum_count), 0), COALESCE(SUM(autoanalyze_count), 0) "
+            "FROM pg_stat_user_tables WHERE relname IN (%s, %s);",
+            (self.points_table, self.trips_table)
+        )
+        counts = cursor.fetchone()
+        connection.commit()
+        cursor.close()
+        return counts
+
+    def start(self):
+        """Starts inserting rides in a background thread, the first ride id follows the highest existing one."""
+        with self.connection_pool.connection() as connection:
+            self.first_ride_id = first_free_ride_id(connection, self.points_table, self.trips_table)
+            self.vacuums, self.analyzes = self._maintenance_counts(connection)
+        self._ride_ids = itertools.count(self.first_ride_id)
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(
+            target=run_open_loop,
+            args=(self._insert_ride, self.rate, math.inf, CONSTANT, self.writers, self.seed, self._stop),
+            name="ingest-stream",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, remove=True):
+        """
+        Stops the stream once the rides in flight are inserted and closes its connections.
+
+        :param remove: Delete the inserted rides again, so the next run starts from the same tables.
+        """
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self._started
+        with self.connection_pool.connection() as connection:
+            vacuums, analyzes = self._maintenance_counts(connection)
+            self.vacuums, self.analyzes = vacuums - self.vacuums, analyzes - self.analyzes
+            if remove:
+                remove_rides(connection, self.points_table, self.first_ride_id)
+                remove_rides(connection, self.trips_table, self.first_ride_id)
+        self.connection_pool.close_all()
+
+    def summary(self):
+        """Achieved ride and point rate as text."""
+        elapsed = max(self.elapsed, 1e-9)
+        return (f"ingested {self.rides} rides ({self.points_inserted} points) in {self.elapsed:.1f}s, "
+                f"{self.rides / elapsed:.2f} rides/s (target {self.rate:g}), {self.points_inserted / elapsed:.0f} points/s, "
+                f"{self.errors} failed, {self.vacuums} autovacuum and {self.analyzes} autoanalyze runs")
@@ -0,0 +1,214 @@
+import json
+import math
+import os
+import sys
+
+# Percentiles reported at the end of a run
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+class LatencyHistogram:
+    """
+    High dynamic range histogram of latencies, in the spirit of HdrHistogram.
+
+    Latencies are recorded in microseconds into log-linear buckets: values below
+    sub_bucket_count are counted exactly, larger values share a bucket with all values that
+    agree in their significant_digits most significant decimal digits. Percentiles are
+    therefore accurate to 10^-significant_digits relative to the value, from microseconds
+    to hours, with a few thousand buckets at most. Only buckets that were hit are stored,
+    so histograms of different threads, processes or runs can be added with merge.
+
+    :param significant_digits: Decimal digits of precision, between 1 and 5.
+    """
+
+    def __init__(self, significant_digits=3):
+        if not 1 <= significant_digits <= 5:
+            raise ValueError("significant_digits has to be between 1 and 5.")
+        self.significant_digits = significant_digits
+        # values with the same sub bucket share one bucket, 2 * 10^digits rounded up to a power of two
+        self.sub_bucket_bits = math.ceil(math.log2(2 * 10 ** significant_digits))
+        self.sub_bucket_count = 1 << self.sub_bucket_bits
+        self.counts = {}
+        self.total_count = 0
+        self.total_micros = 0
+        self.min_micros = None
+        self.max_micros = 0
+
+    def _bucket(self, micros):
+        exponent = max(micros.bit_length() - self.sub_bucket_bits, 0)
+        return exponent * self.sub_bucket_count + (micros >> exponent)
+
+    def _highest_equivalent(self, bucket):
+        exponent, sub_bucket = divmod(bucket, self.sub_bucket_count)
+        return ((sub_bucket + 1) << exponent) - 1
+
+    def record(self, seconds, count=1):
+        """Records a latency given in seconds, count times."""
+        micros = max(int(round(seconds * 1_000_000)), 0)
+        bucket = self._bucket(micros)
+        self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total_count += count
+        self.total_micros += micros * count
+        if self.min_micros is None or micros < self.min_micros:
+            self.min_micros = micros
+        if micros > self.max_micros:
+            self.max_micros = micros
+
+    def merge(self, other):
+        """Adds all values recorded in other, which needs the same number of significant digits."""
+        if other.significant_digits != self.significant_digits:
+            raise ValueError("Only histograms with the same number of significant digits can be merged.")
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total_count += other.total_count
+        self.total_micros += other.total_micros
+        if other.min_micros is not None and (self.min_micros is None or other.min_micros < self.min_micros):
+            self.min_micros = other.min_micros
+        self.max_micros = max(self.max_micros, other.max_micros)
+
+    def corrected(self, expected_interval):
+        """
+        Returns a copy corrected for coordinated omission, like HdrHistogram's
+        copyCorrectedForCoordinatedOmission.
+
+        A closed-loop worker that waits for a slow request does not send the requests it
+        would have sent in the meantime, so a stall is recorded once instead of once per
+        missed request. For every latency larger than expected_interval (the usual time
+        between two requests of one worker) the missing requests are added, with latencies
+        decreasing by expected_interval each.
+
+        :param expected_interval: Expected seconds between two requests of a worker.
+        """
+        if expected_interval <= 0:
+            raise ValueError("The expected interval has to be greater than 0.")
+        interval = int(round(expected_interval * 1_000_000))
+        corrected = LatencyHistogram(self.significant_digits)
+        for bucket, count in self.counts.items():
+            micros = min(self._highest_equivalent(bucket), self.max_micros)
+            corrected.record(micros / 1_000_000, count)
+            missing = micros - interval
+            while interval and missing >= interval:
+                corrected.record(missing / 1_000_000, count)
+                missing -= interval
+        return corrected
+
+    def percentile(self, percentile):
+        """Latency in seconds that percentile percent of all recorded latencies are at or below."""
+        if not self.total_count:
+            return 0.0
+        if percentile >= 100.0:
+            return self.max_micros / 1_000_000
+        rank = max(math.ceil(percentile / 100.0 * self.total_count), 1)
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self._highest_equivalent(bucket), self.max_micros) / 1_000_000
+        return self.max_micros / 1_000_000
+
+    def mean(self):
+        """Mean latency in seconds."""
+        return self.total_micros / self.total_count / 1_000_000 if self.total_count else 0.0
+
+    def max(self):
+        """Largest recorded latency in seconds, exact."""
+        return self.max_micros / 1_000_000
+
+    def to_dict(self):
+        return {
+            "significant_digits": self.significant_digits,
+            "total_count": self.total_count,
+            "total_micros": self.total_micros,
+            "min_micros": self.min_micros,
+            "max_micros": self.max_micros,
+            "counts": {str(bucket): count for bucket, count in sorted(self.counts.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data["significant_digits"])
+        histogram.counts = {int(bucket): count for bucket, count in data["counts"].items()}
+        histogram.total_count = data["total_count"]
+        histogram.total_micros = data["total_micros"]
+        histogram.min_micros = data["min_micros"]
+        histogram.max_micros = data["max_micros"]
+        return histogram
+
+
+class HistogramSet:
+    """One LatencyHistogram per query type."""
+
+    def __init__(self, significant_digits=3):
+        self.significant_digits = significant_digits
+        self.histograms = {}
+
+    def get(self, query_type):
+        histogram = self.histograms.get(query_type)
+        if histogram is None:
+            histogram = self.histograms[query_type] = LatencyHistogram(self.significant_digits)
+        return histogram
+
+    def record(self, query_type, seconds):
+        self.get(query_type).record(seconds)
+
+    def merge(self, other):
+        for query_type, histogram in other.histograms.items():
+            self.get(query_type).merge(histogram)
+
+    def summary(self):
+        """Returns the count, mean, percentiles (see PERCENTILES) and max of every query type as text."""
+        lines = [f"{'query_type':<45}{'count':>8}{'mean':>10}" + "".join(f"{'p' + format(p, 'g'):>10}" for p in PERCENTILES) + f"{'max':>10}"]
+        for query_type, histogram in sorted(self.histograms.items()):
+            lines.append(
+                f"{query_type:<45}{histogram.total_count:>8}{histogram.mean():>10.4f}"
+                + "".join(f"{histogram.percentile(p):>10.4f}" for p in PERCENTILES)
+                + f"{histogram.max():>10.4f}"
+            )
+        return "\n".join(lines)
+
+    def to_dict(self):
+        return {query_type: histogram.to_dict() for query_type, histogram in self.histograms.items()}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram_set = cls()
+        for query_type, histogram in data.items():
+            histogram_set.histograms[query_type] = LatencyHistogram.from_dict(histogram)
+            histogram_set.significant_digits = histogram_set.histograms[query_type].significant_digits
+        return histogram_set
+
+
+def load_runs(path):
+    """Reads a histogram file written by save_run, returns a dict of run id -> HistogramSet."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return {run_id: HistogramSet.from_dict(data) for run_id, data in json.load(file).items()}
+
+
+def save_run(path, run_id, histogram_set):
+    """Adds (or replaces) the histograms of one run in the histogram file at path."""
+    data = {}
+    if os.path.exists(path):
+        with open(path) as file:
+            data = json.load(file)
+    data[run_id] = histogram_set.to_dict()
+    with open(path, "w") as file:
+        json.dump(data, file)
+
+
+if __name__ == "__main__":
+    # Prints the percentiles of a histogram file, either of the given runs merged or of every run
+    if len(sys.argv) < 2:
+        print("Usage: python latencyHistogram.py <histogram_file> [run_id ...]")
+        sys.exit(1)
+    runs = load_runs(sys.argv[1])
+    if len(sys.argv) > 2:
+        merged = HistogramSet()
+        for run_id in sys.argv[2:]:
+            merged.merge(runs[run_id])
+        print(merged.summary())
+    else:
+        for run_id, histogram_set in runs.items():
+            print(f"Run {run_id}")
+            print(histogram_set.summary())
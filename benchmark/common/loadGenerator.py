@@ -0,0 +1,236 @@
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import ThreadPoolExecutor
+
+# Arrival processes for open-loop runs
+CONSTANT = "constant"
+POISSON = "poisson"
+ARRIVAL_PROCESSES = (CONSTANT, POISSON)
+
+# Per-thread state of the benchmark workers
+_worker_state = threading.local()
+# Id of the closed-loop worker (thread) or simulated client (asyncio task) running the current request
+_worker_id = contextvars.ContextVar("worker_id", default=-1)
+# Wall clock time an open-loop request was meant to be sent at, None outside of open-loop runs
+_intended_start = contextvars.ContextVar("intended_start", default=None)
+# Generator of the simulated asyncio client running the current request, clients share one thread
+_client_rng = contextvars.ContextVar("client_rng", default=None)
+
+
+def worker_rng():
+    """
+    Returns the random.Random instance of the calling worker thread.
+
+    Closed-loop workers get a (optionally seeded) generator when they start and keep it for
+    the whole run, as do the simulated clients of asyncDriver.run_async_closed_loop, which
+    share the thread of their event loop. Any other thread gets its own unseeded generator
+    on first use, so query parameters never contend on the lock of the global random module.
+    """
+    rng = getattr(_worker_state, "fixed_rng", None) or _client_rng.get() or getattr(_worker_state, "rng", None)
+    if rng is None:
+        rng = _worker_state.rng = random.Random()
+    return rng
+
+
+@contextmanager
+def fixed_worker_rng(rng):
+    """Makes worker_rng() return rng in the calling thread inside the block, e.g. to replay a request."""
+    _worker_state.fixed_rng = rng
+    try:
+        yield rng
+    finally:
+        _worker_state.fixed_rng = None
+
+
+def current_worker_id():
+    """Returns the id of the calling closed-loop worker or client, -1 outside of closed-loop runs."""
+    return _worker_id.get()
+
+
+def current_intended_start():
+    """
+    Returns the wall clock time the current open-loop request was scheduled for, or None.
+
+    Latencies measured from this time instead of the actual start include the time the
+    request waited for a free worker, so a stalled system cannot hide its slow period by
+    delaying the requests that would have measured it (coordinated omission).
+    """
+    return _intended_start.get()
+
+
+def arrival_offsets(rate, duration, arrival=CONSTANT, rng=None):
+    """
+    Generates the intended send times of an open-loop run.
+
+    :param rate: Target number of requests per second.
+    :param duration: Length of the run in seconds.
+    :param arrival: "constant" for evenly spaced requests, "poisson" for exponentially distributed gaps.
+    :param rng: random.Random instance used for Poisson arrivals.
+    :return: Generator of offsets in seconds, relative to the start of the run.
+    """
+    if rate <= 0:
+        raise ValueError("The target rate has to be greater than 0.")
+    if arrival not in ARRIVAL_PROCESSES:
+        raise ValueError(f"Unknown arrival process '{arrival}', expected one of {ARRIVAL_PROCESSES}.")
+
+    rng = rng or random.Random()
+    offset = 0.0
+    count = 0
+    while offset < duration:
+        yield offset
+        count += 1
+        if arrival == CONSTANT:
+            offset = count / rate
+        else:
+            offset += rng.expovariate(rate)
+
+
+def run_open_loop(task, rate, duration, arrival=CONSTANT, max_workers=64, seed=None, stop=None):
+    """
+    Calls task at a target rate for a fixed duration, independently of how long each call takes.
+
+    A scheduler thread sleeps until the intended send time of each request and hands it to a
+    thread pool. If all max_workers threads are busy, the request waits in the client queue,
+    so the difference between intended and actual start shows where queueing begins.
+
+    :param task: Function without arguments, e.g. a lambda calling execute_query.
+    :param rate: Target number of requests per second.
+    :param duration: Length of the run in seconds.
+    :param arrival: "constant" or "poisson".
+    :param max_workers: Maximum number of requests in flight at the same time.
+    :param seed: Seed for the Poisson arrival process.
+    :param stop: Optional threading.Event that ends the run before the duration passed.
+    :return: List of (scheduled, started, finished) wall clock timestamps, one per request.
+    """
+    records = []
+    records_lock = threading.Lock()
+
+    def timed_task(scheduled):
+        _intended_start.set(scheduled)
+        started = time.time()
+        try:
+            task()
+        except Exception as error:
+            print("Error in open-loop request:", error)
+        finally:
+            finished = time.time()
+            with records_lock:
+                records.append((scheduled, started, finished))
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="open-loop")
+    run_start_wall = time.time()
+    run_start = time.perf_counter()
+    try:
+        for offset in arrival_offsets(rate, duration, arrival, random.Random(seed)):
+            delay = run_start + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if stop is not None and stop.is_set():
+                break
+            executor.submit(timed_task, run_start_wall + offset)
+    finally:
+        executor.shutdown(wait=True)
+    return records
+
+
+def run_closed_loop(task, workers, duration=None, iterations=None, think_time=0.0, worker_context=None, seed=None, first_worker_id=0,
+                    stop=None):
+    """
+    Runs a fixed set of long-lived workers that each call task in a loop.
+
+    Every worker issues its next request as soon as the previous one (plus the think time)
+    finished, until the duration has passed or it completed the given number of iterations.
+    Workers keep their random generator (see worker_rng) and, if worker_context is given,
+    stay inside that context for the whole run, e.g. connection_pool.connection to hold one
+    persistent connection per worker.
+
+    :param task: Function without arguments, e.g. a lambda calling execute_query.
+    :param workers: Number of worker threads.
+    :param duration: Wall clock seconds to run for, None to only limit by iterations.
+    :param iterations: Requests per worker, None to only limit by duration.
+    :param think_time: Seconds a worker pauses after each request.
+    :param worker_context: Function returning a context manager each worker runs in.
+    :param seed: Base seed, the worker with id i uses seed + i. None for unseeded generators.
+    :param first_worker_id: Id of the first worker, the others are numbered consecutively.
+    :param stop: Optional threading.Event that ends the run before the duration passed.
+    :return: List of (worker_id, started, finished) wall clock timestamps, one per request.
+    """
+    if duration is None and iterations is None:
+        raise ValueError("A closed-loop run needs a duration, a number of iterations or both.")
+
+    records = []
+    records_lock = threading.Lock()
+    deadline = None if duration is None else time.perf_counter() + duration
+
+    def worker(worker_id):
+        _worker_id.set(worker_id)
+        _worker_state.rng = random.Random(None if seed is None else seed + worker_id)
+        worker_records = []
+        try:
+            with (worker_context() if worker_context else nullcontext()):
+                while iterations is None or len(worker_records) < iterations:
+                    if deadline is not None and time.perf_counter() >= deadline:
+                        break
+                    if stop is not None and stop.is_set():
+                        break
+                    started = time.time()
+                    try:
+                        task()
+                    except Exception as error:
+                        print(f"Error in closed-loop worker {worker_id}:", error)
+                    worker_records.append((worker_id, started, time.time()))
+                    if think_time:
+                        time.sleep(think_time)
+        except Exception as error:
+            print(f"Closed-loop worker {worker_id} stopped:", error)
+        finally:
+            with records_lock:
+                records.extend(worker_records)
+
+    threads = [
+        threading.Thread(target=worker, args=(i,), name=f"closed-loop-{i}")
+        for i in range(first_worker_id, first_worker_id + workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return records
+
+
+def summarize_closed_loop(label, records, workers):
+    """Prints the steady-state throughput and latency of a closed-loop run."""
+    if not records:
+        print(f"{label}: no requests were completed")
+        return
+    latencies = sorted(finished - started for _, started, finished in records)
+    elapsed = max(finished for _, _, finished in records) - min(started for _, started, _ in records)
+    print(
+        f"{label}: {workers} workers, {len(records)} requests in {elapsed:.1f}s, "
+        f"throughput {len(records) / elapsed:.2f}/s, "
+        f"latency mean {sum(latencies) / len(latencies):.4f}s max {latencies[-1]:.4f}s"
+    )
+
+
+def summarize_open_loop(label, records, rate, duration):
+    """
+    Prints the achieved throughput, client queueing delay, service time and response time
+    (from the intended send time to the end) of an open-loop run.
+    """
+    if not records:
+        print(f"{label}: no requests were issued")
+        return
+    queue_delays = sorted(started - scheduled for scheduled, started, _ in records)
+    service_times = sorted(finished - started for _, started, finished in records)
+    response_times = sorted(finished - scheduled for scheduled, _, finished in records)
+    elapsed = max(finished for _, _, finished in records) - min(scheduled for scheduled, _, _ in records)
+    print(
+        f"{label}: target {rate:.1f}/s for {duration}s, issued {len(records)}, "
+        f"achieved {len(records) / elapsed:.1f}/s, "
+        f"queue delay mean {sum(queue_delays) / len(queue_delays):.4f}s max {queue_delays[-1]:.4f}s, "
+        f"service time mean {sum(service_times) / len(service_times):.4f}s max {service_times[-1]:.4f}s, "
+        f"response time mean {sum(response_times) / len(response_times):.4f}s max {response_times[-1]:.4f}s"
+    )
@@ -0,0 +1,156 @@
+import collections
+import threading
+from datetime import datetime
+
+from parameterCorpus import BERLIN
+
+# Parameters generated per block, a stream is refilled once fewer than REFILL_BLOCKS blocks are left
+DEFAULT_BLOCK_SIZE = 4096
+REFILL_BLOCKS = 2
+# Styles of the time windows: datetime objects (query parameters) or ISO 8601 literals (CQL)
+DATETIME = "datetime"
+ISO = "iso"
+
+
+class ParameterBatches:
+    """
+    Query parameters generated in blocks with NumPy and refilled in the background.
+
+    Drawing parameters one by one (random.uniform per coordinate, strptime and strftime per
+    time window) costs microseconds per query, which at tens of thousands of queries per
+    second shows up next to the queries themselves. Here every kind of parameter is a stream:
+    positions, integers or floats from a range, time windows of a period and length. A
+    stream holds ready parameters in a deque, so taking one is a popleft without a lock. A
+    background thread generates the next block of a stream, as whole arrays with the time
+    windows already converted, once it runs low, so building a request only takes values.
+    If a stream runs dry anyway the caller generates a block itself, these misses are
+    counted (besides the first block of every stream).
+
+    All streams draw from one generator seeded with seed, so a seeded run draws the same
+    parameters, though which worker gets which of them depends on scheduling.
+
+    :param block_size: Parameters per block.
+    :param seed: Seed of the generator, None for a random one.
+    """
+
+    def __init__(self, block_size=DEFAULT_BLOCK_SIZE, seed=None):
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("Batched parameter generation (--batch-parameters) needs numpy.")
+        self.numpy = numpy
+        self.block_size = block_size
+        self.misses = 0
+        self._rng = numpy.random.default_rng(seed)
+        self._rng_lock = threading.Lock()
+        self._streams = {}
+        self._streams_lock = threading.Lock()
+        # streams waiting for the background thread
+        self._low = collections.deque()
+        self._pending = set()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="parameter-batches", daemon=True)
+        self._thread.start()
+
+    def _generate(self, key):
+        """One block of parameters of the stream key, as a list."""
+        kind = key[0]
+        size = self.block_size
+        if kind == "window":
+            # the period is parsed once per block instead of once per window
+            period_start = self.numpy.datetime64(key[1].replace(" ", "T"), "s")
+            latest_start = self.numpy.datetime64(key[2].replace(" ", "T"), "s") - self.numpy.timedelta64(key[3], "s")
+            if latest_start < period_start:
+                raise ValueError("The specified duration exceeds the total period duration.")
+            span = int((latest_start - period_start) // self.numpy.timedelta64(1, "s"))
+        with self._rng_lock:
+            if kind == "position":
+                longitudes = self._rng.uniform(BERLIN[0], BERLIN[2], size)
+                latitudes = self._rng.uniform(BERLIN[1], BERLIN[3], size)
+            elif kind == "integer":
+                values = self._rng.integers(key[1], key[2], size, endpoint=True)
+            elif kind == "uniform":
+                values = self._rng.uniform(key[1], key[2], size)
+            elif kind == "window":
+                offsets = self._rng.integers(0, span, size, endpoint=True)
+            else:
+                raise ValueError(f"Unknown parameter stream {key}")
+        if kind == "position":
+            return list(zip(longitudes.tolist(), latitudes.tolist()))
+        if kind != "window":
+            return values.tolist()
+        starts = period_start + offsets.astype("timedelta64[s]")
+        ends = starts + self.numpy.timedelta64(key[3], "s")
+        if key[4] == ISO:
+            return list(zip(
+                (value + "Z" for value in self.numpy.datetime_as_string(starts, unit="s").tolist()),
+                (value + "Z" for value in self.numpy.datetime_as_string(ends, unit="s").tolist()),
+            ))
+        return list(zip(starts.astype(datetime).tolist(), ends.astype(datetime).tolist()))
+
+    def _take(self, key):
+        stream = self._streams.get(key)
+        first = stream is None
+        if first:
+            with self._streams_lock:
+                stream = self._streams.setdefault(key, collections.deque())
+        try:
+            value = stream.popleft()
+        except IndexError:
+            # the first block of a stream is always generated by its first caller
+            if not first:
+                self.misses += 1
+            block = self._generate(key)
+            value = block.pop()
+            stream.extend(block)
+        if len(stream) < REFILL_BLOCKS * self.block_size and key not in self._pending:
+            self._pending.add(key)
+            self._low.append(key)
+            self._wake.set()
+        return value
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait()
+            if self._stop.is_set():
+                return
+            self._wake.clear()
+            while self._low:
+                key = self._low.popleft()
+                stream = self._streams[key]
+                try:
+                    while len(stream) < REFILL_BLOCKS * self.block_size:
+                        stream.extend(self._generate(key))
+                except Exception as error:
+                    print("Error generating parameters:", error)
+                finally:
+                    self._pending.discard(key)
+
+    def position(self):
+        """A random position in Berlin as (longitude, latitude)."""
+        return self._take(("position",))
+
+    def integer(self, low, high):
+        """A random integer in [low, high], like random.randint."""
+        return self._take(("integer", low, high))
+
+    def uniform(self, low, high):
+        """A random float in [low, high), like random.uniform."""
+        return self._take(("uniform", low, high))
+
+    def time_window(self, period_start, period_end, length, style=DATETIME):
+        """
+        Start and end of a random time window of length (a timedelta) within the period, as
+        datetime objects or ISO 8601 literals ('YYYY-MM-DDTHH:MM:SSZ').
+
+        :param period_start: Start of the period, 'YYYY-MM-DD HH:MM:SS'.
+        :param period_end: End of the period, 'YYYY-MM-DD HH:MM:SS'.
+        """
+        return self._take(("window", period_start, period_end, int(length.total_seconds()), style))
+
+    def close(self):
+        """Stops the background thread."""
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
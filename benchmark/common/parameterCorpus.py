@@ -0,0 +1,212 @@
+import argparse
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+from loadGenerator import fixed_worker_rng
+from workloadSpec import load_workload_spec
+
+# Version of the corpus file format and of the way entries are drawn, a corpus of another
+# version is rejected instead of being replayed differently
+CORPUS_VERSION = 1
+MANIFEST = "manifest.json"
+
+# Bounds of the random positions (Berlin): min longitude, min latitude, max longitude, max latitude
+BERLIN = (13.088346, 52.338049, 13.761160, 52.675454)
+# Draws stored per entry, more than any query type uses
+POSITIONS_PER_ENTRY = 4
+TIME_FRACTIONS_PER_ENTRY = 2
+# Category prefixes of the SimRa query types, without them the names match the mini benchmarks
+CATEGORY_PREFIXES = ("spatiotemporal_", "spatial_", "temporal_")
+
+# Parameters of one request: random positions, the position of random time intervals within
+# the period (0 is its start, 1 its latest possible start) and the seed of all other draws
+CorpusEntry = namedtuple("CorpusEntry", ["seed", "positions", "time_fractions"])
+
+# Entry the calling thread is building a request from, see ParameterCorpus.replay
+_replay = threading.local()
+
+
+def corpus_key(query_type):
+    """
+    Name a query type is stored under in a corpus. The category prefix of the SimRa query
+    types is dropped, so e.g. spatial_surrounding (MobilityDB) and surrounding (GeoMesa)
+    replay the same positions and time windows.
+    """
+    for prefix in CATEGORY_PREFIXES:
+        if query_type.startswith(prefix):
+            return query_type[len(prefix):]
+    return query_type
+
+
+def generate_entries(key, requests, seed):
+    """Draws the entries of one query type, they only depend on the key, the seed and the version."""
+    rng = random.Random(f"{CORPUS_VERSION}:{seed}:{key}")
+    entries = []
+    for _ in range(requests):
+        entries.append(CorpusEntry(
+            rng.getrandbits(32),
+            [(rng.uniform(BERLIN[0], BERLIN[2]), rng.uniform(BERLIN[1], BERLIN[3])) for _ in range(POSITIONS_PER_ENTRY)],
+            [rng.random() for _ in range(TIME_FRACTIONS_PER_ENTRY)],
+        ))
+    return entries
+
+
+def write_corpus(directory, query_types, requests, seed):
+    """
+    Writes a corpus: one file <key>.json with the entries of every query type and a
+    manifest with the version, seed and size of the corpus.
+    """
+    os.makedirs(directory, exist_ok=True)
+    keys = sorted({corpus_key(query_type) for query_type in query_types})
+    for key in keys:
+        entries = generate_entries(key, requests, seed)
+        with open(os.path.join(directory, f"{key}.json"), "w") as file:
+            json.dump({
+                "version": CORPUS_VERSION,
+                "query_type": key,
+                "seed": seed,
+                "entries": [entry._asdict() for entry in entries],
+            }, file)
+    with open(os.path.join(directory, MANIFEST), "w") as file:
+        json.dump({
+            "version": CORPUS_VERSION,
+            "seed": seed,
+            "requests": requests,
+            "query_types": keys,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }, file, indent=2)
+    return keys
+
+
+class ParameterCorpus:
+    """
+    Replays the parameters of a corpus written by write_corpus, in order.
+
+    The n-th request of a query type is built from the n-th entry of its file, after the
+    last entry the corpus starts over. While a request is built (replay), the random
+    positions and time intervals of the drivers come from the entry (draw_position,
+    draw_seconds) and worker_rng() is seeded with the entry's seed, so all other
+    parameters are the same in every run as well.
+
+    Driver processes that split a run (processDriver.py) pass their index as start and the
+    number of processes as step, so together they replay every entry once.
+
+    :param directory: Directory of the corpus.
+    :param start: Index of the first entry replayed.
+    :param step: Distance between the entries replayed.
+    """
+
+    def __init__(self, directory, start=0, step=1):
+        self.directory = directory
+        self.start = start
+        self.step = step
+        with open(os.path.join(directory, MANIFEST)) as file:
+            self.manifest = json.load(file)
+        self._check_version(self.manifest, MANIFEST)
+        self._entries = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _check_version(data, name):
+        if data.get("version") != CORPUS_VERSION:
+            raise ValueError(f"{name} is a corpus of version {data.get('version')}, expected version {CORPUS_VERSION}.")
+
+    def load(self, query_types):
+        """Loads the entries of the query types, raises a ValueError naming the ones the corpus does not have."""
+        keys = {corpus_key(query_type) for query_type in query_types}
+        missing = sorted(key for key in keys if not os.path.exists(os.path.join(self.directory, f"{key}.json")))
+        if missing:
+            raise ValueError(f"The corpus {self.directory} has no parameters for {missing}.")
+        for key in keys - set(self._entries):
+            with open(os.path.join(self.directory, f"{key}.json")) as file:
+                data = json.load(file)
+            self._check_version(data, f"{key}.json")
+            self._entries[key] = [
+                CorpusEntry(entry["seed"], [tuple(position) for position in entry["positions"]], entry["time_fractions"])
+                for entry in data["entries"]
+            ]
+            self._counters[key] = itertools.count(self.start, self.step)
+
+    def next_entry(self, query_type):
+        """The entry of the next request of query_type."""
+        key = corpus_key(query_type)
+        with self._lock:
+            if key not in self._entries:
+                self.load([query_type])
+            index = next(self._counters[key])
+        entries = self._entries[key]
+        return entries[index % len(entries)]
+
+    @contextmanager
+    def replay(self, query_type):
+        """Builds the request inside the block from the next entry of query_type."""
+        entry = self.next_entry(query_type)
+        _replay.state = [entry, 0, 0]
+        try:
+            with fixed_worker_rng(random.Random(entry.seed)):
+                yield entry
+        finally:
+            _replay.state = None
+
+
+def replayed_position():
+    """The next position of the replayed entry, None if no request is being replayed."""
+    state = getattr(_replay, "state", None)
+    if state is None:
+        return None
+    entry, position_index = state[0], state[1]
+    state[1] += 1
+    return entry.positions[position_index % len(entry.positions)]
+
+
+def draw_position(rng):
+    """A random position in Berlin as (longitude, latitude), from the replayed entry if there is one."""
+    position = replayed_position()
+    if position is not None:
+        return position
+    return rng.uniform(BERLIN[0], BERLIN[2]), rng.uniform(BERLIN[1], BERLIN[3])
+
+
+def draw_seconds(rng, max_seconds):
+    """
+    A random number of seconds in [0, max_seconds], e.g. the start of a time interval after
+    the start of the period. A replayed entry gives its position relative to max_seconds,
+    so the same corpus fits periods and interval lengths of any engine.
+    """
+    state = getattr(_replay, "state", None)
+    if state is None:
+        return rng.randint(0, max_seconds)
+    entry, fraction_index = state[0], state[2]
+    state[2] += 1
+    fraction = entry.time_fractions[fraction_index % len(entry.time_fractions)]
+    return min(int(fraction * (max_seconds + 1)), max_seconds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Writes a seeded parameter corpus that the benchmark drivers replay with --corpus."
+    )
+    parser.add_argument("directory", help="Directory the corpus is written to, e.g. corpus/berlin-v1-seed42")
+    parser.add_argument("--workload", action="append", default=[],
+                        help="Workload spec whose query types get parameters, can be given several times")
+    parser.add_argument("--query-types", nargs="*", default=[], help="Further query types")
+    parser.add_argument("--requests", type=int, default=1000, help="Parameter sets per query type")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the corpus")
+    options = parser.parse_args()
+
+    query_types = list(options.query_types)
+    for path in options.workload:
+        spec = load_workload_spec(path)
+        query_types += [query.query_type for workload in spec.workloads for query in workload.queries]
+    if not query_types:
+        parser.error("No query types, pass --workload or --query-types.")
+    keys = write_corpus(options.directory, query_types, options.requests, options.seed)
+    print(f"Wrote {options.requests} parameter sets of {len(keys)} query types (seed {options.seed}, "
+          f"version {CORPUS_VERSION}) to {options.directory}: {', '.join(keys)}")
@@ -0,0 +1,128 @@
+import psycopg2
+
+from connectionPool import ConnectionPool, POOLED
+from engineAdapter import EngineAdapter
+from queryTemplate import literal_query, numbered_query, execute_prepared, LITERAL, PREPARED
+from resultStream import stream_query, buffered_query, stream_query_async, DEFAULT_FETCH_SIZE, STREAMED, BUFFERED
+
+
+class PostgresAdapter(EngineAdapter):
+    """
+    Adapter for engines that speak the PostgreSQL protocol.
+
+    Requests are (template, params) tuples of a queryTemplate template. The threaded backend
+    takes psycopg2 connections from a ConnectionPool and streams results through a
+    server-side cursor, or runs the template as a prepared statement (execution "prepared").
+    A prepared statement cannot be declared as a cursor, its result is buffered by the
+    client; with result_transfer "buffered" literal queries are buffered the same way, so
+    the two execution modes only differ in parsing and planning. Their measurements are
+    logged with the execution mode literal_buffered.
+    The asyncio backend uses an asyncpg pool, which is only imported when it is connected.
+
+    :param connect_kwargs: Keyword arguments of psycopg2.connect (dbname, user, password, host, port).
+    :param pool_size: Connections of the psycopg2 pool and of the asyncpg pool.
+    :param mode: Connection mode of the psycopg2 pool, "pooled" or "per_query".
+    :param reconnect: Replace lost pooled connections.
+    :param fetch_size: Rows transferred per round trip.
+    :param execution: "literal" or "prepared", see queryTemplate.py.
+    :param plan_cache_mode: PostgreSQL plan_cache_mode of the connections, None for the server setting.
+    :param result_transfer: "streamed" or "buffered", how the threaded backend transfers literal results.
+    """
+
+    async_connection_mode = "async_pooled"
+
+    def __init__(self, connect_kwargs, pool_size=4, mode=POOLED, reconnect=True, fetch_size=DEFAULT_FETCH_SIZE,
+                 execution=LITERAL, plan_cache_mode=None, result_transfer=STREAMED):
+        self.connect_kwargs = dict(connect_kwargs)
+        if plan_cache_mode:
+            self.connect_kwargs["options"] = f"-c plan_cache_mode={plan_cache_mode}"
+        self.pool_size = pool_size
+        self.mode = mode
+        self.reconnect = reconnect
+        self.fetch_size = fetch_size
+        self.execution = execution
+        self.result_transfer = result_transfer
+        self.execution_mode = f"{LITERAL}_{BUFFERED}" if execution == LITERAL and result_transfer == BUFFERED else execution
+        self.plan_cache_mode = plan_cache_mode
+        self.connection_pool = None
+        self.async_pool = None
+
+    @property
+    def connection_mode(self):
+        return self.mode
+
+    def connect(self):
+        self.connection_pool = ConnectionPool(self.connect_kwargs, self.pool_size, self.mode, self.reconnect)
+
+    def execute(self, request):
+        template, params = request
+        with self.connection_pool.connection() as connection:
+            try:
+                if self.execution == PREPARED:
+                    return execute_prepared(connection, template, params, self.fetch_size)
+                if self.result_transfer == BUFFERED:
+                    return buffered_query(connection, literal_query(template, params), self.fetch_size)
+                return stream_query(connection, literal_query(template, params), self.fetch_size)
+            finally:
+                # end the read transaction of every query, a closed-loop worker holds its pooled
+                # connection for the whole run and would otherwise sit idle in transaction, keeping
+                # one snapshot that holds back vacuum
+                if not connection.closed:
+                    try:
+                        connection.rollback()
+                    except psycopg2.Error:
+                        pass
+
+    def close(self):
+        if self.connection_pool is not None:
+            self.connection_pool.close_all()
+
+    async def connect_async(self):
+        import asyncpg
+        # literal queries inline their parameters, caching them would only fill the statement cache
+        statement_cache_size = 0 if self.execution == LITERAL else 100
+        server_settings = {"plan_cache_mode": self.plan_cache_mode} if self.plan_cache_mode else None
+        self.async_pool = await asyncpg.create_pool(
+            host=self.connect_kwargs.get("host"), port=self.connect_kwargs.get("port"),
+            user=self.connect_kwargs.get("user"), password=self.connect_kwargs.get("password"),
+            database=self.connect_kwargs.get("dbname"),
+            min_size=self.pool_size, max_size=self.pool_size, statement_cache_size=statement_cache_size,
+            server_settings=server_settings
+        )
+
+    async def execute_async(self, request):
+        template, params = request
+        # in prepared mode the parameters are passed separately and asyncpg's statement cache
+        # keeps one prepared statement per template and connection
+        if self.execution == PREPARED:
+            query, args = numbered_query(template, params)
+        else:
+            query, args = literal_query(template, params), ()
+        async with self.async_pool.acquire() as connection:
+            return await stream_query_async(connection, query, self.fetch_size, args)
+
+    async def close_async(self):
+        if self.async_pool is not None:
+            await self.async_pool.close()
+
+    def last_connect_duration(self):
+        return self.connection_pool.last_connect_duration()
+
+    def worker_context(self):
+        return self.connection_pool.connection()
+
+
+class MobilityDBAdapter(PostgresAdapter):
+    """PostgresAdapter for MobilityDB, PostgreSQL with the PostGIS and MobilityDB extensions."""
+
+    name = "mobilitydb"
+
+
+class PostGISAdapter(PostgresAdapter):
+    """PostgresAdapter for plain PostGIS, for the query types that do not need MobilityDB."""
+
+    name = "postgis"
+
+
+# Adapters by engine name, for the --engine option of the drivers
+ADAPTERS = {adapter.name: adapter for adapter in (MobilityDBAdapter, PostGISAdapter)}
@@ -0,0 +1,88 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+def split_evenly(total, parts, index):
+    """Share of total that part index gets when total is split into parts nearly equal pieces."""
+    return total // parts + (1 if index < total % parts else 0)
+
+
+def first_index(total, parts, index):
+    """Global index of the first item of part index, matching split_evenly."""
+    return sum(split_evenly(total, parts, i) for i in range(index))
+
+
+def part_file(path, index):
+    """Name of the file a driver process writes its share of path to, see merge_part_files."""
+    return f"{path}.part{index}"
+
+
+def wait_until(timestamp):
+    """
+    Sleeps until the given wall clock timestamp.
+
+    :return: Seconds the caller was late, 0.0 if the timestamp had not passed yet.
+    """
+    delay = timestamp - time.time()
+    if delay > 0:
+        time.sleep(delay)
+        return 0.0
+    return -delay
+
+
+def run_in_processes(shard_function, processes, shard_args=(), start_delay=2.0):
+    """
+    Runs one shard of a benchmark in each of several driver processes and merges the results.
+
+    Every process runs shard_function(shard_index, processes, start_at, *shard_args) and
+    has its own interpreter, so parameter generation, query building and result handling
+    of different shards do not contend on one GIL. Processes are started with "spawn":
+    nothing (connections, random state) is inherited from the parent, every shard opens its
+    own connections and seeds its own generators from shard_index. All shards wait until
+    the wall clock time start_at before sending load, so they start together once the
+    slower ones finished importing.
+
+    Records have to be tuples with the wall clock start time at index 1, as returned by
+    run_closed_loop and run_open_loop. time.time() is the same clock in all processes of
+    one client VM, so records can be merged without any conversion.
+
+    :param shard_function: Module level function (it is pickled) returning a list of records.
+    :param processes: Number of driver processes.
+    :param shard_args: Further arguments passed to every shard, have to be picklable.
+    :param start_delay: Seconds between starting the processes and start_at.
+    :return: The records of all shards, sorted by start time.
+    """
+    if processes < 1:
+        raise ValueError("At least one driver process is needed.")
+    if processes > os.cpu_count():
+        print(f"Warning: {processes} driver processes on {os.cpu_count()} cores")
+
+    start_at = time.time() + start_delay
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context) as executor:
+        futures = [executor.submit(shard_function, i, processes, start_at, *shard_args) for i in range(processes)]
+        records = []
+        for future in futures:
+            records.extend(future.result())
+    records.sort(key=lambda record: record[1])
+    return records
+
+
+def merge_part_files(path, processes, start_column):
+    """
+    Appends the CSV lines the driver processes wrote to their part files (see part_file)
+    to path, ordered by the start timestamp in start_column, and removes the part files.
+    """
+    lines = []
+    for index in range(processes):
+        part = part_file(path, index)
+        if not os.path.exists(part):
+            continue
+        with open(part) as file:
+            lines.extend(line for line in file if line.strip())
+        os.remove(part)
+    lines.sort(key=lambda line: float(line.split(",")[start_column]))
+    with open(path, "a") as file:
+        file.writelines(lines)
@@ -0,0 +1,72 @@
+import contextvars
+
+# Expected number of rows of the request the current thread or task built last, see expect_rows
+_expected_rows = contextvars.ContextVar("expected_rows", default=None)
+
+
+def expect_rows(rows):
+    """Called by a builder that knows about how many rows its request returns (see densityGrid.py), logged with it."""
+    _expected_rows.set(rows)
+
+
+def expected_rows():
+    """Expected number of rows of the request built last, None if its builder did not estimate it."""
+    return _expected_rows.get()
+
+
+class QueryRegistry:
+    """
+    The query types of one benchmark by name.
+
+    A query type is a builder function that takes the result limit and returns one request
+    with freshly drawn random parameters, in the form the engine adapter of the benchmark
+    executes (see engineAdapter.py). Builders are added with the register decorator:
+
+        QUERY_TYPES = QueryRegistry()
+
+        @QUERY_TYPES.register("spatial_surrounding")
+        def spatial_surrounding(limit):
+            ...
+            return template, params
+    """
+
+    def __init__(self):
+        self._builders = {}
+        self.corpus = None
+
+    def register(self, query_type):
+        """Decorator that registers a builder function under query_type."""
+        def decorator(builder):
+            if query_type in self._builders:
+                raise ValueError(f"Query type '{query_type}' is already registered.")
+            self._builders[query_type] = builder
+            return builder
+        return decorator
+
+    def build(self, query_type, limit):
+        """Returns a new request of query_type, with the next parameters of the corpus when replaying one."""
+        builder = self._builders.get(query_type)
+        if builder is None:
+            raise ValueError(f"Unknown query type '{query_type}'")
+        _expected_rows.set(None)
+        if self.corpus is None:
+            return builder(limit)
+        with self.corpus.replay(query_type):
+            return builder(limit)
+
+    def replay(self, corpus):
+        """Builds all further requests from the parameters of a parameterCorpus.ParameterCorpus."""
+        self.corpus = corpus
+
+    def query_types(self):
+        """Names of all registered query types, in the order they were registered."""
+        return list(self._builders)
+
+    def check(self, query_types):
+        """Raises a ValueError naming every query type in query_types that is not registered."""
+        unknown = [query_type for query_type in query_types if query_type not in self._builders]
+        if unknown:
+            raise ValueError(f"Unknown query types {unknown}, known are {self.query_types()}.")
+
+    def __contains__(self, query_type):
+        return query_type in self._builders
@@ -0,0 +1,117 @@
+import hashlib
+import re
+import time
+import weakref
+from datetime import date, datetime
+
+from resultStream import QueryTiming, consume_buffered, DEFAULT_FETCH_SIZE
+
+# Execution modes of a query template
+LITERAL = "literal"
+PREPARED = "prepared"
+EXECUTION_MODES = (LITERAL, PREPARED)
+
+# Named placeholders in the psycopg2 style, e.g. %(poslong)s
+_PLACEHOLDER = re.compile(r"%\((\w+)\)s")
+
+# Names of the statements prepared on each psycopg2 connection
+_prepared = weakref.WeakKeyDictionary()
+
+
+def sql_literal(value):
+    """Renders a parameter value as an SQL literal."""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, datetime):
+        return f"'{value.isoformat(sep=' ')}'"
+    if isinstance(value, date):
+        return f"'{value.isoformat()}'"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def parameter_type(value):
+    """PostgreSQL type a parameter value is declared as in a prepared statement."""
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "bigint"
+    if isinstance(value, float):
+        return "double precision"
+    if isinstance(value, datetime):
+        return "timestamp"
+    if isinstance(value, date):
+        return "date"
+    return "text"
+
+
+def literal_query(template, params):
+    """
+    Returns the template with every placeholder replaced by the literal of its parameter,
+    which is what the benchmark used to build with f-strings. The server parses and plans
+    each of these queries from scratch.
+    """
+    return _PLACEHOLDER.sub(lambda match: sql_literal(params[match.group(1)]), template)
+
+
+def numbered_query(template, params):
+    """
+    Converts the named placeholders of a template to the numbered ones of the server
+    ($1, $2, ...), in order of their first appearance.
+
+    :return: Tuple of the converted query and the list of parameter values in that order.
+    """
+    names = []
+
+    def number(match):
+        name = match.group(1)
+        if name not in names:
+            names.append(name)
+        return f"${names.index(name) + 1}"
+
+    query = _PLACEHOLDER.sub(number, template)
+    return query, [params[name] for name in names]
+
+
+def statement_name(template):
+    """Name a template is prepared under, the same for every connection and driver process."""
+    return "bench_" + hashlib.md5(template.encode()).hexdigest()[:16]
+
+
+def execute_prepared(connection, template, params, fetch_size=DEFAULT_FETCH_SIZE):
+    """
+    Runs a template as a server-side prepared statement on a psycopg2 connection.
+
+    The statement is prepared (PREPARE, with parameter types derived from the values) the
+    first time a connection runs the template, which is included in the timing of that
+    query, and executed with EXECUTE afterwards, so the server can reuse the parsed query
+    and, depending on plan_cache_mode, its plan. EXECUTE cannot be declared as a cursor,
+    so unlike stream_query the whole result is transferred by execute and then consumed
+    in batches of fetch_size rows from the client side buffer, as resultStream.buffered_query
+    does for literal queries.
+
+    :return: resultStream.QueryTiming of the query.
+    """
+    query, values = numbered_query(template, params)
+    name = statement_name(template)
+    prepared = _prepared.setdefault(connection, set())
+    cursor = connection.cursor()
+    try:
+        start = time.time()
+        if name not in prepared:
+            types = ", ".join(parameter_type(value) for value in values)
+            cursor.execute(f"PREPARE {name} ({types}) AS {query}" if values else f"PREPARE {name} AS {query}")
+            prepared.add(name)
+        if values:
+            cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(values))})", values)
+        else:
+            cursor.execute(f"EXECUTE {name}")
+        executed = time.time()
+        rows, size, fetch_duration = consume_buffered(cursor, fetch_size)
+        end = time.time()
+    finally:
+        cursor.close()
+    return QueryTiming(start, executed, executed, end, fetch_duration, rows, size)
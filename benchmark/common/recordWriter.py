@@ -0,0 +1,153 @@
+import collections
+import threading
+import time
+import uuid
+
+from latencyHistogram import HistogramSet
+from warmup import MEASURE
+
+# Columns of the durations files, in this order and without a header. The first columns are
+# the ones earlier versions of the benchmark wrote, so older files can be read with a prefix.
+FIELDS = (
+    "query_type", "limit", "start", "end", "duration", "connection_mode", "connect_duration",
+    "execute_duration", "first_row_duration", "fetch_duration", "rows", "bytes",
+    "run_id", "worker_id", "intended_start", "phase", "execution_mode",
+    "expected_rows",
+)
+
+
+def new_run_id():
+    """Returns an id for one benchmark run: start time plus a random suffix."""
+    return time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
+
+
+class RecordWriter:
+    """
+    Collects measurements in memory and writes them to a CSV file from a background thread.
+
+    Every thread that calls write appends to its own deque, so workers neither wait for
+    each other nor for the file system; appending to and popping from a deque is thread
+    safe without a lock. Every flush_interval seconds the writer thread drains all buffers
+    and writes their records in one batch, so lines of different workers cannot interleave.
+    Records are tuples in the order of FIELDS, the run id is added when the line is written.
+    The writer thread also records every latency into histograms, one latency histogram
+    per query type (see latencyHistogram.py), which are up to date after each flush. For
+    open-loop requests, which have an intended_start, the latency is measured from that
+    time, so time spent waiting for a free worker is not omitted. Query types with a
+    warm-up (see track_warmup) are tagged with their phase, and only measurements of the
+    measure phase are added to the histograms.
+
+    :param path: CSV file the records are appended to.
+    :param run_id: Id written with every record, see new_run_id.
+    :param flush_interval: Seconds between two batches.
+    """
+
+    def __init__(self, path, run_id, flush_interval=1.0):
+        self.path = path
+        self.run_id = run_id
+        self.flush_interval = flush_interval
+        self.records_written = 0
+        self.histograms = HistogramSet()
+        self.warmups = {}
+
+        self._buffers = []
+        self._buffers_lock = threading.Lock()
+        self._local = threading.local()
+        self._stop = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._file = open(path, "a")
+        self._thread = threading.Thread(target=self._run, name="record-writer", daemon=True)
+        self._thread.start()
+
+    def track_warmup(self, query_type, warmup):
+        """Tags the following records of query_type with the phase warmup (a warmup.Warmup) assigns."""
+        self.warmups[query_type] = warmup
+
+    def _buffer(self):
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._local.buffer = collections.deque()
+            # registering happens once per thread, the only time a worker takes a lock
+            with self._buffers_lock:
+                self._buffers.append((threading.current_thread(), buffer))
+        return buffer
+
+    def write(self, query_type, limit, start, end, duration, connection_mode, connect_duration,
+              execute_duration, first_row_duration, fetch_duration, rows, size, worker_id, intended_start=None,
+              execution_mode="literal", expected_rows=None):
+        """Buffers one measurement of the calling thread, see FIELDS. Durations are in seconds."""
+        self._buffer().append((
+            query_type, limit, start, end, duration, connection_mode, connect_duration,
+            execute_duration, first_row_duration, fetch_duration, rows, size, worker_id, intended_start,
+            execution_mode, expected_rows
+        ))
+
+    def _drain(self):
+        with self._buffers_lock:
+            buffers = list(self._buffers)
+            # buffers of finished threads are dropped once they are empty
+            self._buffers = [(thread, buffer) for thread, buffer in buffers if thread.is_alive() or buffer]
+        records = []
+        for _, buffer in buffers:
+            while True:
+                try:
+                    records.append(buffer.popleft())
+                except IndexError:
+                    break
+        return records
+
+    def flush(self):
+        """Writes all buffered records, called by the writer thread, on close or to update histograms."""
+        with self._flush_lock:
+            records = self._drain()
+            if not records:
+                return
+            # the warm-up detectors expect the requests in the order they finished
+            if self.warmups:
+                records.sort(key=lambda record: record[3])
+            run_id = str(self.run_id)
+            lines = []
+            for record in records:
+                query_type, start, end, duration, intended_start = record[0], record[2], record[3], record[4], record[13]
+                latency = duration if intended_start is None else end - intended_start
+                warmup = self.warmups.get(query_type)
+                phase = MEASURE if warmup is None else warmup.observe(start, end, latency)
+                if phase == MEASURE:
+                    self.histograms.record(query_type, latency)
+                lines.append(
+                    ",".join(map(str, record[:12]))
+                    + f",{run_id},{record[12]},{'' if intended_start is None else intended_start},{phase},{record[14]},"
+                    + f"{'' if record[15] is None else record[15]}\n"
+                )
+            self._file.writelines(lines)
+            self._file.flush()
+            self.records_written += len(records)
+
+    def corrected_histogram(self, query_type, expected_interval=None, think_time=0.0):
+        """
+        Writes the buffered records and returns the histogram of query_type corrected for
+        coordinated omission (see LatencyHistogram.corrected), for closed-loop runs. Without
+        an expected_interval a worker is expected to send its next request after the median
+        latency plus think_time.
+        """
+        self.flush()
+        histogram = self.histograms.get(query_type)
+        if expected_interval is None:
+            expected_interval = histogram.percentile(50) + think_time
+        if expected_interval <= 0:
+            return histogram
+        return histogram.corrected(expected_interval)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as error:
+                print("Error writing records:", error)
+
+    def close(self):
+        """Stops the writer thread and writes the remaining records."""
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+        self._file.close()
@@ -0,0 +1,141 @@
+import time
+from collections import namedtuple
+
+# Phases of one query: wall clock timestamps (time.time()) of the start, the return of execute,
+# the first fetched batch and the end, the seconds spent inside fetch calls, and the result size
+QueryTiming = namedtuple("QueryTiming", ["start", "executed", "first_row", "end", "fetch_duration", "rows", "bytes"])
+
+DEFAULT_FETCH_SIZE = 2000
+CURSOR_NAME = "benchmark_cursor"
+# How results are transferred: in batches from a server-side cursor, or in one piece into a client-side buffer
+STREAMED = "streamed"
+BUFFERED = "buffered"
+RESULT_TRANSFERS = (STREAMED, BUFFERED)
+
+
+def row_size(row):
+    """Approximate number of bytes of a row on the wire: the length of its values in text format."""
+    size = 0
+    for value in row:
+        if value is None:
+            continue
+        if isinstance(value, (str, bytes, memoryview)):
+            size += len(value)
+        else:
+            size += len(str(value))
+    return size
+
+
+def stream_query(connection, query, fetch_size=DEFAULT_FETCH_SIZE, params=None):
+    """
+    Runs a query through a server-side (named) psycopg2 cursor and consumes its result in
+    batches of fetch_size rows, which are counted and dropped.
+
+    On a named cursor execute only declares the cursor, the query itself runs when the first
+    batch is fetched, so first_row - start is the time to the first row and the client never
+    holds more than one batch. Only SELECT (and WITH ... SELECT) queries can be declared as a
+    cursor. The cursor lives in the current transaction, which the caller (or the connection
+    pool) has to end.
+
+    :param connection: Open psycopg2 connection, not in autocommit mode.
+    :param query: The query to run.
+    :param fetch_size: Rows transferred per round trip.
+    :param params: Optional query parameters, as for cursor.execute.
+    :return: QueryTiming of the query.
+    """
+    cursor = connection.cursor(name=CURSOR_NAME)
+    cursor.itersize = fetch_size
+    rows = 0
+    size = 0
+    fetch_duration = 0.0
+    first_row = None
+    try:
+        start = time.time()
+        cursor.execute(query, params)
+        executed = time.time()
+        while True:
+            fetch_start = time.time()
+            batch = cursor.fetchmany(fetch_size)
+            fetch_end = time.time()
+            fetch_duration += fetch_end - fetch_start
+            if first_row is None:
+                first_row = fetch_end
+            if not batch:
+                break
+            rows += len(batch)
+            size += sum(row_size(row) for row in batch)
+        end = time.time()
+    finally:
+        cursor.close()
+    return QueryTiming(start, executed, first_row, end, fetch_duration, rows, size)
+
+
+def consume_buffered(cursor, fetch_size=DEFAULT_FETCH_SIZE):
+    """
+    Consumes the result of a plain (client-side) psycopg2 cursor, which execute already
+    transferred in one piece, in batches of fetch_size rows that are counted and dropped.
+
+    :return: Tuple of the rows, their size and the seconds spent in fetch calls.
+    """
+    rows = 0
+    size = 0
+    fetch_duration = 0.0
+    while cursor.description is not None:
+        fetch_start = time.time()
+        batch = cursor.fetchmany(fetch_size)
+        fetch_duration += time.time() - fetch_start
+        if not batch:
+            break
+        rows += len(batch)
+        size += sum(row_size(row) for row in batch)
+    return rows, size, fetch_duration
+
+
+def buffered_query(connection, query, fetch_size=DEFAULT_FETCH_SIZE, params=None):
+    """
+    Runs a query through a plain psycopg2 cursor: execute runs the query and transfers its
+    whole result, as for a prepared statement (see queryTemplate.execute_prepared), so the
+    time to the first row is the time execute returned. Unlike stream_query the query is
+    planned for the whole result, not for a fast start as a cursor is.
+
+    :return: QueryTiming of the query.
+    """
+    cursor = connection.cursor()
+    try:
+        start = time.time()
+        cursor.execute(query, params)
+        executed = time.time()
+        rows, size, fetch_duration = consume_buffered(cursor, fetch_size)
+        end = time.time()
+    finally:
+        cursor.close()
+    return QueryTiming(start, executed, executed, end, fetch_duration, rows, size)
+
+
+async def stream_query_async(connection, query, fetch_size=DEFAULT_FETCH_SIZE, args=()):
+    """
+    asyncpg counterpart of stream_query: declares a cursor inside a transaction and fetches
+    its result in batches of fetch_size rows. asyncpg always runs queries as (unnamed or
+    cached) prepared statements, args are the values of their $1, $2, ... parameters.
+    """
+    rows = 0
+    size = 0
+    fetch_duration = 0.0
+    first_row = None
+    async with connection.transaction():
+        start = time.time()
+        cursor = await connection.cursor(query, *args)
+        executed = time.time()
+        while True:
+            fetch_start = time.time()
+            batch = await cursor.fetch(fetch_size)
+            fetch_end = time.time()
+            fetch_duration += fetch_end - fetch_start
+            if first_row is None:
+                first_row = fetch_end
+            if not batch:
+                break
+            rows += len(batch)
+            size += sum(row_size(row) for row in batch)
+        end = time.time()
+    return QueryTiming(start, executed, first_row, end, fetch_duration, rows, size)
@@ -0,0 +1,208 @@
+import argparse
+import bisect
+import csv
+import glob
+import json
+import math
+import os
+from datetime import datetime, timedelta
+
+from parameterCorpus import draw_seconds
+
+HISTOGRAM_VERSION = 1
+# Column of the timestamp in the prepared point files (merged*.csv)
+TIMESTAMP_COLUMN = 7
+DEFAULT_BUCKET_SECONDS = 3600
+# Name of the cached histogram next to the point files, see cached
+DEFAULT_FILE = "temporal_histogram.json"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+EPOCH = datetime(1970, 1, 1)
+# Steps of the random quantile a window is drawn at, drawn through draw_seconds so a parameter corpus replays it
+QUANTILE_STEPS = 1000000
+
+
+def parse_timestamp(value):
+    """Seconds since the epoch of a timestamp of the point files, 'YYYY-MM-DD HH:MM:SS[.fff]' or epoch milliseconds."""
+    try:
+        return float(value) / 1000
+    except ValueError:
+        return (datetime.fromisoformat(value) - EPOCH).total_seconds()
+
+
+def as_datetime(seconds):
+    return EPOCH + timedelta(seconds=round(seconds))
+
+
+def format_timestamp(seconds):
+    return as_datetime(seconds).strftime(TIMESTAMP_FORMAT)
+
+
+class TemporalHistogram:
+    """
+    Number of data points per time bucket, from the first to the last timestamp of the dataset.
+
+    The histogram gives the time extent of the data, which replaces the hard-coded period of
+    the drivers, and estimates how many points a time window contains, assuming the points
+    are spread evenly within a bucket. Time windows are drawn at a random quantile of the
+    data rather than uniformly over the period, so they land where the data is, and can be
+    sized to contain a target number of rows instead of having a fixed length. With a recent
+    skew windows end a random, exponentially distributed age before the end of the data, as
+    realtime queries ask for the latest data.
+
+    :param origin: Seconds since the epoch the first bucket starts at, a multiple of bucket_seconds.
+    :param first: Seconds since the epoch of the first timestamp.
+    :param last: Seconds since the epoch of the last timestamp.
+    :param bucket_seconds: Length of a bucket.
+    :param counts: Points per bucket.
+    """
+
+    def __init__(self, origin, first, last, bucket_seconds, counts):
+        self.origin = origin
+        self.first = first
+        self.last = last
+        self.bucket_seconds = bucket_seconds
+        self.counts = counts
+        self.points = sum(counts)
+        self._cumulative = [0]
+        for count in counts:
+            self._cumulative.append(self._cumulative[-1] + count)
+
+    @classmethod
+    def from_point_files(cls, paths, bucket_seconds=DEFAULT_BUCKET_SECONDS):
+        """Counts the timestamps of the prepared point files, rows without a valid timestamp are skipped."""
+        buckets = {}
+        first, last = math.inf, -math.inf
+        skipped = 0
+        for path in paths:
+            with open(path, newline="") as file:
+                for row in csv.reader(file):
+                    try:
+                        seconds = parse_timestamp(row[TIMESTAMP_COLUMN])
+                    except (IndexError, ValueError):
+                        skipped += 1
+                        continue
+                    first, last = min(first, seconds), max(last, seconds)
+                    bucket = int(seconds // bucket_seconds)
+                    buckets[bucket] = buckets.get(bucket, 0) + 1
+        if skipped:
+            print(f"Skipped {skipped} rows without a timestamp")
+        if not buckets:
+            raise ValueError(f"No timestamps in {list(paths)}.")
+        lowest = min(buckets)
+        counts = [buckets.get(bucket, 0) for bucket in range(lowest, max(buckets) + 1)]
+        return cls(lowest * bucket_seconds, first, last, bucket_seconds, counts)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as file:
+            data = json.load(file)
+        if data.get("version") != HISTOGRAM_VERSION:
+            raise ValueError(f"{path} is a temporal histogram of version {data.get('version')}, expected version {HISTOGRAM_VERSION}.")
+        return cls(data["origin"], data["first"], data["last"], data["bucket_seconds"], data["counts"])
+
+    def save(self, path, sources=()):
+        with open(path, "w") as file:
+            json.dump({
+                "version": HISTOGRAM_VERSION,
+                "origin": self.origin,
+                "first": self.first,
+                "last": self.last,
+                "start": format_timestamp(self.first),
+                "end": format_timestamp(self.last),
+                "bucket_seconds": self.bucket_seconds,
+                "points": self.points,
+                "sources": list(sources),
+                "counts": self.counts,
+            }, file)
+
+    @classmethod
+    def cached(cls, path, paths, bucket_seconds=DEFAULT_BUCKET_SECONDS):
+        """
+        Loads the histogram saved at path, or builds it from the point files and saves it
+        there if there is none yet or a point file changed since. Without point files the
+        saved histogram is used as it is.
+        """
+        if os.path.exists(path) and all(os.path.getmtime(source) <= os.path.getmtime(path) for source in paths):
+            return cls.load(path)
+        if not paths:
+            raise ValueError(f"There is no temporal histogram at {path} and no point files to build it from.")
+        print(f"Building the temporal histogram of {len(paths)} point files")
+        histogram = cls.from_point_files(paths, bucket_seconds)
+        histogram.save(path, paths)
+        return histogram
+
+    def extent(self):
+        """First and last timestamp of the data as 'YYYY-MM-DD HH:MM:SS', the period of the time queries."""
+        return format_timestamp(self.first), format_timestamp(math.ceil(self.last))
+
+    def _rank(self, seconds):
+        """Points before seconds, linear within a bucket."""
+        position = min(max((seconds - self.origin) / self.bucket_seconds, 0.0), len(self.counts))
+        bucket = min(int(position), len(self.counts) - 1)
+        return self._cumulative[bucket] + self.counts[bucket] * (position - bucket)
+
+    def _time_at_rank(self, rank):
+        """Earliest time with rank points before it, the inverse of _rank."""
+        rank = min(max(rank, 0.0), self.points)
+        bucket = min(bisect.bisect_left(self._cumulative, rank) - 1, len(self.counts) - 1)
+        bucket = max(bucket, 0)
+        count = self.counts[bucket]
+        fraction = (rank - self._cumulative[bucket]) / count if count else 0.0
+        return min(max(self.origin + (bucket + fraction) * self.bucket_seconds, self.first), self.last)
+
+    def count(self, start, end):
+        """Estimated number of points between two times in seconds since the epoch."""
+        return self._rank(end) - self._rank(start)
+
+    def window(self, quantile, rows=None, length=None, recent=None):
+        """
+        A time window at a quantile in [0, 1) of the data, either containing about rows points
+        or of a fixed length in seconds.
+
+        Without recent the quantile is that of the window's start, among the starts that
+        leave room for the window, so windows are drawn with the density of the data. With
+        recent (seconds) the window ends an exponentially distributed age with mean recent
+        before the end of the data, the quantile being that of the age.
+
+        :return: Tuple of the start and end in seconds since the epoch and the expected number of points.
+        """
+        if recent:
+            age = -recent * math.log(1 - quantile)
+            end = max(self.last - age, self.first)
+            if rows:
+                start = self._time_at_rank(self._rank(end) - rows)
+            else:
+                end = max(end, min(self.first + length, self.last))
+                start = end - length
+        elif rows:
+            start = self._time_at_rank(quantile * max(self.points - rows, 0))
+            end = self._time_at_rank(self._rank(start) + rows)
+        else:
+            start = min(self._time_at_rank(quantile * self.points), self.last - length)
+            start = max(start, self.first)
+            end = start + length
+        return start, end, self.count(start, end)
+
+    def random_window(self, rng, rows=None, length=None, recent=None):
+        """window at a random quantile, replayed from the parameter corpus with --corpus."""
+        return self.window(draw_seconds(rng, QUANTILE_STEPS - 1) / QUANTILE_STEPS, rows, length, recent)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Builds the temporal histogram of the prepared point files (merged*.csv).")
+    parser.add_argument("files", nargs="*", default=["../../data/merged*.csv"], help="Point files, globs are expanded")
+    parser.add_argument("--out", default=None, help=f"File the histogram is saved to, {DEFAULT_FILE} next to the point files by default")
+    parser.add_argument("--bucket-seconds", type=int, default=DEFAULT_BUCKET_SECONDS, help="Length of a bucket in seconds")
+    options = parser.parse_args()
+
+    paths = sorted(path for pattern in options.files for path in glob.glob(pattern))
+    if not paths:
+        parser.error(f"No point files match {options.files}.")
+    out = options.out or os.path.join(os.path.dirname(paths[0]), DEFAULT_FILE)
+    histogram = TemporalHistogram.from_point_files(paths, options.bucket_seconds)
+    histogram.save(out, paths)
+    start, end = histogram.extent()
+    busiest = sorted(histogram.counts, reverse=True)
+    share = sum(busiest[:max(len(busiest) // 10, 1)]) / max(histogram.points, 1)
+    print(f"Counted {histogram.points} points from {start} to {end} in {len(histogram.counts)} buckets of "
+          f"{options.bucket_seconds} s, the busiest tenth holds {share:.0%} of them, saved to {out}")
@@ -0,0 +1,178 @@
+import statistics
+import threading
+import time
+
+# Phases a measurement is tagged with
+WARMUP = "warmup"
+MEASURE = "measure"
+
+
+def coefficient_of_variation(values):
+    """Standard deviation relative to the mean, 0.0 for constant values."""
+    mean = statistics.fmean(values)
+    if mean == 0:
+        return 0.0
+    return statistics.pstdev(values) / mean
+
+
+class Warmup:
+    """
+    Decides when the measurement of one query type begins.
+
+    The first warmup seconds after start are always warm-up. With steady_state the
+    measurement additionally waits until the system settled: requests are grouped into
+    windows of window seconds by their end time, and the measurement begins after the
+    first run of windows consecutive windows whose mean latencies and request counts both
+    vary by at most tolerance (coefficient of variation). If that does not happen within
+    max_warmup seconds, the measurement begins anyway and timed_out is set.
+
+    Requests are tagged by their start: a request that started before the measurement
+    began belongs to the warm-up. observe is called by a single thread (the record writer),
+    in order of the end times. Once the measurement ran for measure_duration seconds, stop
+    is set, which ends the load generator run.
+
+    :param warmup: Minimum seconds of warm-up.
+    :param steady_state: Wait for a steady state after the minimum warm-up.
+    :param measure_duration: Seconds to measure for after the warm-up, None if the run is limited otherwise.
+    :param window: Length of a window in seconds.
+    :param windows: Number of consecutive stable windows.
+    :param tolerance: Maximum coefficient of variation of the window latencies and counts.
+    :param max_warmup: Maximum seconds of warm-up with steady_state.
+    """
+
+    def __init__(self, warmup=0.0, steady_state=False, measure_duration=None, window=5.0, windows=3,
+                 tolerance=0.1, max_warmup=300.0):
+        self.warmup = warmup
+        self.steady_state = steady_state
+        self.measure_duration = measure_duration
+        self.window = window
+        self.windows = windows
+        self.tolerance = tolerance
+        self.max_warmup = max(max_warmup, warmup)
+
+        self.stop = threading.Event()
+        self.started = time.time()
+        self.measure_start = None if steady_state or warmup > 0 else self.started
+        self.timed_out = False
+
+        self._window_index = None
+        self._window_latencies = []
+        self._closed_windows = []
+
+    def max_duration(self):
+        """Upper bound of the run length: the longest possible warm-up plus the measurement."""
+        warmup = self.max_warmup if self.steady_state else self.warmup
+        return warmup + (self.measure_duration or 0.0)
+
+    def _close_window(self):
+        if self._window_latencies:
+            self._closed_windows.append((statistics.fmean(self._window_latencies), len(self._window_latencies)))
+        else:
+            self._closed_windows.append((0.0, 0))
+        self._window_latencies = []
+        recent = self._closed_windows[-self.windows:]
+        if len(recent) < self.windows or any(count == 0 for _, count in recent):
+            return False
+        return (coefficient_of_variation([mean for mean, _ in recent]) <= self.tolerance
+                and coefficient_of_variation([count for _, count in recent]) <= self.tolerance)
+
+    def observe(self, start, end, latency):
+        """
+        Takes one finished request into account and returns its phase, WARMUP or MEASURE.
+
+        :param start: Wall clock time the request started.
+        :param end: Wall clock time the request finished.
+        :param latency: Latency of the request in seconds.
+        """
+        if self.measure_start is None:
+            minimum_end = self.started + self.warmup
+            if not self.steady_state:
+                if end >= minimum_end:
+                    self.measure_start = minimum_end
+            elif end >= self.started + self.max_warmup:
+                self.timed_out = True
+                self.measure_start = self.started + self.max_warmup
+            elif end >= minimum_end:
+                # windows only start after the minimum warm-up
+                index = int((end - minimum_end) // self.window)
+                if self._window_index is None:
+                    self._window_index = index
+                while index > self._window_index:
+                    self._window_index += 1
+                    if self._close_window():
+                        self.measure_start = minimum_end + self._window_index * self.window
+                        break
+                if self.measure_start is None:
+                    self._window_latencies.append(latency)
+
+        if self.measure_start is not None and self.measure_duration is not None:
+            if end >= self.measure_start + self.measure_duration:
+                self.stop.set()
+        if self.measure_start is not None and start >= self.measure_start:
+            return MEASURE
+        return WARMUP
+
+    def warmup_duration(self):
+        """Seconds from the start until the measurement began, None if it did not begin."""
+        return None if self.measure_start is None else self.measure_start - self.started
+
+    def report(self, label):
+        """Returns a line describing how long the warm-up of label took."""
+        duration = self.warmup_duration()
+        if duration is None:
+            return f"{label}: still warming up when the run ended, no measurements"
+        if self.timed_out:
+            return f"{label}: no steady state within {self.max_warmup:.0f}s, measured after {duration:.1f}s of warm-up"
+        if self.steady_state:
+            return f"{label}: steady state reached after {duration:.1f}s of warm-up"
+        return f"{label}: {duration:.1f}s of warm-up"
+
+    def measured(self, records):
+        """Filters (x, started, finished) load generator records down to the measurement phase."""
+        if self.measure_start is None:
+            return []
+        return [record for record in records if record[1] >= self.measure_start]
+
+
+def start_warmup(options, record_writer, query_types):
+    """
+    Starts the warm-up of a run (--warmup, --steady-state) in open_loop and closed_loop mode,
+    the requests of all its query types are tagged as warm-up by the record_writer (see
+    RecordWriter.track_warmup), the query types of a mix warm up together. Measuring lasts
+    --duration seconds after the warm-up, closed-loop runs limited by --iterations end
+    with their iterations instead. None without a warm-up.
+
+    :param options: Parsed command line options of the driver (mode, warmup, steady_state, ...).
+    """
+    if options.mode == "batch" or not (options.warmup or options.steady_state):
+        return None
+    warmup = Warmup(
+        options.warmup,
+        options.steady_state,
+        measure_duration=None if options.mode == "closed_loop" and options.iterations else options.duration,
+        window=options.steady_state_window,
+        tolerance=options.steady_state_tolerance,
+        max_warmup=options.max_warmup
+    )
+    for query_type in query_types:
+        record_writer.track_warmup(query_type, warmup)
+    return warmup
+
+
+def finish_warmup(record_writer, label, warmup, records):
+    """Reports how long the warm-up of a run took and returns the load generator records measured after it."""
+    if warmup is None:
+        return records
+    record_writer.flush()
+    print(warmup.report(label))
+    return warmup.measured(records)
+
+
+def run_limits(options, warmup):
+    """
+    Duration and stop event of the load generator run of a warm-up (see start_warmup): with a
+    warm-up the run lasts until --duration seconds were measured after it, which sets stop.
+    """
+    if warmup is None:
+        return options.duration, None
+    return warmup.max_duration(), warmup.stop
@@ -0,0 +1,142 @@
+import copy
+from collections import namedtuple
+from datetime import timedelta
+
+import yaml
+
+# One query type of a workload: the result limit, its share of the requests of a mixed
+# workload and the number of threads it runs with in batch mode
+WorkloadQuery = namedtuple("WorkloadQuery", ["query_type", "limit", "weight", "threads"])
+# One entry of the workloads list of a spec, settings override the driver's command line options
+Workload = namedtuple("Workload", ["name", "queries", "mix", "threads", "settings"])
+# Dataset time bounds ('YYYY-MM-DD HH:MM:SS') and the length of random time intervals, None where the spec has none
+Period = namedtuple("Period", ["start", "end", "interval"])
+WorkloadSpec = namedtuple("WorkloadSpec", ["period", "workloads"])
+
+# Keys of a workload (or of the defaults) that override the command line option of the same name
+SETTINGS = ("mode", "workers", "duration", "rate", "arrival", "max_workers", "iterations", "think_time", "seed", "warmup",
+            "selectivity", "window_rows", "recent_skew")
+WORKLOAD_KEYS = ("name", "queries", "mix", "threads", "limit", "weight") + SETTINGS
+QUERY_KEYS = ("query_type", "limit", "weight", "threads")
+
+DEFAULT_THREADS = 1
+DEFAULT_LIMIT = 50
+
+
+def _check_keys(entry, allowed, where):
+    unknown = sorted(set(entry) - set(allowed))
+    if unknown:
+        raise ValueError(f"Unknown keys {unknown} in {where}, allowed are {list(allowed)}.")
+
+
+def _parse_query(entry, workload, where):
+    if isinstance(entry, str):
+        entry = {"query_type": entry}
+    if not isinstance(entry, dict) or "query_type" not in entry:
+        raise ValueError(f"Queries in {where} have to be a query type or a mapping with a query_type.")
+    _check_keys(entry, QUERY_KEYS, where)
+    query = WorkloadQuery(
+        entry["query_type"],
+        int(entry.get("limit", workload.get("limit", DEFAULT_LIMIT))),
+        float(entry.get("weight", workload.get("weight", 1.0))),
+        int(entry.get("threads", workload.get("threads", DEFAULT_THREADS))),
+    )
+    if query.weight <= 0:
+        raise ValueError(f"The weight of '{query.query_type}' in {where} has to be greater than 0.")
+    return query
+
+
+def _parse_period(data):
+    if not data:
+        return None
+    _check_keys(data, ("start", "end", "interval_hours"), "period")
+    interval = data.get("interval_hours")
+    return Period(
+        None if data.get("start") is None else str(data["start"]),
+        None if data.get("end") is None else str(data["end"]),
+        None if interval is None else timedelta(hours=float(interval)),
+    )
+
+
+def parse_workload_spec(data):
+    """
+    Builds a WorkloadSpec from the parsed YAML of a workload spec file:
+
+        period:                        # dataset time bounds of the random time intervals
+          start: "2021-03-31 17:22:20"
+          end: "2023-05-31 18:33:25"
+          interval_hours: 2
+        defaults:                      # apply to every workload unless it sets them itself
+          threads: 2
+          limit: 50
+        workloads:
+          - name: spatial              # query types run one after another
+            queries: [spatial_surrounding, spatial_bounding_box]
+          - name: mixed                # query types run together, drawn by weight
+            mix: true
+            mode: closed_loop
+            workers: 8
+            duration: 120
+            queries:
+              - {query_type: spatial_surrounding, weight: 3}
+              - {query_type: temporal_time_interval, weight: 1, limit: 100}
+
+    Besides name, queries, mix, threads, limit and weight a workload may set any of
+    SETTINGS, which then replace the command line option of the same name for it.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("A workload spec has to be a mapping with a workloads list.")
+    _check_keys(data, ("period", "defaults", "workloads"), "the workload spec")
+    defaults = data.get("defaults") or {}
+    _check_keys(defaults, WORKLOAD_KEYS, "defaults")
+    if not data.get("workloads"):
+        raise ValueError("A workload spec needs at least one workload.")
+
+    workloads = []
+    for index, entry in enumerate(data["workloads"]):
+        entry = {**defaults, **entry}
+        name = str(entry.get("name", f"workload_{index}"))
+        where = f"workload '{name}'"
+        _check_keys(entry, WORKLOAD_KEYS, where)
+        if not entry.get("queries"):
+            raise ValueError(f"The {where} has no queries.")
+        workloads.append(Workload(
+            name,
+            [_parse_query(query, entry, where) for query in entry["queries"]],
+            bool(entry.get("mix", False)),
+            int(entry.get("threads", DEFAULT_THREADS)),
+            {key: entry[key] for key in SETTINGS if key in entry},
+        ))
+    return WorkloadSpec(_parse_period(data.get("period")), workloads)
+
+
+def load_workload_spec(path):
+    """Reads a workload spec file, see parse_workload_spec for its format."""
+    with open(path) as file:
+        return parse_workload_spec(yaml.safe_load(file))
+
+
+def workload_options(options, workload):
+    """Returns a copy of the parsed command line options with the settings of a workload applied."""
+    workload_options = copy.copy(options)
+    for key, value in workload.settings.items():
+        setattr(workload_options, key, value)
+    return workload_options
+
+
+def workload_runs(workload):
+    """
+    Splits a workload into the runs a driver executes one after another, as tuples of
+    (label, queries, threads): a mixed workload is one run labelled with its name, otherwise
+    every query type is a run of its own.
+    """
+    if workload.mix:
+        return [(workload.name, workload.queries, workload.threads)]
+    return [(query.query_type, [query], query.threads) for query in workload.queries]
+
+
+def choose_query(queries, rng):
+    """Draws the query of the next request from a mix by weight, a single query is returned as is."""
+    if len(queries) == 1:
+        return queries[0]
+    return rng.choices(queries, weights=[query.weight for query in queries])[0]
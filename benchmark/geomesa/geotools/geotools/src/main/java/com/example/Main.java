@@ -1,125 +1,220 @@
 package com.example;
 
-import java.io.IOException;
+import java.io.BufferedWriter;
+import java.io.FileWriter;
+import java.time.LocalDateTime;
+import java.time.format.DateTimeFormatter;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.Collections;
 import java.util.HashMap;
+import java.util.List;
+import java.util.Locale;
 import java.util.Map;
+import java.util.Random;
+import java.util.UUID;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+import java.util.concurrent.Future;
 
 import org.geotools.api.data.DataStore;
 import org.geotools.api.data.DataStoreFinder;
-import org.geotools.api.data.SimpleFeatureSource;
-import org.geotools.api.feature.simple.SimpleFeature;
-import org.geotools.api.feature.simple.SimpleFeatureType;
-import org.geotools.api.feature.type.AttributeDescriptor;
-import org.geotools.api.filter.Filter;
-import org.geotools.data.simple.SimpleFeatureCollection;
-import org.geotools.data.simple.SimpleFeatureIterator;
-import org.geotools.filter.text.cql2.CQL;
 
+// Multithreaded GeoTools benchmark client for GeoMesa Accumulo.
+// Runs the query types of the shell benchmark one after another, each with a pool of
+// threads that share one DataStore, and appends every query to a durations file in the
+// format of the Python drivers (benchmark/common/recordWriter.py), so the plotting and
+// reporting scripts read both.
 public class Main {
-    // Method to execute the queries on the datastore
-    // Input: queryType:Str; limit:Int
-    // Output: None
-    // Functionality: Executes the query on the datastore, saves the required time in a file
-    public static void executeQuery(String queryType, Integer limit){
-        // Eexecute the query
-
-        // Save the query type, start time, end time, duration, and parallelism i.e thread count in a file
-    
-        // Print the time
-    }
-
-    public static void runThreads(String queryType, Integer threadCount)
-    {
-        // Create threads
+    // Written as connection_mode, the queries run in the JVM that holds the DataStore
+    static final String CONNECTION_MODE = "geotools";
 
-        // Start threads
+    static DataStore dataStore;
+    static QueryTemplates templates;
+    static String runId;
+    static String output = "durations.csv";
+    static int limit = 50;
+    static int iterations = 1;
+    static double duration = 0;
+    static Long seed = null;
 
-        // Wait for threads to finish
+    // Wall clock in seconds since the epoch with the resolution of nanoTime, as time.time() in Python
+    static final long ORIGIN_NANOS = System.nanoTime();
+    static final double ORIGIN_SECONDS = System.currentTimeMillis() / 1000.0;
 
+    static double wallSeconds(long nanos) {
+        return ORIGIN_SECONDS + (nanos - ORIGIN_NANOS) / 1e9;
     }
-    //
-    public static void main(String[] args) {
-        System.out.println("Starting...");
-        String instanceName = args[0];
-        String username = args[1];
-        String password = args[2];
-        String catalog = args[3];
-        String zookeepers = args[4];
-        
-        //Check the variables by printing them
-        System.out.println("Instance Name: "+instanceName);
-        System.out.println("Username: "+username);
-        System.out.println("Password: "+password);
-        System.out.println("Catalog: "+catalog);
-        System.out.println("Zookeepers: "+zookeepers);
+
+    // Parameters of the GeoMesa Accumulo DataStore
+    // Input: instanceName, username, password, catalog, zookeepers:Str
+    static Map<String, String> dataStoreParameters(String instanceName, String username, String password,
+                                                   String catalog, String zookeepers) {
         Map<String, String> parameters = new HashMap<>();
         parameters.put("accumulo.instance.name", instanceName);
         parameters.put("accumulo.user", username);
         parameters.put("accumulo.password", password);
         parameters.put("accumulo.catalog", catalog);
         parameters.put("accumulo.zookeepers", zookeepers);
-        try{
-            System.out.println("Trying to connect to the datastore");
-            DataStore dataStore = DataStoreFinder.getDataStore(parameters);
-            System.out.println("Connected to the datastore "+dataStore);
-            for (String str : dataStore.getTypeNames()) {
-                System.out.println("Feature: "+str);
-                SimpleFeatureSource source = dataStore.getFeatureSource(str);
-                System.out.println("This is the source: "+source);
-                Filter filter=null;
-                Filter filter2=null;
-                
-                try {
-                    filter= CQL.toFilter("rider_id <= 27");
-                    filter2 = CQL.toFilter("rider_id <= 5");
-                }catch(Exception e){
-                    System.out.println("Failed to set filter");
-                }
-                System.out.println("This is the filter: "+filter);
-                SimpleFeatureCollection allFeatures = source.getFeatures( filter2 );
-                SimpleFeatureCollection limitedFeatures = source.getFeatures( filter );
-                SimpleFeatureType schema = source.getSchema();
-                for (AttributeDescriptor descriptor : schema.getAttributeDescriptors()) {
-                   System.out.println(descriptor.getLocalName() + " - " + descriptor.getType().getBinding());
-                }
-                if(str.equals("trip_data")){
-                    
-                
-                SimpleFeatureIterator it = limitedFeatures.features();
-                try {
-                    while (it.hasNext()) {
-                        SimpleFeature feature = it.next();
-                        System.out.println("This is the feature: "+feature.getAttribute("rider_id"));
-                    }
-                }catch(Exception e){
-                    System.out.println("Failed to iterate over the features");
-                    
-                } finally {
-                    it.close();
-                }
-                it = allFeatures.features();
-                try {
-                    while (it.hasNext()) {
-                        SimpleFeature feature = it.next();
-                        System.out.println("This is the feature: "+feature.getAttribute("rider_id"));
-                    }
-                }catch(Exception e){
-                    System.out.println("Failed to iterate over the features");
-                    
-                } finally {
-                    it.close();
-                }
+        return parameters;
+    }
+
+    // Method to execute the queries on the datastore
+    // Input: queryType:Str; workerId:Int; random:Random of the worker
+    // Output: the line of the durations file, null if the query failed
+    // Functionality: Builds and executes one query, the building is not timed
+    public static String executeQuery(String queryType, int workerId, Random random) {
+        QueryTemplates.FeatureQuery query = templates.build(queryType, random);
+        long start = System.nanoTime();
+        QueryExecutor.Result result;
+        try {
+            result = QueryExecutor.execute(dataStore, query.featureType, query.cql, limit);
+        } catch (Exception e) {
+            System.out.println("Error executing query '" + queryType + "': " + e.getMessage());
+            return null;
+        }
+        long end = start + result.totalNanos;
+        // query_type, limit, start, end, duration, connection_mode, connect_duration, execute_duration,
+        // first_row_duration, fetch_duration, rows, bytes, run_id, worker_id, intended_start, phase, execution_mode, expected_rows
+        return String.format(Locale.ROOT, "%s,%d,%.6f,%.6f,%.9f,%s,0.0,%.9f,%.9f,%.9f,%d,%d,%s,%d,,measure,literal,",
+            queryType, limit, wallSeconds(start), wallSeconds(end), result.totalNanos / 1e9, CONNECTION_MODE,
+            result.plannedNanos / 1e9, result.firstFeatureNanos / 1e9, (result.totalNanos - result.plannedNanos) / 1e9,
+            result.features, result.bytes, runId, workerId);
+    }
+
+    // Runs one worker: --iterations queries or queries back to back until the deadline
+    static List<String> runWorker(String queryType, int workerId, long deadline) {
+        Random random = seed == null ? new Random() : new Random(seed + workerId);
+        List<String> lines = new ArrayList<>();
+        for (int i = 0; duration > 0 ? System.nanoTime() < deadline : i < iterations; i++) {
+            String line = executeQuery(queryType, workerId, random);
+            if (line != null) {
+                lines.add(line);
             }
-                // TODO: Fix this, as it currently outputs the same number of features
-                int count = allFeatures.size();
-                int count2 = limitedFeatures.size();
-                System.out.println("Number of selected features:" + count+ " ,"+count2);
+        }
+        return lines;
+    }
+
+    // Runs one query type with threadCount workers, appends its measurements to the
+    // durations file and prints the throughput and latency percentiles
+    public static void runThreads(String queryType, Integer threadCount) throws Exception {
+        ExecutorService pool = Executors.newFixedThreadPool(threadCount);
+        long start = System.nanoTime();
+        long deadline = start + (long) (duration * 1e9);
+        List<Future<List<String>>> workers = new ArrayList<>();
+        for (int workerId = 0; workerId < threadCount; workerId++) {
+            final int id = workerId;
+            workers.add(pool.submit(() -> runWorker(queryType, id, deadline)));
+        }
+        List<String> lines = new ArrayList<>();
+        for (Future<List<String>> worker : workers) {
+            lines.addAll(worker.get());
+        }
+        double elapsed = (System.nanoTime() - start) / 1e9;
+        pool.shutdown();
+
+        try (BufferedWriter writer = new BufferedWriter(new FileWriter(output, true))) {
+            for (String line : lines) {
+                writer.write(line);
+                writer.write('\n');
             }
-            dataStore.dispose();
-        } catch (IOException e) {
-            System.out.println("Error connecting to the datastore");
         }
+        printSummary(queryType, lines, elapsed, threadCount);
+    }
+
+    static void printSummary(String queryType, List<String> lines, double elapsed, int threadCount) {
+        if (lines.isEmpty()) {
+            System.out.println(queryType + ": no successful queries");
+            return;
+        }
+        List<Double> latencies = new ArrayList<>();
+        for (String line : lines) {
+            latencies.add(Double.parseDouble(line.split(",")[4]) * 1000);
+        }
+        Collections.sort(latencies);
+        System.out.println(String.format(Locale.ROOT,
+            "%s: %d queries with %d threads in %.1f s, %.2f queries/s, latency p50 %.1f ms, p95 %.1f ms, p99 %.1f ms, max %.1f ms",
+            queryType, lines.size(), threadCount, elapsed, lines.size() / elapsed,
+            percentile(latencies, 50), percentile(latencies, 95), percentile(latencies, 99), latencies.get(latencies.size() - 1)));
+    }
+
+    static double percentile(List<Double> sorted, double percent) {
+        int index = (int) Math.ceil(percent / 100 * sorted.size()) - 1;
+        return sorted.get(Math.max(0, Math.min(index, sorted.size() - 1)));
+    }
+
+    static String newRunId() {
+        return LocalDateTime.now().format(DateTimeFormatter.ofPattern("yyyyMMdd-HHmmss"))
+            + "-" + UUID.randomUUID().toString().replace("-", "").substring(0, 6);
+    }
 
-        // Connecting to the datastore
+    static void usage() {
+        System.out.println("Usage: Main <instance> <user> <password> <catalog> <zookeepers> [options]\n"
+            + "  --query-types a,b,...   query types to run, all by default: " + QueryTemplates.QUERY_TYPES + "\n"
+            + "  --threads N             threads per query type (4)\n"
+            + "  --iterations N          queries per thread (1)\n"
+            + "  --duration S            seconds per query type instead of --iterations\n"
+            + "  --limit N               maximum features per query, -1 for no limit (50)\n"
+            + "  --seed N                seed of the random parameters, thread i uses seed + i\n"
+            + "  --output FILE           durations file the measurements are appended to (durations.csv)\n"
+            + "  --run-id ID             id written with every measurement\n"
+            + "  --period-start, --period-end 'yyyy-MM-dd HH:mm:ss', --interval-hours H   timeframe of the time queries");
+        System.exit(1);
+    }
+
+    public static void main(String[] args) throws Exception {
+        if (args.length < 5) {
+            usage();
+        }
+        List<String> queryTypes = QueryTemplates.QUERY_TYPES;
+        int threads = 4;
+        String periodStart = "2023-03-01 00:00:00";
+        String periodEnd = "2024-01-31 23:59:59";
+        double intervalHours = 2;
+        for (int i = 5; i < args.length; i += 2) {
+            if (i + 1 >= args.length) {
+                usage();
+            }
+            String value = args[i + 1];
+            switch (args[i]) {
+                case "--query-types": queryTypes = Arrays.asList(value.split(",")); break;
+                case "--threads": threads = Integer.parseInt(value); break;
+                case "--iterations": iterations = Integer.parseInt(value); break;
+                case "--duration": duration = Double.parseDouble(value); break;
+                case "--limit": limit = Integer.parseInt(value); break;
+                case "--seed": seed = Long.parseLong(value); break;
+                case "--output": output = value; break;
+                case "--run-id": runId = value; break;
+                case "--period-start": periodStart = value; break;
+                case "--period-end": periodEnd = value; break;
+                case "--interval-hours": intervalHours = Double.parseDouble(value); break;
+                default: usage();
+            }
+        }
+        for (String queryType : queryTypes) {
+            if (!QueryTemplates.QUERY_TYPES.contains(queryType)) {
+                System.out.println("Unknown query type '" + queryType + "', known are " + QueryTemplates.QUERY_TYPES);
+                System.exit(1);
+            }
+        }
+        if (runId == null) {
+            runId = newRunId();
+        }
+        templates = new QueryTemplates(periodStart, periodEnd, intervalHours);
+
+        System.out.println("Connecting to the datastore");
+        dataStore = DataStoreFinder.getDataStore(dataStoreParameters(args[0], args[1], args[2], args[3], args[4]));
+        if (dataStore == null) {
+            System.out.println("Error connecting to the datastore");
+            System.exit(1);
+        }
+        try {
+            for (String queryType : queryTypes) {
+                runThreads(queryType, threads);
+            }
+        } finally {
+            dataStore.dispose();
+        }
+        System.out.println("Run " + runId + " written to " + output);
     }
 }
@@ -0,0 +1,75 @@
+package com.example;
+
+import org.geotools.api.data.DataStore;
+import org.geotools.api.data.FeatureReader;
+import org.geotools.api.data.Query;
+import org.geotools.api.data.Transaction;
+import org.geotools.api.feature.simple.SimpleFeature;
+import org.geotools.api.feature.simple.SimpleFeatureType;
+import org.geotools.filter.text.ecql.ECQL;
+
+// Runs one query on a DataStore and measures it, shared by the QueryServer and the Main runner
+public class QueryExecutor {
+
+    // Phases and size of one query, the durations are nanoseconds from the start of the query
+    public static class Result {
+        public final long features;
+        public final long bytes;
+        public final long plannedNanos;
+        public final long firstFeatureNanos;
+        public final long totalNanos;
+
+        Result(long features, long bytes, long plannedNanos, long firstFeatureNanos, long totalNanos) {
+            this.features = features;
+            this.bytes = bytes;
+            this.plannedNanos = plannedNanos;
+            this.firstFeatureNanos = firstFeatureNanos;
+            this.totalNanos = totalNanos;
+        }
+    }
+
+    // Method to execute one query on the datastore
+    // Input: dataStore:DataStore; featureType:Str; cql:Str (ECQL); limit:Int (-1 for no limit)
+    // Output: Result of the query
+    // Functionality: Runs the query, counts the features and their size without keeping them
+    public static Result execute(DataStore dataStore, String featureType, String cql, int limit) throws Exception {
+        long start = System.nanoTime();
+        long planned;
+        long first = -1;
+        long features = 0;
+        long bytes = 0;
+        Query query = new Query(featureType, ECQL.toFilter(cql));
+        if (limit != -1) {
+            query.setMaxFeatures(limit);
+        }
+        try (FeatureReader<SimpleFeatureType, SimpleFeature> reader =
+                 dataStore.getFeatureReader(query, Transaction.AUTO_COMMIT)) {
+            planned = System.nanoTime();
+            while (reader.hasNext()) {
+                SimpleFeature feature = reader.next();
+                if (first < 0) {
+                    first = System.nanoTime();
+                }
+                features++;
+                bytes += featureSize(feature);
+            }
+        }
+        long end = System.nanoTime();
+        if (first < 0) {
+            first = end;
+        }
+        return new Result(features, bytes, planned - start, first - start, end - start);
+    }
+
+    // Approximate size of a feature: the length of its attribute values in text form,
+    // as for the rows of MobilityDB
+    private static long featureSize(SimpleFeature feature) {
+        long size = 0;
+        for (Object value : feature.getAttributes()) {
+            if (value != null) {
+                size += value.toString().length();
+            }
+        }
+        return size;
+    }
+}
@@ -0,0 +1,236 @@
+package com.example;
+
+import java.io.BufferedReader;
+import java.io.BufferedWriter;
+import java.io.IOException;
+import java.io.InputStreamReader;
+import java.io.OutputStreamWriter;
+import java.net.InetAddress;
+import java.net.ServerSocket;
+import java.net.Socket;
+import java.nio.charset.StandardCharsets;
+import java.util.Arrays;
+import java.util.Date;
+import java.util.HashMap;
+import java.util.List;
+import java.util.Locale;
+import java.util.Map;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+
+import org.geotools.api.data.DataStore;
+import org.geotools.api.data.DataStoreFinder;
+import org.geotools.api.data.FeatureWriter;
+import org.geotools.api.data.Transaction;
+import org.geotools.api.feature.simple.SimpleFeature;
+import org.geotools.api.feature.simple.SimpleFeatureType;
+import org.geotools.api.feature.type.AttributeDescriptor;
+import org.geotools.util.Converters;
+import org.locationtech.jts.geom.Geometry;
+import org.locationtech.jts.io.WKTReader;
+
+// Long-lived query server for the GeoMesa benchmark.
+// Connects to the DataStore once and answers queries of the Python driver
+// (benchmark/common/geomesaAdapter.py), so a measurement no longer includes an ssh
+// handshake and the start of a JVM. Every client connection is served by its own thread,
+// all threads share the one DataStore.
+//
+// Protocol, one line (UTF-8) per request and response:
+//   request:  <feature type>\t<limit, -1 for no limit>\t<ECQL filter>
+//   response: OK\t<features>\t<bytes>\t<planning ms>\t<first feature ms>\t<total ms>
+//             ERROR\t<message>
+// The timings are measured on the server from the start of the query (see QueryExecutor).
+// Features are written with
+//   WRITE\t<feature type>\t<attribute values in the order of the schema, tab separated>
+//   FLUSH\t<feature type>
+// which are answered like a query of one (WRITE) or no (FLUSH) feature.
+// QUIT or the end of the stream closes the connection.
+public class QueryServer {
+    public static final int DEFAULT_PORT = 7070;
+
+    private final DataStore dataStore;
+    // Appending feature writers, one per feature type shared by all clients, see writeFeature
+    private final Map<String, FeatureWriter<SimpleFeatureType, SimpleFeature>> writers = new HashMap<>();
+
+    public QueryServer(DataStore dataStore) {
+        this.dataStore = dataStore;
+    }
+
+    // Method to execute one query on the datastore
+    // Input: featureType:Str; cql:Str; limit:Int
+    // Output: the response line
+    public String executeQuery(String featureType, String cql, int limit) {
+        QueryExecutor.Result result;
+        try {
+            result = QueryExecutor.execute(dataStore, featureType, cql, limit);
+        } catch (Exception e) {
+            return "ERROR\t" + message(e);
+        }
+        return String.format(Locale.ROOT, "OK\t%d\t%d\t%.3f\t%.3f\t%.3f",
+            result.features, result.bytes,
+            millis(result.plannedNanos), millis(result.firstFeatureNanos), millis(result.totalNanos));
+    }
+
+    // Method to write one feature to the datastore
+    // Input: featureType:Str; values:Str[] attribute values in the order of the schema, geometries as WKT,
+    //        dates as epoch milliseconds, empty for null
+    // Output: the response line
+    // Functionality: Appends the feature through the writer of the feature type, which buffers it
+    //                until the next FLUSH or until GeoMesa's batch writer sends it by itself
+    public String writeFeature(String featureType, String[] values) {
+        long start = System.nanoTime();
+        long bytes = 0;
+        try {
+            synchronized (writers) {
+                FeatureWriter<SimpleFeatureType, SimpleFeature> writer = writers.get(featureType);
+                if (writer == null) {
+                    writer = dataStore.getFeatureWriterAppend(featureType, Transaction.AUTO_COMMIT);
+                    writers.put(featureType, writer);
+                }
+                SimpleFeature feature = writer.next();
+                List<AttributeDescriptor> descriptors = feature.getFeatureType().getAttributeDescriptors();
+                if (values.length != descriptors.size()) {
+                    throw new IllegalArgumentException("Expected " + descriptors.size() + " attribute values, got " + values.length);
+                }
+                for (int i = 0; i < values.length; i++) {
+                    feature.setAttribute(i, parseValue(values[i], descriptors.get(i).getType().getBinding()));
+                    bytes += values[i].length();
+                }
+                writer.write();
+            }
+        } catch (Exception e) {
+            return "ERROR\t" + message(e);
+        }
+        long total = System.nanoTime() - start;
+        return String.format(Locale.ROOT, "OK\t1\t%d\t0.000\t%.3f\t%.3f", bytes, millis(total), millis(total));
+    }
+
+    // Method to flush the written features of a feature type
+    // Input: featureType:Str
+    // Output: the response line
+    // Functionality: Closes the writer of the feature type, which sends its buffered features to
+    //                Accumulo, the next write opens a new one
+    public String flush(String featureType) {
+        long start = System.nanoTime();
+        try {
+            synchronized (writers) {
+                FeatureWriter<SimpleFeatureType, SimpleFeature> writer = writers.remove(featureType);
+                if (writer != null) {
+                    writer.close();
+                }
+            }
+        } catch (Exception e) {
+            return "ERROR\t" + message(e);
+        }
+        long total = System.nanoTime() - start;
+        return String.format(Locale.ROOT, "OK\t0\t0\t0.000\t%.3f\t%.3f", millis(total), millis(total));
+    }
+
+    // Flushes and closes the writers of all feature types, on shutdown
+    public void closeWriters() {
+        synchronized (writers) {
+            for (String featureType : writers.keySet().toArray(new String[0])) {
+                flush(featureType);
+            }
+        }
+    }
+
+    // The value of an attribute with the given binding from its text in a WRITE request
+    private static Object parseValue(String value, Class<?> binding) throws Exception {
+        if (value.isEmpty()) {
+            return null;
+        }
+        if (Geometry.class.isAssignableFrom(binding)) {
+            return new WKTReader().read(value);
+        }
+        if (Date.class.isAssignableFrom(binding)) {
+            return new Date(Long.parseLong(value));
+        }
+        Object converted = Converters.convert(value, binding);
+        if (converted == null) {
+            throw new IllegalArgumentException("Cannot convert '" + value + "' to " + binding.getSimpleName());
+        }
+        return converted;
+    }
+
+    private static double millis(long nanos) {
+        return nanos / 1_000_000.0;
+    }
+
+    // The message of an exception on one line, it is sent as a field of the response
+    private static String message(Exception e) {
+        String message = e.getMessage() == null ? e.getClass().getSimpleName() : e.getMessage();
+        return message.replace('\t', ' ').replace('\n', ' ').replace('\r', ' ');
+    }
+
+    // Answers the requests of one client until it disconnects
+    public void handleClient(Socket socket) {
+        try (Socket client = socket;
+             BufferedReader in = new BufferedReader(new InputStreamReader(client.getInputStream(), StandardCharsets.UTF_8));
+             BufferedWriter out = new BufferedWriter(new OutputStreamWriter(client.getOutputStream(), StandardCharsets.UTF_8))) {
+            client.setTcpNoDelay(true);
+            String line;
+            while ((line = in.readLine()) != null && !line.equals("QUIT")) {
+                out.write(handleRequest(line));
+                out.write('\n');
+                out.flush();
+            }
+        } catch (IOException e) {
+            System.out.println("Client connection failed: " + e.getMessage());
+        }
+    }
+
+    private String handleRequest(String line) {
+        if (line.startsWith("WRITE\t")) {
+            String[] fields = line.split("\t", -1);
+            if (fields.length < 3) {
+                return "ERROR\tExpected WRITE\\t<feature type>\\t<values>";
+            }
+            return writeFeature(fields[1], Arrays.copyOfRange(fields, 2, fields.length));
+        }
+        if (line.startsWith("FLUSH\t")) {
+            return flush(line.substring("FLUSH\t".length()));
+        }
+        String[] fields = line.split("\t", 3);
+        if (fields.length != 3) {
+            return "ERROR\tExpected <feature type>\\t<limit>\\t<filter>";
+        }
+        int limit;
+        try {
+            limit = Integer.parseInt(fields[1]);
+        } catch (NumberFormatException e) {
+            return "ERROR\tInvalid limit " + fields[1];
+        }
+        return executeQuery(fields[0], fields[2], limit);
+    }
+
+    // Arguments: instanceName username password catalog zookeepers [port]
+    public static void main(String[] args) throws IOException {
+        if (args.length < 5) {
+            System.out.println("Usage: QueryServer <instance> <user> <password> <catalog> <zookeepers> [port]");
+            System.exit(1);
+        }
+        int port = args.length > 5 ? Integer.parseInt(args[5]) : DEFAULT_PORT;
+        System.out.println("Connecting to the datastore");
+        DataStore dataStore = DataStoreFinder.getDataStore(Main.dataStoreParameters(args[0], args[1], args[2], args[3], args[4]));
+        if (dataStore == null) {
+            System.out.println("Error connecting to the datastore");
+            System.exit(1);
+        }
+        QueryServer server = new QueryServer(dataStore);
+        Runtime.getRuntime().addShutdownHook(new Thread(() -> {
+            server.closeWriters();
+            dataStore.dispose();
+        }));
+
+        // Only reachable from the manager itself, remote drivers connect through an ssh tunnel
+        ExecutorService clients = Executors.newCachedThreadPool();
+        try (ServerSocket serverSocket = new ServerSocket(port, 50, InetAddress.getLoopbackAddress())) {
+            System.out.println("Query server listening on port " + port);
+            while (true) {
+                Socket socket = serverSocket.accept();
+                clients.submit(() -> server.handleClient(socket));
+            }
+        }
+    }
+}
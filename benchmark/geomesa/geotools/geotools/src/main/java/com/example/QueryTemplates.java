@@ -0,0 +1,158 @@
+package com.example;
+
+import java.io.BufferedReader;
+import java.io.IOException;
+import java.io.InputStream;
+import java.io.InputStreamReader;
+import java.nio.charset.StandardCharsets;
+import java.time.Duration;
+import java.time.LocalDateTime;
+import java.time.format.DateTimeFormatter;
+import java.util.Arrays;
+import java.util.List;
+import java.util.Random;
+import java.util.stream.Collectors;
+
+// CQL filters of the query types of the shell benchmark
+// (benchmark/geomesa/shell_benchmark/runMiniBenchmark.py), with the same random parameters.
+// Every worker passes its own Random, so runs with the same seed query the same values.
+public class QueryTemplates {
+    public static final List<String> QUERY_TYPES = Arrays.asList(
+        "surrounding", "ride_traffic", "intersections", "bounding_box", "polygonal_area",
+        "time_interval", "time_slice_points", "trips_starting_after_timestamp", "get_trip",
+        "attribute_value_filter_points", "attribute_value_filter_trips", "interval_around_timestamp",
+        "spatiotemporal", "temporal_changes_in_region"
+    );
+
+    private static final DateTimeFormatter PERIOD_FORMAT = DateTimeFormatter.ofPattern("yyyy-MM-dd HH:mm:ss");
+    private static final DateTimeFormatter CQL_FORMAT = DateTimeFormatter.ofPattern("yyyy-MM-dd'T'HH:mm:ss'Z'");
+
+    // One query: the feature type and its filter
+    public static class FeatureQuery {
+        public final String featureType;
+        public final String cql;
+
+        FeatureQuery(String featureType, String cql) {
+            this.featureType = featureType;
+            this.cql = cql;
+        }
+    }
+
+    private final LocalDateTime periodStart;
+    private final LocalDateTime periodEnd;
+    private final Duration interval;
+    private final String berlinRoute;
+
+    // Input: periodStart, periodEnd:Str ('yyyy-MM-dd HH:mm:ss') timeframe of the time interval queries; intervalHours:Double
+    public QueryTemplates(String periodStart, String periodEnd, double intervalHours) throws IOException {
+        this.periodStart = LocalDateTime.parse(periodStart, PERIOD_FORMAT);
+        this.periodEnd = LocalDateTime.parse(periodEnd, PERIOD_FORMAT);
+        this.interval = Duration.ofSeconds((long) (intervalHours * 3600));
+        this.berlinRoute = readResource("/berlin_route.wkt");
+    }
+
+    private static String readResource(String name) throws IOException {
+        try (InputStream stream = QueryTemplates.class.getResourceAsStream(name)) {
+            if (stream == null) {
+                throw new IOException("Missing resource " + name);
+            }
+            BufferedReader reader = new BufferedReader(new InputStreamReader(stream, StandardCharsets.UTF_8));
+            return reader.lines().collect(Collectors.joining()).trim();
+        }
+    }
+
+    // Random position in Berlin as {lon, lat}
+    private static double[] randomPositionInBerlin(Random random) {
+        double lon = 13.088346 + random.nextDouble() * (13.761160 - 13.088346);
+        double lat = 52.338049 + random.nextDouble() * (52.675454 - 52.338049);
+        return new double[] {lon, lat};
+    }
+
+    // Random start and end of a time interval of the given length within the period
+    private String[] randomTimeInterval(Random random, Duration duration) {
+        long latestStart = Duration.between(periodStart, periodEnd.minus(duration)).getSeconds();
+        if (latestStart < 0) {
+            throw new IllegalArgumentException("The specified duration exceeds the total period duration.");
+        }
+        LocalDateTime start = periodStart.plusSeconds((long) (random.nextDouble() * (latestStart + 1)));
+        return new String[] {start.format(CQL_FORMAT), start.plus(duration).format(CQL_FORMAT)};
+    }
+
+    private static int randomInt(Random random, int low, int high) {
+        return low + random.nextInt(high - low + 1);
+    }
+
+    // Method to build one query
+    // Input: queryType:Str; random:Random of the worker
+    // Output: FeatureQuery with freshly drawn parameters
+    public FeatureQuery build(String queryType, Random random) {
+        switch (queryType) {
+            case "surrounding": {
+                double[] position = randomPositionInBerlin(random);
+                int radius = randomInt(random, 3000, 8000);
+                return new FeatureQuery("ride_data",
+                    "DWITHIN(geom, POINT(" + position[0] + " " + position[1] + "), " + radius + ", meters)");
+            }
+            case "ride_traffic":
+                return new FeatureQuery("trip_data", "INTERSECTS(trip, " + berlinRoute + ")");
+            case "intersections": {
+                double[] start = randomPositionInBerlin(random);
+                double[] end = randomPositionInBerlin(random);
+                return new FeatureQuery("trip_data",
+                    "INTERSECTS(trip, LINESTRING(" + start[0] + " " + start[1] + ", " + end[0] + " " + end[1] + "))");
+            }
+            case "bounding_box": {
+                double[] p = randomPositionInBerlin(random);
+                double size = 0.3;
+                return new FeatureQuery("ride_data", "WITHIN(geom, POLYGON(("
+                    + (p[0] - size) + " " + (p[1] - size) + ", " + (p[0] - size) + " " + (p[1] + size) + ", "
+                    + (p[0] + size) + " " + (p[1] + size) + ", " + (p[0] + size) + " " + (p[1] - size) + ", "
+                    + (p[0] - size) + " " + (p[1] - size) + ")))");
+            }
+            case "polygonal_area": {
+                double[] p1 = randomPositionInBerlin(random);
+                double[] p2 = randomPositionInBerlin(random);
+                double[] p3 = randomPositionInBerlin(random);
+                double[] p4 = randomPositionInBerlin(random);
+                return new FeatureQuery("ride_data", "WITHIN(geom, POLYGON(("
+                    + p1[0] + " " + p1[1] + ", " + p2[0] + " " + p2[1] + ", " + p3[0] + " " + p3[1] + ", "
+                    + p4[0] + " " + p4[1] + ", " + p1[0] + " " + p1[1] + ")))");
+            }
+            case "time_interval": {
+                String[] time = randomTimeInterval(random, interval);
+                return new FeatureQuery("ride_data", "timestamp DURING " + time[0] + "/" + time[1]);
+            }
+            case "time_slice_points": {
+                String[] time = randomTimeInterval(random, interval);
+                return new FeatureQuery("ride_data", "timestamp = '" + time[0] + "'");
+            }
+            case "trips_starting_after_timestamp": {
+                String[] time = randomTimeInterval(random, interval);
+                return new FeatureQuery("trip_data", "timestamp > '" + time[0] + "'");
+            }
+            case "get_trip":
+                return new FeatureQuery("trip_data", "ride_id = " + randomInt(random, 1, 400));
+            case "attribute_value_filter_points":
+                return new FeatureQuery("ride_data", "ride_id > " + randomInt(random, 1, 400));
+            case "attribute_value_filter_trips":
+                return new FeatureQuery("trip_data", "ride_id > " + randomInt(random, 1, 400));
+            case "interval_around_timestamp": {
+                String[] time = randomTimeInterval(random, interval);
+                return new FeatureQuery("ride_data", "timestamp DURING " + time[0] + "-PT30M/" + time[0] + "+PT30M");
+            }
+            case "spatiotemporal":
+                return spatiotemporal(random, Duration.ofHours(10));
+            case "temporal_changes_in_region":
+                return spatiotemporal(random, Duration.ofHours(24));
+            default:
+                throw new IllegalArgumentException("Unknown query type '" + queryType + "', known are " + QUERY_TYPES);
+        }
+    }
+
+    private FeatureQuery spatiotemporal(Random random, Duration duration) {
+        String[] time = randomTimeInterval(random, duration);
+        double[] position = randomPositionInBerlin(random);
+        return new FeatureQuery("ride_data", "timestamp DURING " + time[0] + "/" + time[1]
+            + " AND DWITHIN(geom, POINT(" + position[0] + " " + position[1] + "), 10000, meters)");
+    }
+}
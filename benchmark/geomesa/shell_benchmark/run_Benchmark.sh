@@ -1,2 +1,8 @@
 #setup threaded benchmark for GeoMesa
 #Read benchmark configuration from .yaml file
+#usage: ./run_Benchmark.sh <deployment> [workload spec] [further options of runMiniBenchmark.py]
+cd "$(dirname "$0")"
+deployment=${1:-single}
+workload=${2:-benchmark_conf.yaml}
+shift 2 2>/dev/null || shift $#
+python runMiniBenchmark.py "$deployment" --workload "$workload" "$@"
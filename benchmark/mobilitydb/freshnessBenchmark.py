@@ -0,0 +1,133 @@
+import argparse
+import glob
+import os
+import random
+import sys
+from datetime import datetime
+
+import psycopg2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+from connectionPool import ConnectionPool, POOLED
+from ingestStrategies import ROW, POINT_COLUMNS, insert_rows, synthetic_ride, read_rides, first_free_ride_id, remove_rides
+from freshnessProbe import FreshnessRun, HISTOGRAMS_FILE, PROBE_RADIUS, DEFAULT_SPEEDUP, DEFAULT_FEEDS, \
+    DEFAULT_MARKER_EVERY, DEFAULT_PROBE_INTERVAL, DEFAULT_PROBE_TIMEOUT, probe_window
+from recordWriter import RecordWriter, new_run_id
+from latencyHistogram import save_run
+
+# Finds a marker: the point of its ride within PROBE_RADIUS meters and a few seconds of it
+PROBE_QUERY = (
+    "SELECT COUNT(*) FROM {table} WHERE ride_id = %s AND timestamp BETWEEN %s AND %s "
+    "AND ST_DWithin(point_geom::geography, ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography, %s);"
+)
+
+# Configuration, set from the command line arguments at the bottom of this file
+options = None
+# Connections of the feeds (writers) and of the probes (readers), so they do not wait for each other
+writer_pool = None
+reader_pool = None
+
+
+def get_trips_table(deployment):
+    return "cycling_trips_ref" if deployment == "multi" else "cycling_trips"
+
+
+def load_rides():
+    """The rides replayed by the feeds, from the prepared point files or synthetic."""
+    if options.data_files:
+        paths = sorted(glob.glob(options.data_files))
+        if not paths:
+            raise ValueError(f"No point files match {options.data_files}.")
+        return list(read_rides(paths, options.templates))
+    rng = random.Random(options.seed)
+    start = datetime.now().replace(microsecond=0)
+    return [synthetic_ride(rng, index, rng.randint(1, 30), options.points_per_ride, start)
+            for index in range(options.templates)]
+
+
+def write_point(row):
+    """Inserts one point as its own transaction, it is visible to other sessions once committed."""
+    with writer_pool.connection() as connection:
+        insert_rows(connection, ROW, options.points_table, POINT_COLUMNS, [row])
+
+
+def probe(marker):
+    """Whether a query of another session finds the marker."""
+    start, end = probe_window(marker)
+    row = marker.row
+    with reader_pool.connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute(PROBE_QUERY.format(table=options.points_table),
+                       (row[0], start, end, row[3], row[2], PROBE_RADIUS))
+        count = cursor.fetchone()[0]
+        connection.commit()
+        cursor.close()
+    return count > 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measures the time from inserting a point into MobilityDB until queries find it."
+    )
+    parser.add_argument("hostname", help="IP of the MobilityDB (manager) instance")
+    parser.add_argument("portnum", help="PostgreSQL port, usually 5432")
+    parser.add_argument("deployment", nargs="?", default="multi", choices=["single", "multi"])
+    parser.add_argument("--speedup", type=float, default=DEFAULT_SPEEDUP,
+                        help="Replay the rides this many times faster than they were recorded")
+    parser.add_argument("--feeds", type=int, default=DEFAULT_FEEDS, help="Rides replayed at the same time")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds the rides are replayed for")
+    parser.add_argument("--rides", type=int, default=None,
+                        help="Rides replayed per feed, the run ends after them or the duration, whichever comes first")
+    parser.add_argument("--marker-every", type=int, default=DEFAULT_MARKER_EVERY,
+                        help="Probe the visibility of every n-th point of a ride")
+    parser.add_argument("--probe-interval", type=float, default=DEFAULT_PROBE_INTERVAL,
+                        help="Seconds between two probes of a marker, bounds the resolution of the lag")
+    parser.add_argument("--probe-timeout", type=float, default=DEFAULT_PROBE_TIMEOUT,
+                        help="Seconds after which a marker that did not become visible counts as missed")
+    parser.add_argument("--probers", type=int, default=32, help="Markers probed at the same time at most")
+    parser.add_argument("--points-table", default="cycling_data", help="Table the points are inserted into")
+    parser.add_argument("--templates", type=int, default=100, help="Rides read from the point files or generated")
+    parser.add_argument("--points-per-ride", type=int, default=200, help="Points of a synthetic ride")
+    parser.add_argument("--data-files", default=None,
+                        help="Replay the rides of the prepared point files instead of synthetic ones, e.g. '../../data/merged*.csv'")
+    parser.add_argument("--keep", action="store_true", help="Keep the replayed rides instead of deleting them afterwards")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the synthetic rides")
+    parser.add_argument("--run-id", default=None,
+                        help="Id written with every measurement, defaults to the start time plus a random suffix")
+    options = parser.parse_args()
+    if options.marker_every < 1 or options.feeds < 1:
+        parser.error("--marker-every and --feeds have to be at least 1.")
+
+    try:
+        rides = load_rides()
+    except ValueError as error:
+        parser.error(str(error))
+    if not rides:
+        parser.error("There are no rides to replay.")
+    connect_kwargs = dict(dbname="postgres", user="postgres", password="test", host=options.hostname, port=options.portnum)
+    writer_pool = ConnectionPool(connect_kwargs, pool_size=options.feeds, mode=POOLED)
+    reader_pool = ConnectionPool(connect_kwargs, pool_size=options.probers, mode=POOLED)
+    record_writer = RecordWriter("durations.csv", options.run_id or new_run_id())
+
+    with writer_pool.connection() as connection:
+        first_ride_id = first_free_ride_id(connection, options.points_table, get_trips_table(options.deployment))
+    freshness_run = FreshnessRun(
+        write_point, probe, rides, record_writer, f"mobilitydb_{options.deployment}", POOLED, first_ride_id,
+        options.speedup, options.feeds, options.marker_every, options.probe_interval, options.probe_timeout,
+        options.probers
+    )
+    try:
+        elapsed = freshness_run.run(options.duration, options.rides)
+        print(freshness_run.summary(elapsed))
+    except (Exception, psycopg2.Error) as error:
+        print("Error while replaying:", error)
+    finally:
+        if not options.keep:
+            with writer_pool.connection() as connection:
+                remove_rides(connection, options.points_table, first_ride_id)
+        writer_pool.close_all()
+        reader_pool.close_all()
+        record_writer.close()
+
+    print(record_writer.histograms.summary())
+    save_run(HISTOGRAMS_FILE, record_writer.run_id, record_writer.histograms)
@@ -0,0 +1,222 @@
+import argparse
+import glob
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+
+import psycopg2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+from connectionPool import ConnectionPool, CONNECTION_MODES, POOLED
+from loadGenerator import run_closed_loop, current_worker_id
+from ingestStrategies import COPY, insert_rows, synthetic_ride, read_rides
+from geofenceIndex import GeofenceIndex, generate_geofences, polygon_wkt, DEFAULT_CELL_SIZE, DEFAULT_VERTICES, \
+    DEFAULT_MIN_RADIUS, DEFAULT_MAX_RADIUS
+from recordWriter import RecordWriter, new_run_id
+from latencyHistogram import save_run
+
+# Where the geofences of a point are looked up
+DATABASE = "database"
+CLIENT = "client"
+EVALUATIONS = (DATABASE, CLIENT)
+
+# Geofences containing a point, answered with the GiST index of the geofence table
+GEOFENCE_QUERY = "SELECT fence_id FROM {table} WHERE ST_Intersects(zone, ST_SetSRID(ST_MakePoint(%s, %s), 4326));"
+
+# Configuration, set from the command line arguments at the bottom of this file
+options = None
+connection_pool = None
+record_writer = None
+
+
+def load_rides():
+    """The rides whose points are streamed, from the prepared point files or synthetic."""
+    if options.data_files:
+        paths = sorted(glob.glob(options.data_files))
+        if not paths:
+            raise ValueError(f"No point files match {options.data_files}.")
+        return list(read_rides(paths, options.rides))
+    rng = random.Random(options.seed)
+    start = datetime.now().replace(microsecond=0)
+    return [synthetic_ride(rng, index, rng.randint(1, 30), options.points_per_ride, start)
+            for index in range(options.rides)]
+
+
+def create_geofence_table(geofences):
+    """(Re)creates the geofence table with a GiST index on the zones and loads the geofences into it."""
+    with connection_pool.connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {options.geofence_table};")
+        cursor.execute(f"CREATE TABLE {options.geofence_table} (fence_id integer PRIMARY KEY, zone geometry(Polygon, 4326));")
+        connection.commit()
+        rows = [(fence_id, "SRID=4326;" + polygon_wkt(corners)) for fence_id, corners in enumerate(geofences)]
+        insert_rows(connection, COPY, options.geofence_table, ("fence_id", "zone"), rows)
+        cursor.execute(f"CREATE INDEX ON {options.geofence_table} USING GIST (zone);")
+        cursor.execute(f"ANALYZE {options.geofence_table};")
+        connection.commit()
+        cursor.close()
+
+
+def drop_geofence_table():
+    with connection_pool.connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {options.geofence_table};")
+        connection.commit()
+        cursor.close()
+
+
+def database_lookup():
+    """A function returning the fence ids containing a point, one query each on the worker's connection."""
+    statement = GEOFENCE_QUERY.format(table=options.geofence_table)
+
+    def lookup(lon, lat):
+        with connection_pool.connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(statement, (lon, lat))
+            fence_ids = [row[0] for row in cursor.fetchall()]
+            connection.commit()
+            cursor.close()
+        return fence_ids
+    return lookup
+
+
+def run_evaluation(evaluation, lookup, workers, rides, fences):
+    """
+    Streams the points of the rides through lookup, the rides taken from a shared queue by
+    workers workers, each one evaluating the points of its ride in order, as a tier
+    evaluating the feed of every rider would. A rider entering a geofence, a fence id
+    containing a point that did not contain the previous one, raises an alert. Every point
+    is logged as geofence_<evaluation> with the number of geofences as limit and the fence
+    ids found as rows.
+
+    :return: Points evaluated, alerts raised and the wall clock seconds it took.
+    """
+    queue = iter(rides)
+    queue_lock = threading.Lock()
+    stop = threading.Event()
+    totals = [0, 0]
+    totals_lock = threading.Lock()
+    connection_mode = connection_pool.mode if evaluation == DATABASE else "in_memory"
+
+    def evaluate_ride():
+        with queue_lock:
+            ride = next(queue, None)
+        if ride is None:
+            stop.set()
+            return
+        inside = set()
+        alerts = 0
+        for row in ride:
+            lat, lon = row[2], row[3]
+            start = time.time()
+            started = time.perf_counter()
+            fence_ids = lookup(lon, lat)
+            duration = time.perf_counter() - started
+            record_writer.write(
+                f"geofence_{evaluation}", fences, start, start + duration, duration, connection_mode,
+                connection_pool.last_connect_duration() if evaluation == DATABASE else 0.0,
+                duration, duration, 0.0, len(fence_ids), 0, current_worker_id()
+            )
+            current = set(fence_ids)
+            alerts += len(current - inside)
+            inside = current
+        with totals_lock:
+            totals[0] += len(ride)
+            totals[1] += alerts
+
+    started = time.perf_counter()
+    run_closed_loop(
+        evaluate_ride,
+        workers,
+        iterations=len(rides) // workers + 2,
+        # pooled workers hold their connection for the whole run
+        worker_context=connection_pool.connection if evaluation == DATABASE and connection_pool.mode == POOLED else None,
+        seed=options.seed,
+        stop=stop
+    )
+    return totals[0], totals[1], time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measures how fast streamed ride points are matched against many geofences, "
+                    "in MobilityDB or in an in-memory index of the client."
+    )
+    parser.add_argument("hostname", help="IP of the MobilityDB (manager) instance")
+    parser.add_argument("portnum", help="PostgreSQL port, usually 5432")
+    parser.add_argument("--evaluations", nargs="+", choices=EVALUATIONS, default=list(EVALUATIONS),
+                        help="'database' queries the geofence table for every point, 'client' looks the point up "
+                             "in an in-memory grid index of the geofences")
+    parser.add_argument("--geofences", nargs="+", type=int, default=[100, 1000, 10000],
+                        help="Numbers of geofences registered, every number is a run of its own")
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 8],
+                        help="Numbers of parallel workers, each evaluating one ride at a time")
+    parser.add_argument("--min-radius", type=float, default=DEFAULT_MIN_RADIUS, help="Smallest geofence radius in meters")
+    parser.add_argument("--max-radius", type=float, default=DEFAULT_MAX_RADIUS, help="Largest geofence radius in meters")
+    parser.add_argument("--vertices", type=int, default=DEFAULT_VERTICES, help="Corners of a geofence")
+    parser.add_argument("--cell-size", type=float, default=DEFAULT_CELL_SIZE,
+                        help="Edge length of a cell of the in-memory index in degrees")
+    parser.add_argument("--geofence-table", default="geofences", help="Table the geofences are loaded into")
+    parser.add_argument("--keep", action="store_true", help="Keep the geofence table of the last run")
+    parser.add_argument("--rides", type=int, default=200, help="Rides whose points are streamed by every run")
+    parser.add_argument("--points-per-ride", type=int, default=100, help="Points of a synthetic ride")
+    parser.add_argument("--data-files", default=None,
+                        help="Stream the rides of the prepared point files instead of synthetic ones, e.g. '../../data/merged*.csv'")
+    parser.add_argument("--connection-mode", choices=CONNECTION_MODES, default=POOLED,
+                        help="'pooled' keeps a connection per worker, 'per_query' connects for every point")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the geofences and the synthetic rides")
+    parser.add_argument("--run-id", default=None,
+                        help="Id written with every measurement, defaults to the start time plus a random suffix")
+    options = parser.parse_args()
+    if min(options.geofences) < 1 or min(options.workers) < 1:
+        parser.error("Geofences and workers have to be at least 1.")
+
+    try:
+        rides = load_rides()
+    except ValueError as error:
+        parser.error(str(error))
+    if not rides:
+        parser.error("There are no rides to stream.")
+    connection_pool = ConnectionPool(
+        dict(dbname="postgres", user="postgres", password="test", host=options.hostname, port=options.portnum),
+        pool_size=max(options.workers) + 1,
+        mode=options.connection_mode
+    )
+    record_writer = RecordWriter("durations.csv", options.run_id or new_run_id())
+    print(f"Streaming {len(rides)} rides with {sum(len(ride) for ride in rides)} points per run")
+
+    results = []
+    rng = random.Random(options.seed)
+    try:
+        for fences in options.geofences:
+            geofences = generate_geofences(rng, fences, options.min_radius, options.max_radius, options.vertices)
+            if DATABASE in options.evaluations:
+                create_geofence_table(geofences)
+            for evaluation in options.evaluations:
+                if evaluation == DATABASE:
+                    lookup = database_lookup()
+                else:
+                    index = GeofenceIndex(geofences, options.cell_size)
+                    print(f"{fences} geofences, {index.candidates():.1f} per occupied cell of the in-memory index")
+                    lookup = index.containing
+                for workers in options.workers:
+                    points, alerts, elapsed = run_evaluation(evaluation, lookup, workers, rides, fences)
+                    results.append((evaluation, fences, workers, points, alerts, elapsed))
+                    print(f"{evaluation}, {fences} geofences, {workers} workers: {points} points in {elapsed:.2f}s, "
+                          f"{points / elapsed:.0f} points/s, {alerts} alerts")
+    except (Exception, psycopg2.Error) as error:
+        print("Error while evaluating geofences:", error)
+    finally:
+        if not options.keep and DATABASE in options.evaluations:
+            drop_geofence_table()
+        connection_pool.close_all()
+        record_writer.close()
+
+    print(f"{'evaluation':<12}{'geofences':>10}{'workers':>9}{'points/s':>12}{'alerts':>9}")
+    for evaluation, fences, workers, points, alerts, elapsed in results:
+        print(f"{evaluation:<12}{fences:>10}{workers:>9}{points / elapsed:>12.0f}{alerts:>9}")
+    print(record_writer.histograms.summary())
+    save_run("histograms.json", record_writer.run_id, record_writer.histograms)
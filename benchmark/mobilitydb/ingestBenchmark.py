@@ -0,0 +1,182 @@
+import argparse
+import glob
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+
+import psycopg2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+from connectionPool import ConnectionPool, CONNECTION_MODES, POOLED
+from loadGenerator import run_closed_loop, current_worker_id
+from ingestStrategies import STRATEGIES, POINT_COLUMNS, TRIP_COLUMNS, insert_rows, synthetic_ride, read_rides, renumber, trip_row, \
+    first_free_ride_id, remove_rides
+from resultStream import row_size
+from recordWriter import RecordWriter, new_run_id
+from latencyHistogram import save_run
+
+# Tables a run ingests into, with the columns and the unit of the throughput
+TABLES = {
+    "points": (POINT_COLUMNS, "points"),
+    "trips": (TRIP_COLUMNS, "trips"),
+}
+
+# Configuration, set from the command line arguments at the bottom of this file
+options = None
+connection_pool = None
+record_writer = None
+
+
+def load_rides():
+    """The rides every run inserts, replayed from the prepared point files or synthetic. Built before any run is timed."""
+    if options.data_files:
+        paths = sorted(glob.glob(options.data_files))
+        if not paths:
+            raise ValueError(f"No point files match {options.data_files}.")
+        return list(read_rides(paths, options.rides))
+    rng = random.Random(options.seed)
+    start = datetime.now().replace(microsecond=0)
+    return [
+        synthetic_ride(rng, index, rng.randint(1, 30), options.points_per_ride, start)
+        for index in range(options.rides)
+    ]
+
+
+def table_rows(kind, rides, first_ride_id):
+    """Rows of the point or trip table of the rides, renumbered from first_ride_id."""
+    renumbered = [renumber(ride, first_ride_id + index) for index, ride in enumerate(rides)]
+    if kind == "trips":
+        return [trip_row(ride) for ride in renumbered]
+    return [row for ride in renumbered for row in ride]
+
+
+def run_ingest(kind, strategy, batch_size, writers, rows):
+    """
+    Inserts rows into the point or trip table in batches of batch_size rows, taken from a
+    shared queue by writers workers with a connection each. Every batch is one transaction
+    and is logged to the durations file as ingest_<kind>_<strategy>.
+
+    :return: Rows inserted and the wall clock seconds it took.
+    """
+    table = options.points_table if kind == "points" else options.trips_table
+    columns = TABLES[kind][0]
+    batches = iter([rows[index:index + batch_size] for index in range(0, len(rows), batch_size)])
+    batches_lock = threading.Lock()
+    stop = threading.Event()
+    inserted = [0]
+    inserted_lock = threading.Lock()
+
+    def write_batch():
+        with batches_lock:
+            batch = next(batches, None)
+        if batch is None:
+            stop.set()
+            return
+        with connection_pool.connection() as connection:
+            start = time.time()
+            started = time.perf_counter()
+            insert_rows(connection, strategy, table, columns, batch)
+            duration = time.perf_counter() - started
+        record_writer.write(
+            f"ingest_{kind}_{strategy}", len(batch), start, start + duration, duration, connection_pool.mode,
+            connection_pool.last_connect_duration(), duration, duration, 0.0, len(batch),
+            sum(row_size(row) for row in batch), current_worker_id()
+        )
+        with inserted_lock:
+            inserted[0] += len(batch)
+
+    started = time.perf_counter()
+    run_closed_loop(
+        write_batch,
+        writers,
+        iterations=len(rows) // batch_size + 2,
+        # pooled writers hold their connection for the whole run
+        worker_context=connection_pool.connection if connection_pool.mode == POOLED else None,
+        seed=options.seed,
+        stop=stop
+    )
+    return inserted[0], time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measures how fast rides are ingested into MobilityDB with different insert strategies."
+    )
+    parser.add_argument("hostname", help="IP of the MobilityDB (manager) instance")
+    parser.add_argument("portnum", help="PostgreSQL port, usually 5432")
+    parser.add_argument("--strategies", nargs="+", choices=STRATEGIES, default=list(STRATEGIES),
+                        help="'row' inserts row by row, 'values' sends one multi-row VALUES statement per batch, "
+                             "'execute_values' uses psycopg2.extras.execute_values, 'copy' streams the batch with COPY FROM STDIN")
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 100, 1000, 10000],
+                        help="Rows per batch, every batch is one transaction")
+    parser.add_argument("--writers", nargs="+", type=int, default=[1],
+                        help="Numbers of parallel writers, each with its own connection")
+    parser.add_argument("--tables", nargs="+", choices=sorted(TABLES), default=["points", "trips"],
+                        help="Ingest the points of the rides, their trips or both")
+    parser.add_argument("--points-table", default="cycling_data", help="Table the points are inserted into")
+    parser.add_argument("--trips-table", default="cycling_trips", help="Table the trips are inserted into")
+    parser.add_argument("--rides", type=int, default=200, help="Rides inserted by every run")
+    parser.add_argument("--points-per-ride", type=int, default=100, help="Points of a synthetic ride")
+    parser.add_argument("--data-files", default=None,
+                        help="Replay the rides of the prepared point files instead of synthetic ones, e.g. '../../data/merged*.csv'")
+    parser.add_argument("--keep", action="store_true",
+                        help="Keep the inserted rides instead of deleting them after every run")
+    parser.add_argument("--connection-mode", choices=CONNECTION_MODES, default=POOLED,
+                        help="'pooled' keeps a connection per writer, 'per_query' connects for every batch")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the synthetic rides")
+    parser.add_argument("--run-id", default=None,
+                        help="Id written with every measurement, defaults to the start time plus a random suffix")
+    options = parser.parse_args()
+    if min(options.batch_sizes) < 1 or min(options.writers) < 1:
+        parser.error("Batch sizes and writers have to be at least 1.")
+
+    try:
+        rides = load_rides()
+    except ValueError as error:
+        parser.error(str(error))
+    if not rides:
+        parser.error("There are no rides to insert.")
+    connection_pool = ConnectionPool(
+        dict(dbname="postgres", user="postgres", password="test", host=options.hostname, port=options.portnum),
+        pool_size=max(options.writers) + 1,
+        mode=options.connection_mode
+    )
+    record_writer = RecordWriter("durations.csv", options.run_id or new_run_id())
+    print(f"Ingesting {len(rides)} rides with {sum(len(ride) for ride in rides)} points per run")
+
+    results = []
+    with connection_pool.connection() as connection:
+        next_ride_id = first_free_ride_id(connection, options.points_table, options.trips_table)
+    try:
+        for kind in options.tables:
+            table = options.points_table if kind == "points" else options.trips_table
+            unit = TABLES[kind][1]
+            for strategy in options.strategies:
+                for batch_size in options.batch_sizes:
+                    for writers in options.writers:
+                        first_ride_id = next_ride_id
+                        rows = table_rows(kind, rides, first_ride_id)
+                        next_ride_id += len(rides)
+                        try:
+                            inserted, elapsed = run_ingest(kind, strategy, batch_size, writers, rows)
+                        finally:
+                            if not options.keep:
+                                with connection_pool.connection() as connection:
+                                    remove_rides(connection, table, first_ride_id)
+                        results.append((kind, strategy, batch_size, writers, inserted, elapsed))
+                        print(f"{kind} {strategy}, batches of {batch_size}, {writers} writers: {inserted} {unit} "
+                              f"in {elapsed:.2f}s, {inserted / max(elapsed, 1e-9):.0f} {unit}/s")
+    except (Exception, psycopg2.Error) as error:
+        print("Error while ingesting:", error)
+    finally:
+        connection_pool.close_all()
+        record_writer.close()
+
+    print(f"{'table':<8}{'strategy':<16}{'batch':>8}{'writers':>9}{'rows/s':>12}")
+    for kind, strategy, batch_size, writers, inserted, elapsed in results:
+        print(f"{kind:<8}{strategy:<16}{batch_size:>8}{writers:>9}{inserted / max(elapsed, 1e-9):>12.0f}")
+    print(record_writer.histograms.summary())
+    save_run("histograms.json", record_writer.run_id, record_writer.histograms)
@@ -5,8 +5,12 @@ import matplotlib.pyplot as plt
 csv_file = "mobilitydb-simra-durations-single.csv"  # Adjust this path as needed
 
 try:
-    dataframe = pd.read_csv(csv_file, header=None, names=["operation", "count", "start_time", "end_time", "duration"])
+    dataframe = pd.read_csv(csv_file, header=None, names=["operation", "count", "start_time", "end_time", "duration", "connection_mode", "connect_duration",
+                     "execute_duration", "first_row_duration", "fetch_duration", "rows", "bytes", "run_id", "worker_id", "intended_start", "phase", "execution_mode",
+                     "expected_rows"])
 
+    # Queries of the warm-up phase are not part of the results
+    dataframe = dataframe[dataframe["phase"].fillna("measure") != "warmup"]
     dataframe["leading_attribute"] = dataframe["operation"].str.split("_").str[0]
 
     average_durations = dataframe.groupby("leading_attribute")["duration"].mean().reset_index()
@@ -6,14 +6,24 @@ csv_file = "mobilitydb-simra-durations.csv"  # Adjust this path as needed
 
 try:
     # Load the CSV file into a DataFrame
-    df = pd.read_csv(csv_file, header=None, names=["query_type", "limit", "start_time", "end_time", "duration"])
+    df = pd.read_csv(csv_file, header=None, names=["query_type", "limit", "start_time", "end_time", "duration", "connection_mode", "connect_duration",
+                     "execute_duration", "first_row_duration", "fetch_duration", "rows", "bytes", "run_id", "worker_id", "intended_start", "phase", "execution_mode",
+                     "expected_rows"])
 
-    # Calculate average durations for each query type
-    avg_durations = df.groupby("query_type")["duration"].mean()
+    # Older result files have no connection columns, they were always measured with a new connection per query
+    df["connection_mode"] = df["connection_mode"].fillna("per_query")
+    df["connect_duration"] = df["connect_duration"].fillna(0)
+    # Queries of the warm-up phase are not part of the results
+    df = df[df["phase"].fillna("measure") != "warmup"]
+    # Time the client waited for a query including opening the connection, if one was opened
+    df["total_duration"] = df["duration"] + df["connect_duration"]
+
+    # Calculate average durations for each query type, pooled and per_query side by side
+    avg_durations = df.groupby(["query_type", "connection_mode"])["total_duration"].mean().unstack("connection_mode")
 
     # Plot the results
     plt.figure(figsize=(10, 6))
-    avg_durations.plot(kind="bar", color="lightcoral", edgecolor="black")
+    avg_durations.plot(kind="bar", edgecolor="black", ax=plt.gca())
 
     plt.title("Average Query Execution Time by Query Type", fontsize=16)
     plt.ylabel("Duration (seconds)", fontsize=14)
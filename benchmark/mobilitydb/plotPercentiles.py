@@ -0,0 +1,48 @@
+import os
+import sys
+import pandas as pd
+import matplotlib.pyplot as plt
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+from latencyHistogram import load_runs, HistogramSet, PERCENTILES
+
+# Relative path to the histogram file, optionally followed by the run ids to plot (default: all runs merged)
+histogram_file = sys.argv[1] if len(sys.argv) > 1 else "mobilitydb-simra-histograms.json"
+run_ids = sys.argv[2:]
+
+try:
+    runs = load_runs(histogram_file)
+    if not runs:
+        raise FileNotFoundError
+    histograms = HistogramSet()
+    for run_id in run_ids or runs:
+        histograms.merge(runs[run_id])
+    print(histograms.summary())
+
+    # Tail latency per query type, one bar per percentile
+    percentiles = pd.DataFrame(
+        {
+            **{f"p{p:g}": [histogram.percentile(p) for histogram in histograms.histograms.values()] for p in PERCENTILES},
+            "max": [histogram.max() for histogram in histograms.histograms.values()],
+        },
+        index=list(histograms.histograms.keys()),
+    ).sort_index()
+
+    plt.figure(figsize=(12, 6))
+    percentiles.plot(kind="bar", edgecolor="black", logy=True, ax=plt.gca())
+
+    plt.title("Query Latency Percentiles by Query Type", fontsize=16)
+    plt.ylabel("Duration (seconds, log scale)", fontsize=14)
+    plt.xlabel("Query Type", fontsize=14)
+    plt.xticks(rotation=45, ha="right", fontsize=12)
+    plt.grid(axis="y", linestyle="--", alpha=0.7)
+
+    plt.tight_layout()
+    plt.show()
+
+except FileNotFoundError:
+    print(f"Error: The file '{histogram_file}' was not found or is empty. Please check the file path and try again.")
+except KeyError as e:
+    print(f"Error: Run {e} is not in '{histogram_file}'.")
+except Exception as e:
+    print(f"An error occurred: {e}")
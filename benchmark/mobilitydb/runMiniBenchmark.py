@@ -3,476 +3,338 @@ import threading
 import random
 import time
 import os
-import csv
 import threading
 import sys
+import argparse
+import glob
+from datetime import datetime
 
-hostname = sys.argv[1]
-portnum = sys.argv[2]
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+from connectionPool import CONNECTION_MODES, POOLED
+from loadGenerator import worker_rng, current_worker_id, current_intended_start
+from resultStream import DEFAULT_FETCH_SIZE, row_size
+from ingestStrategies import ROW, COPY, POINT_COLUMNS, TRIP_COLUMNS, FILE_POINT_COLUMNS, insert_rows, copy_file, synthetic_ride, trip_row
+from queryRegistry import QueryRegistry
+from benchmarkDriver import BenchmarkDriver, add_load_arguments, add_parameter_arguments
+from engineAdapter import run_query
+from postgresAdapter import ADAPTERS
+from recordWriter import RecordWriter, new_run_id
+from workloadSpec import WorkloadQuery
+
+# Configuration, set from the command line arguments at the bottom of this file
+hostname = None
+portnum = None
 deployment = "multi"
-if len(sys.argv) == 4:
-    deployment = sys.argv[3]
+# Engine adapter (see postgresAdapter.py) the queries run through, inserts and setup use its connection_pool
+adapter = None
+connection_pool = None
+options = None
+# Buffers the measurements and appends them to durations.csv in the background
+record_writer = None
 default_query = "SELECT * FROM cycling_data "
-
-def generate_random_position_in_Berlin():
-    poslong = random.uniform(13.088346, 13.761160)
-    poslat = random.uniform(52.338049, 52.675454)
-    return poslong, poslat
+# Last ride id handed out to an insert, see next_ride_id
+last_ride_id = None
+ride_id_lock = threading.Lock()
 
 def clear_table(table):
     try:
-        connection = psycopg2.connect(
-            dbname="postgres",
-            user="postgres",
-            password="test",
-            host=hostname,
-            port=portnum
-        )
-        cursor = connection.cursor()
-        cursor.execute(f"DELETE FROM {table};")
-        connection.commit()
-        print(f"Table {table} cleared successfully")
+        with connection_pool.connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(f"DELETE FROM {table};")
+            connection.commit()
+            print(f"Table {table} cleared successfully")
     except (Exception, psycopg2.Error) as error:
         print("Error while connecting to PostgreSQL", error)
-    finally:
-        if (connection):
-            cursor.close()
-            connection.close()
-            print("PostgreSQL connection is closed")
 
 def initial_insert():
+    """
+    Loads the prepared point and trip files (data/merged*.csv, data/trips_merged*.csv) with
+    COPY FROM STDIN, one transaction per file, and computes point_geom like the setup scripts.
+    """
+    data_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data")
     try:
-
-        connection = psycopg2.connect(
-            dbname="postgres",
-            user="postgres",
-            password="test",
-            host=hostname,
-            port=portnum
-        )
-        counter = 1;
-        while counter <= 7:
-            file_path = "../../data/"
-            file = file_path + "merged0" + str(counter) + ".csv"
-            with open(file, 'r') as f:
-                reader = csv.reader(f)
-                row_counter = 0
-                duration = 0
-                #set last row to first row 
-                last_row = next(reader) # skip header row and get first row
-                for row in reader:
-                    cursor = connection.cursor()
-                    query = f"INSERT INTO cycling_data(ride_id, rider_id, latitude, longitude, x, y, z, timestamp, point_geom, line_geom) VALUES ({row[0]},{row[1]},{row[2]},{row[3]},{row[4]},{row[5]},{row[6]},'{row[7]}', ST_SetSRID(ST_MakePoint({row[2]},{row[3]}), 4326), ST_MakeLine(ST_SetSRID(ST_MakePoint({last_row[2]},{last_row[3]}), 4326), ST_SetSRID(ST_MakePoint({row[2]},{row[3]}), 4326)));"
-                    last_row = row
-                    cursor.execute(query)
-                    connection.commit()
+        with connection_pool.connection() as connection:
+            for file in sorted(glob.glob(os.path.join(data_path, "merged*.csv"))):
+                rows = copy_file(connection, "cycling_data", file, FILE_POINT_COLUMNS)
+                print(f"Copied {rows} points of {file} into cycling_data")
+            cursor = connection.cursor()
+            cursor.execute("UPDATE cycling_data SET point_geom = ST_SetSRID(ST_MakePoint(longitude, latitude), 4326) WHERE point_geom IS NULL;")
+            connection.commit()
+            for file in sorted(glob.glob(os.path.join(data_path, "trips_merged*.csv"))):
+                rows = copy_file(connection, "cycling_trips", file, TRIP_COLUMNS, delimiter=";", header=True)
+                print(f"Copied {rows} trips of {file} into cycling_trips")
     except (Exception, psycopg2.Error) as error:
         print("Error while connecting to PostgreSQL", error)
-    finally:
-        if (connection):
-            cursor.close()
-            connection.close()
-            print("PostgreSQL connection is closed")
-    try:
-
-        connection = psycopg2.connect(
-            dbname="postgres",
-            user="postgres",
-            password="test",
-            host=hostname,
-            port=portnum
-        )
-        counter = 1;
-        while counter <= 7:
-            file_path = "../../data/"
-            file = file_path + "trips" + str(counter) + ".csv"
-            with open(file, 'r') as f:
-                reader = csv.reader(f, delimiter=';');
-                row_counter = 0
-                duration = 0
-                #set last row to first row 
-                last_row = next(reader) # skip header row and get first row
-                for row in reader:
-                    cursor = connection.cursor()
-                    query = f"INSERT INTO cycling_trips(ride_id, rider_id, trip) VALUES ({row[0]},{row[1]},{row[2]},{row[3]});"
-                    last_row = row
-                    cursor.execute(query)
-                    connection.commit()
-    except (Exception, psycopg2.Error) as error:
-        print("Error while connecting to PostgreSQL", error)
-    finally:
-        if (connection):
-            cursor.close()
-            connection.close()
-            print("PostgreSQL connection is closed")
 
 def get_max_ride_id():
     try:
-        connection = psycopg2.connect(
-            dbname="postgres",
-            user="postgres",
-            password="test",
-            host=hostname,
-            port=portnum
-        )
-        cursor = connection.cursor()
-        cursor.execute("SELECT MAX(ride_id) FROM cycling_data;")
-        records = cursor.fetchall()
-        return records[0][0]
+        with connection_pool.connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("SELECT MAX(ride_id) FROM cycling_data;")
+            records = cursor.fetchall()
+            return records[0][0]
     except (Exception, psycopg2.Error) as error:
         print("Error while connecting to PostgreSQL", error)
-    finally:
-        if (connection):
-            cursor.close()
-            connection.close()
 
 
-def execute_query(query="SELECT * FROM cycling_data " , query_type = "surrounding", limit = 50, host = hostname, port = "5432", user = "postgres", password = "test"):
-    try:
+def log_duration(query_type, limit, start, end, duration, execute_duration=None, first_row_duration=None, fetch_duration=0.0, rows=0, size=0, intended_start=None):
+    """
+    Hands one insert measurement, together with the connection mode and the time spent connecting, to the
+    record_writer; queries are logged by engineAdapter.run_query. For inserts the whole duration counts as
+    execution. intended_start is the time an open-loop insert was scheduled for.
+    """
+    execute_duration = duration if execute_duration is None else execute_duration
+    first_row_duration = duration if first_row_duration is None else first_row_duration
+    record_writer.write(
+        query_type, limit, start, end, duration, connection_pool.mode, connection_pool.last_connect_duration(),
+        execute_duration, first_row_duration, fetch_duration, rows, size, current_worker_id(), intended_start
+    )
+
+
+############################### query types ###############################
+# Every query type builds a query for the engine adapter (see postgresAdapter.py), these
+# queries inline their random parameters, so they are templates without placeholders.
+
+QUERY_TYPES = QueryRegistry()
+
+def trips_table():
+    """The trips table of the deployment, the multi-node setup joins against a reference table."""
+    return "cycling_trips_ref" if deployment == "multi" else "cycling_trips"
+
+@QUERY_TYPES.register("surrounding")
+def surrounding(limit):
+    poslong, poslat = driver.position()
+    query_addition = f"WHERE ST_DWithin(cycling_data.point_geom::geography,ST_SetSRID(ST_MakePoint({poslong},{poslat}), 4326)::geography, 5000);"
+    return default_query + query_addition, {}
+
+#get intersections of a specific ride    
+@QUERY_TYPES.register("ride_traffic")
+def ride_traffic(limit):
+    rng = worker_rng()
+    query_table = trips_table()
+    ride_id = rng.randint(1, 596)   
+    query_addition =f"SELECT a.ride_id AS trip_id_1, b.ride_id AS trip_id_2, a.trip && b.trip AS intersects FROM  {query_table} a JOIN  {query_table} b ON a.ride_id <> b.ride_id WHERE a.ride_id = {ride_id} AND a.trip && b.trip LIMIT {limit};"
+    #again, remove default select all
+    return query_addition, {}
+
+#requires a complex join, therefore needs a reference table to join, setup is found in readme.md of multi
+@QUERY_TYPES.register("intersections")
+def intersections(limit):
+    poslongstart, poslatstart = driver.position()
+    poslongend, poslatend = driver.position()
+    query_table = trips_table()
+    query_addition =f"SELECT a.ride_id AS trip_id_1, b.ride_id AS trip_id_2, a.trip && b.trip AS intersects FROM {query_table} a JOIN {query_table} b ON a.ride_id <> b.ride_id  WHERE a.trip && b.trip LIMIT {limit};"
+    #exclude default select all
+    return query_addition, {}
+
+@QUERY_TYPES.register("bounding_box")
+def bounding_box(limit):
+    poslong, poslat = driver.position()
+    query_addition = f"WHERE ST_Intersects(cycling_data.point_geom::geography, ST_MakeEnvelope({poslong-0.1}, {poslat-0.1}, {poslong+0.1}, {poslat+0.1}, 4326)::geography) LIMIT {limit};"
+    return default_query + query_addition, {}
+
+@QUERY_TYPES.register("polygonal_area")
+def polygonal_area(limit):
+    # for now, static polygonal area
+    lat1 , lon1 = driver.position()
+    lat2 , lon2 = driver.position()
+    lat3 , lon3 = driver.position()
+    lat4 , lon4 = driver.position()
+    query_addition = f"WHERE ST_Intersects(cycling_data.point_geom::geography, ST_GeomFromText('POLYGON(({lon1} {lat1}, {lon2} {lat2}, {lon3} {lat3}, {lon1} {lat1}))', 4326)::geography) LIMIT {limit};"
+    return default_query + query_addition, {}
+
+#temporal query POSTGIS style
+@QUERY_TYPES.register("time_interval")
+def time_interval(limit):
+    # define start and end time for the query
+    start_time = "2022-07-01 00:00:00"
+    end_time = "2023-07-01 01:00:00"
+    query_addition = f"WHERE timestamp BETWEEN '{start_time}' AND '{end_time}' LIMIT {limit};"
+    return default_query + query_addition, {}
 
-        connection = psycopg2.connect(
-            dbname="postgres",
-            user="postgres",
-            password="test",
-            host=hostname,
-            port=portnum
-        )
-        query_table = "cycling_trips_ref"
-        if deployment == "single":
-            query_table = "cycling_trips"
-    #match case in python
-        match query_type:
-            case "surrounding":
-                poslong, poslat = generate_random_position_in_Berlin()
-                query_addition = f"WHERE ST_DWithin(cycling_data.point_geom::geography,ST_SetSRID(ST_MakePoint({poslong},{poslat}), 4326)::geography, 5000);"
-                cursor = connection.cursor()
-                query = query + query_addition
-                print(query)
-                start = time.time()
-                cursor.execute(query)
-                # get time after executing query
-                end = time.time()
-                duration = end - start
-                # write the duration, along with other query data, to a file
-                with open("durations.csv", "a") as file:
-                    file.write(f"{query_type},{limit},{start},{end},{duration}\n")
-                records = cursor.fetchall()
-
-                print(records)
-                
-                # get paths between two random points
-
-            #get intersections of a specific ride    
-            case "ride_traffic":
-                cursor = connection.cursor()
-                ride_id = random.randint(1, 596)   
-                query_addition =f"SELECT a.ride_id AS trip_id_1, b.ride_id AS trip_id_2, a.trip && b.trip AS intersects FROM  {query_table} a JOIN  {query_table} b ON a.ride_id <> b.ride_id WHERE a.ride_id = {ride_id} AND a.trip && b.trip LIMIT {limit};"
-                #again, remove default select all
-                query = query_addition
-                print(query)
-                start = time.time()
-                cursor.execute(query)
-                # get time after executing query
-                end = time.time()
-                duration = end - start
-                # write the duration, along with other query data, to a file
-                with open("durations.csv", "a") as file:
-                    file.write(f"{query_type},{limit},{start},{end},{duration}\n")
-                records = cursor.fetchall()
-                print(records)
-            #requires a complex join, therefore needs a reference table to join, setup is found in readme.md of multi
-            case "intersections":
-                cursor = connection.cursor()
-                poslongstart, poslatstart = generate_random_position_in_Berlin()
-                poslongend, poslatend = generate_random_position_in_Berlin()
-                query_table = "cycling_trips_ref"
-                if deployment == "single":
-                    query_table = "cycling_trips"
-                query_addition =f"SELECT a.ride_id AS trip_id_1, b.ride_id AS trip_id_2, a.trip && b.trip AS intersects FROM {query_table} a JOIN {query_table} b ON a.ride_id <> b.ride_id  WHERE a.trip && b.trip LIMIT {limit};"
-                #exclude default select all
-                query = query_addition
-                print(query)
-                start = time.time()
-                cursor.execute(query)
-                # get time after executing query
-                end = time.time()
-                duration = end - start
-                # write the duration, along with other query data, to a file
-                with open("durations.csv", "a") as file:
-                    file.write(f"{query_type},{limit},{start},{end},{duration}\n")
-                records = cursor.fetchall()
-                print(records)
-            #insert a single trip into the database
-            case "insert_ride":
-                path_length = 0
-                
-                random_rider_id = random.randint(1, 30)
-                ride_id = get_max_ride_id() + 1
-                random_latitude = random.uniform(52.338049, 52.675454)
-                random_longitude = random.uniform(13.088346, 13.761160)
-                ride_date = time.strftime('%Y-%m-%d %H:%M:%S')
-                initial_start = time.strftime('%Y-%m-%d %H:%M:%S.%f')[:3]
-                duration = 0
-                while path_length < limit:
-                    ride_date = time.strftime('%Y-%m-%d %H:%M:%S.%f')[:3]
-                    insert_query = f"INSERT INTO cycling_data (ride_id, rider_id, latitude, longitude, x, y, z, timestamp, point_geom, line_geom) VALUES ({ride_id}, {random_rider_id}, {random_latitude}, {random_longitude}, 1, 1, 1, {ride_date}, ST_SetSRID(ST_MakePoint({random_longitude}, {random_latitude}), 4326), ST_MakeLine(ST_SetSRID(ST_MakePoint({random_longitude}, {random_latitude}), 4326), ST_SetSRID(ST_MakePoint({random_longitude}, {random_latitude}), 4326)));"
-                    random_latitude  += random.uniform(-0.000001, 0.000001)
-                    random_longitude += random.uniform(-0.000001, 0.000001)
-                    ride_date = time.strftime('%Y-%m-%d %H:%M:%S.%f')[:3]
-                    cursor = connection.cursor()
-                    start = time.time()
-                    cursor.execute(query)
-                    # get time after executing query
-                    end = time.time()
-                    duration += end - start
-                    path_length += 1
-                end = time.strftime('%Y-%m-%d %H:%M:%S.%f')[:3]
-                with open("durations.csv", "a") as file:
-                    file.write(f"{query_type},1,{initial_start},{end},{duration}\n")
-                print(f"Ride {ride_id} of length {path_length} inserted successfully into cycling_data table")
-                connection.commit()
-            #bulk insert ride_data
-
-            case "bulk_insert_rides":
-                cursor = connection.cursor()
-                rides_inserted = 0
-                ride_id = get_max_ride_id() + 1
-                while rides_inserted < limit:
-                    path_length = 0
-                    random_rider_id = random.randint(1, 30)
-                    
-                    random_latitude = random.uniform(52.338049, 52.675454)
-                    random_longitude = random.uniform(13.088346, 13.761160)
-                    ride_date = time.strftime('%Y-%m-%d %H:%M:%S')
-                    initial_start = time.strftime('%Y-%m-%d %H:%M:%S.%f')[:3]
-                    duration = 0
-                    while path_length < limit:
-                        ride_date = time.strftime('%Y-%m-%d %H:%M:%S.%f')[:3]
-                        insert_query = f"INSERT INTO cycling_data (ride_id, rider_id, latitude, longitude, x, y, z, timestamp, point_geom, line_geom) VALUES ({ride_id}, {random_rider_id}, {random_latitude}, {random_longitude}, 1, 1, 1, {ride_date}, ST_SetSRID(ST_MakePoint({random_longitude}, {random_latitude}), 4326), ST_MakeLine(ST_SetSRID(ST_MakePoint({random_longitude}, {random_latitude}), 4326), ST_SetSRID(ST_MakePoint({random_longitude}, {random_latitude}), 4326)));"
-                        random_latitude  += random.uniform(-0.000001, 0.000001)
-                        random_longitude += random.uniform(-0.000001, 0.000001)
-                        ride_date = time.strftime('%Y-%m-%d %H:%M:%S.%f')[:3]
-                        
-                        start = time.time()
-                        cursor.execute(query)
-                        # get time after executing query
-                        end = time.time()
-                        duration += end - start
-                        path_length += 1
-                    end = time.strftime('%Y-%m-%d %H:%M:%S.%f')[:3]
-                    rides_inserted += 1
-                    ride_id += 1
-                with open("durations.csv", "a") as file:
-                    file.write(f"{query_type},1,{initial_start},{end},{duration}\n")
-                print(f"Ride {ride_id} of length {path_length} inserted successfully into cycling_data table")
-                connection.commit()
-
-            case "bounding_box":
-                cursor = connection.cursor()
-                poslong, poslat = generate_random_position_in_Berlin()
-                query_addition = f"WHERE ST_Intersects(cycling_data.point_geom::geography, ST_MakeEnvelope({poslong-0.1}, {poslat-0.1}, {poslong+0.1}, {poslat+0.1}, 4326)::geography) LIMIT {limit};"
-                query = query + query_addition
-                print(query)
-                start = time.time()
-                cursor.execute(query)
-                # get time after executing query
-                end = time.time()
-                duration = end - start
-                # write the duration, along with other query data, to a file
-                with open("durations.csv", "a") as file:
-                    file.write(f"{query_type},{limit},{start},{end},{duration}\n")
-                records = cursor.fetchall()
-                print(records)
-
-            case "polygonal_area":
-                cursor = connection.cursor()
-                # for now, static polygonal area
-                lat1 , lon1 = generate_random_position_in_Berlin()
-                lat2 , lon2 = generate_random_position_in_Berlin()
-                lat3 , lon3 = generate_random_position_in_Berlin()
-                lat4 , lon4 = generate_random_position_in_Berlin()
-                query_addition = f"WHERE ST_Intersects(cycling_data.point_geom::geography, ST_GeomFromText('POLYGON(({lon1} {lat1}, {lon2} {lat2}, {lon3} {lat3}, {lon1} {lat1}))', 4326)::geography) LIMIT {limit};"
-                query = query + query_addition
-                start = time.time()
-                cursor.execute(query)
-                # get time after executing query
-                end = time.time()
-                duration = end - start
-                # write the duration, along with other query data, to a file
-                with open("durations.csv", "a") as file:
-                    file.write(f"{query_type},{limit},{start},{end},{duration}\n")
-                records = cursor.fetchall()
-                print(records)
-            
-            #temporal query POSTGIS style
-            case "time_interval":
-                cursor = connection.cursor()
-                # define start and end time for the query
-                start_time = "2022-07-01 00:00:00"
-                end_time = "2023-07-01 01:00:00"
-                query_addition = f"WHERE timestamp BETWEEN '{start_time}' AND '{end_time}' LIMIT {limit};"
-                query = query + query_addition
-                start = time.time()
-                cursor.execute(query)
-                # get time after executing query
-                end = time.time()
-                duration = end - start
-                # write the duration, along with other query data, to a file
-                with open("durations.csv", "a") as file:
-                    file.write(f"{query_type},{limit},{start},{end},{duration}\n")
-                records = cursor.fetchall()
-                print(records)
-
-            #MobilityDB feature test
-            case "get_trip":
-                cursor = connection.cursor()
-                # define start and end time for the query
-                ride_id = random.randint(1, 400)
-                query_addition = f" SELECT asText(trip) AS trip_geom  FROM cycling_trips WHERE ride_id = {ride_id};"
-                #dont use default select all
-                query = query_addition
-                print(query)
-                start = time.time()
-                cursor.execute(query)
-                # get time after executing query
-                end = time.time()
-                duration = end - start
-                # write the duration, along with other query data, to a file
-                with open("durations.csv", "a") as file:
-                    file.write(f"{query_type},{limit},{start},{end},{duration}\n")
-                records = cursor.fetchall()
-                print(records)
-            case "get_trip_length":
-                cursor = connection.cursor()
-                # define start and end time for the query
-                ride_id = random.randint(1, 400)
-                query_addition = f" SELECT length(trip) FROM cycling_trips WHERE ride_id = {ride_id};"
-                #dont use default select all
-                query = query_addition
-                print(query)
-                start = time.time()
-                cursor.execute(query)
-                # get time after executing query
-                end = time.time()
-                duration = end - start
-                # write the duration, along with other query data, to a file
-                with open("durations.csv", "a") as file:
-                    file.write(f"{query_type},{limit},{start},{end},{duration}\n")
-                records = cursor.fetchall()
-                print(records)
-            #MobiilityDB temporal support test
-            case "get_trip_duration":
-                cursor = connection.cursor()
-                # define start and end time for the query
-                ride_id = random.randint(1, 400)
-                query_addition = f"SELECT duration(trip) FROM cycling_trips WHERE ride_id = {ride_id};"
-                #dont use default select all
-                query = query_addition
-                start = time.time()
-                cursor.execute(query)
-                # get time after executing query
-                end = time.time()
-                duration = end - start
-                # write the duration, along with other query data, to a file
-                with open("durations.csv", "a") as file:
-                    file.write(f"{query_type},{limit},{start},{end},{duration}\n")
-                records = cursor.fetchall()
-                print(records)
-            case "get_trip_speed":
-                cursor = connection.cursor()
-                # define start and end time for the query
-                ride_id = random.randint(1, 400)
-                query_addition = f"SELECT speed(trip) FROM cycling_trips WHERE ride_id = {ride_id};"
-                #dont use default select all
-                query = query_addition
-                start = time.time()
-                cursor.execute(query)
-                # get time after executing query
-                end = time.time()
-                duration = end - start
-                # write the duration, along with other query data, to a file
-                with open("durations.csv", "a") as file:
-                    file.write(f"{query_type},{limit},{start},{end},{duration}\n")
-                records = cursor.fetchall()
-                print(records)
-            case "interval_around_timestamp":
-                cursor = connection.cursor()
-                # define start and end time for the query
-                start_time = "2023-07-01 00:00:00"
-                query_addition = f"WHERE timestamp BETWEEN '{start_time}' - INTERVAL '1 hour' AND '{start_time} + INTERVAL '1 hour' LIMIT {limit};"
-                query = query + query_addition
-                start = time.time()
-                cursor.execute(query)
-                # get time after executing query
-                end = time.time()
-                duration = end - start
-                # write the duration, along with other query data, to a file
-                with open("durations.csv", "a") as file:
-                    file.write(f"{query_type},{limit},{start},{end},{duration}\n")
-                records = cursor.fetchall()
-                print(records)
-            case "spatiotemporal":
-                cursor = connection.cursor()
-                # define start and end time for the query
-                start_time = "2023-07-01 00:00:00"
-                end_time = "2023-07-01 01:00:00"
-                poslong, poslat = generate_random_position_in_Berlin()
-                query_addition = f"WHERE timestamp BETWEEN '{start_time}' AND '{end_time}' AND ST_DWithin(cycling_data.point_geom::geography,ST_SetSRID(ST_MakePoint({poslong},{poslat}), 4326)::geography, 5000) LIMIT {limit};"
-                query = query + query_addition
-                start = time.time()
-                cursor.execute(query)
-                # get time after executing query
-                end = time.time()
-                duration = end - start
-                # write the duration, along with other query data, to a file
-                with open("durations.csv", "a") as file:
-                    file.write(f"{query_type},{limit},{start},{end},{duration}\n")
-                records = cursor.fetchall()
-                print(records)
+#MobilityDB feature test
+@QUERY_TYPES.register("get_trip")
+def get_trip(limit):
+    rng = worker_rng()
+    # define start and end time for the query
+    ride_id = rng.randint(1, 400)
+    query_addition = f" SELECT asText(trip) AS trip_geom  FROM cycling_trips WHERE ride_id = {ride_id};"
+    #dont use default select all
+    return query_addition, {}
 
+@QUERY_TYPES.register("get_trip_length")
+def get_trip_length(limit):
+    rng = worker_rng()
+    # define start and end time for the query
+    ride_id = rng.randint(1, 400)
+    query_addition = f" SELECT length(trip) FROM cycling_trips WHERE ride_id = {ride_id};"
+    #dont use default select all
+    return query_addition, {}
+
+#MobiilityDB temporal support test
+@QUERY_TYPES.register("get_trip_duration")
+def get_trip_duration(limit):
+    rng = worker_rng()
+    # define start and end time for the query
+    ride_id = rng.randint(1, 400)
+    query_addition = f"SELECT duration(trip) FROM cycling_trips WHERE ride_id = {ride_id};"
+    #dont use default select all
+    return query_addition, {}
+
+@QUERY_TYPES.register("get_trip_speed")
+def get_trip_speed(limit):
+    rng = worker_rng()
+    # define start and end time for the query
+    ride_id = rng.randint(1, 400)
+    query_addition = f"SELECT speed(trip) FROM cycling_trips WHERE ride_id = {ride_id};"
+    #dont use default select all
+    return query_addition, {}
+
+@QUERY_TYPES.register("interval_around_timestamp")
+def interval_around_timestamp(limit):
+    # define start and end time for the query
+    start_time = "2023-07-01 00:00:00"
+    query_addition = f"WHERE timestamp BETWEEN '{start_time}' - INTERVAL '1 hour' AND '{start_time} + INTERVAL '1 hour' LIMIT {limit};"
+    return default_query + query_addition, {}
+
+@QUERY_TYPES.register("spatiotemporal")
+def spatiotemporal(limit):
+    # define start and end time for the query
+    start_time = "2023-07-01 00:00:00"
+    end_time = "2023-07-01 01:00:00"
+    poslong, poslat = driver.position()
+    query_addition = f"WHERE timestamp BETWEEN '{start_time}' AND '{end_time}' AND ST_DWithin(cycling_data.point_geom::geography,ST_SetSRID(ST_MakePoint({poslong},{poslat}), 4326)::geography, 5000) LIMIT {limit};"
+    return default_query + query_addition, {}
+
+############################### inserts ###############################
+# Inserts run several statements each and are timed by themselves instead of through the adapter,
+# the strategies are compared by ingestBenchmark.py
+
+def next_ride_id():
+    """A ride id no other ride has, the first one follows the highest ride id in cycling_data."""
+    global last_ride_id
+    with ride_id_lock:
+        if last_ride_id is None:
+            last_ride_id = int(get_max_ride_id() or 0)
+        last_ride_id += 1
+        return last_ride_id
+
+def insert_rides(query_type, rides, points, strategy):
+    """
+    Inserts the given number of synthetic rides of points points each (see ingestStrategies.synthetic_ride),
+    their points with strategy in one transaction and then their trips in another. Both
+    transactions are timed together, rows counts the points and trips.
+    """
+    rng = worker_rng()
+    ride_start = datetime.now().replace(microsecond=0)
+    ride_points = [synthetic_ride(rng, next_ride_id(), rng.randint(1, 30), points, ride_start) for _ in range(rides)]
+    point_rows = [row for ride in ride_points for row in ride]
+    trip_rows = [trip_row(ride) for ride in ride_points]
+    try:
+        with connection_pool.connection() as connection:
+            start = time.time()
+            insert_rows(connection, strategy, "cycling_data", POINT_COLUMNS, point_rows)
+            insert_rows(connection, strategy, "cycling_trips", TRIP_COLUMNS, trip_rows)
+            end = time.time()
+        size = sum(row_size(row) for row in point_rows + trip_rows)
+        log_duration(query_type, points, start, end, end - start, rows=len(point_rows) + len(trip_rows), size=size,
+                     intended_start=current_intended_start())
+        print(f"{rides} rides of length {points} inserted successfully into cycling_data and cycling_trips")
     except (Exception, psycopg2.Error) as error:
         print("Error while connecting to PostgreSQL", error)
 
-    finally:
-        if (connection):
-            cursor.close()
-            connection.close()
-
-# List of queries to execute
-def run_threads(num_threads, query, query_type, limit):
-    threads = []
-    for i in range(num_threads):
-        thread = threading.Thread(target=execute_query, args=(query, query_type, limit))
-        thread.start()
-        threads.append(thread)
-
-    for thread in threads:
-        thread.join()
-        # clear the threads list
-        threads.clear()
-
-# Create and start a thread until the number of threads is reached
-# run mini benchmark
-
-#initial insert of data if not done on machine, 
-#clear_table('cycling_data')
-#clear_table('cycling_trips')
-#initial_insert()
-
-
-#Configure the benchmark
-#run_threads(#Number of parallel threads, default query to use, query type, limit)
-run_threads(2, default_query, "surrounding", 50)
-run_threads(2, default_query, "ride_traffic", 50)
-run_threads(2, default_query, "intersections", 50)
-run_threads(2, default_query, "insert_ride", 10)
-run_threads(1, default_query, "bulk_insert_rides", 10)
-run_threads(2, default_query, "bounding_box", 50)
-run_threads(2, default_query, "polygonal_area", 50)
-run_threads(2, default_query, "time_interval", 50)
-run_threads(2, default_query, "get_trip", 50)
-run_threads(2, default_query, "get_trip_length", 50)
-run_threads(2, default_query, "get_trip_duration", 50)
-run_threads(2, default_query, "get_trip_speed", 50)
-#run_threads(2, default_query, "interval_around_timestamp", 50)
-#run_threads(2, default_query, "spatiotemporal", 50)
+#insert a single ride into the database, point by point
+def insert_ride(limit):
+    insert_rides("insert_ride", 1, limit, ROW)
+
+#bulk insert limit rides of limit points each with COPY
+def bulk_insert_rides(limit):
+    insert_rides("bulk_insert_rides", limit, limit, COPY)
+
+# Query types that are not single queries, by name
+WRITE_QUERY_TYPES = {"insert_ride": insert_ride, "bulk_insert_rides": bulk_insert_rides}
+
+def execute_query(query_type="surrounding", limit=50):
+    """
+    Executes one query type: inserts run their own statements, all other query types run
+    through the engine adapter (see engineAdapter.run_query), which logs them to durations.csv.
+    """
+    if query_type in WRITE_QUERY_TYPES:
+        WRITE_QUERY_TYPES[query_type](limit)
+    else:
+        run_query(adapter, QUERY_TYPES, query_type, limit, record_writer)
+
+# Runs the query types in the mode of the command line, the inserts through execute_query (see benchmarkDriver.py)
+driver = BenchmarkDriver(QUERY_TYPES, execute=execute_query)
+
+# The mini benchmark: query types run one after another as (number of parallel threads, query type, limit)
+MINI_BENCHMARK = [
+    (2, "surrounding", 50),
+    (2, "ride_traffic", 50),
+    (2, "intersections", 50),
+    (2, "insert_ride", 10),
+    (1, "bulk_insert_rides", 10),
+    (2, "bounding_box", 50),
+    (2, "polygonal_area", 50),
+    (2, "time_interval", 50),
+    (2, "get_trip", 50),
+    (2, "get_trip_length", 50),
+    (2, "get_trip_duration", 50),
+    (2, "get_trip_speed", 50),
+    #(2, "interval_around_timestamp", 50),
+    #(2, "spatiotemporal", 50),
+]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs the mini benchmark against MobilityDB.")
+    parser.add_argument("hostname", help="IP of the MobilityDB (manager) instance")
+    parser.add_argument("portnum", help="PostgreSQL port, usually 5432")
+    parser.add_argument("deployment", nargs="?", default="multi", choices=["single", "multi"])
+    parser.add_argument("--engine", choices=sorted(ADAPTERS), default="mobilitydb",
+                        help="Engine adapter the queries run through, 'postgis' for a PostGIS-only database")
+    parser.add_argument("--connection-mode", choices=CONNECTION_MODES, default=POOLED,
+                        help="'pooled' keeps connections open, 'per_query' connects for every query")
+    parser.add_argument("--pool-size", type=int, default=4, help="Maximum number of pooled connections")
+    parser.add_argument("--no-reconnect", action="store_true",
+                        help="Fail instead of reconnecting when a pooled connection is lost")
+    add_load_arguments(parser, rate=10.0, max_workers=64)
+    parser.add_argument("--fetch-size", type=int, default=DEFAULT_FETCH_SIZE,
+                        help="Rows fetched per round trip from the server-side cursor results are streamed through")
+    add_parameter_arguments(parser)
+    options = parser.parse_args()
+
+    hostname = options.hostname
+    portnum = options.portnum
+    deployment = options.deployment
+    record_writer = RecordWriter("durations.csv", options.run_id or new_run_id())
+    driver.configure(parser, options)
+    driver.record_writer = record_writer
+    # every pooled closed-loop worker holds its connection for its whole run
+    if options.mode == "closed_loop" and options.connection_mode == POOLED:
+        workers = max(options.workers or num_threads for num_threads, _, _ in MINI_BENCHMARK)
+        if workers > options.pool_size:
+            options.pool_size = workers
+            print(f"Pool size raised to {options.pool_size}, every closed-loop worker holds a pooled connection")
+    adapter = ADAPTERS[options.engine](
+        dict(dbname="postgres", user="postgres", password="test", host=hostname, port=portnum),
+        pool_size=options.pool_size,
+        mode=options.connection_mode,
+        reconnect=not options.no_reconnect,
+        fetch_size=options.fetch_size
+    )
+    adapter.connect()
+    driver.adapter = adapter
+    connection_pool = adapter.connection_pool
+
+    #initial insert of data if not done on machine, 
+    #clear_table('cycling_data')
+    #clear_table('cycling_trips')
+    #initial_insert()
+
+    #Configure the benchmark in MINI_BENCHMARK
+    for num_threads, query_type, limit in MINI_BENCHMARK:
+        driver.run_workload(num_threads, query_type, [WorkloadQuery(query_type, limit, 1.0, num_threads)])
+
+    adapter.close()
+    driver.save_histograms("histograms.json")
+    print(f"Connections opened: {connection_pool.connections_opened} ({connection_pool.mode}), reconnects: {connection_pool.reconnects}")
@@ -1,4 +1,3 @@
-import psycopg2
 import threading
 import random
 import time
@@ -7,549 +6,702 @@ import csv
 import threading
 import sys
 import random
+import argparse
+import glob
+import asyncio
 from datetime import datetime, timedelta
 
-if len(sys.argv) != 4:
-    print("Usage: python3 script_name.py <hostname> <portnum> <deployment>")
-    sys.exit(1)
-
-# Configuration
-hostname = sys.argv[1]
-portnum = sys.argv[2]
-deployment = "multi" if len(sys.argv) < 4 else sys.argv[3]
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+from connectionPool import CONNECTION_MODES, POOLED
+from loadGenerator import CONSTANT
+from resultStream import DEFAULT_FETCH_SIZE, RESULT_TRANSFERS, STREAMED
+from queryTemplate import EXECUTION_MODES, LITERAL
+from queryRegistry import QueryRegistry
+from benchmarkDriver import BenchmarkDriver, add_load_arguments, add_parameter_arguments
+from ingestStrategies import STRATEGIES, COPY, read_rides
+from ingestStream import IngestStream, INGEST_QUERY_TYPE, DEFAULT_RIDE_POINTS
+from postgresAdapter import ADAPTERS
+from recordWriter import RecordWriter, new_run_id
+from latencyHistogram import load_runs, save_run, HistogramSet
+from workloadSpec import load_workload_spec
+from processDriver import run_in_processes, merge_part_files, part_file, split_evenly, first_index, wait_until
+
+# Configuration, set from the command line arguments at the bottom of this file
+hostname = None
+portnum = None
+deployment = "multi"
+options = None
+# Engine adapter (see postgresAdapter.py) all queries run through, with its connection pools
+adapter = None
+# asyncio backend: one event loop for the whole run
+event_loop = None
+# Every query is appended to this file through record_writer, driver processes (--processes) write to their own part file
+DURATIONS_FILE = "mobilitydb-simra-durations.csv"
+# Latency histograms per query type of every run, see latencyHistogram.py
+HISTOGRAMS_FILE = "mobilitydb-simra-histograms.json"
+record_writer = None
+# Prepared point files the temporal histogram is built from
+DATA_FILES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "merged*.csv")
+# Rides read from --ingest-files and replayed in turn by the ingest stream
+INGEST_TEMPLATE_RIDES = 1000
 default_query = "SELECT * FROM cycling_data"
 
-# Timeframe for spatiotemporal queries, this has to be changed depending on the dataset you use
-period_start = "2021-03-31 17:22:20"
-period_end = "2023-05-31 18:33:25"
-duration = timedelta(hours=2)
-
-# Utility functions: Generate random position in Berlin
-def generate_random_position_in_Berlin():
-    return (
-        random.uniform(13.088346, 13.761160),  # Longitude
-        random.uniform(52.338049, 52.675454)   # Latitude
-    )
-
-def generate_random_time_interval(period_start, period_end, duration):
+############################### query types ###############################
+# Every query type builds a query template with named parameters (%(name)s) and its freshly
+# drawn random parameters, see queryTemplate.py for how a template is run.
+#
+# - Spatial Queries:
+#   - "surrounding": Finds all points within a 5000m radius of a random point in Berlin.
+#   - "bounding_box": Finds all points within a dynamically generated bounding box near Berlin.
+#   - "polygonal_area": Finds all points inside a static polygon defined by random vertices in Berlin.
+#   - "nearest_neighbor": Finds the closest point to a random position in Berlin.
+#   - "clustering": Groups data points into spatial clusters using K-Means.
+#   - "line_proximity": Finds points within 500m of a randomly generated line in Berlin.
+#
+# - Trip Queries:
+#   - "ride_traffic": Checks intersections between trips to identify overlapping rides.
+#   - "trajectory_intersections": Identifies intersections and intersection geometries between trajectories.
+#   - "trip_length": Calculates the total length of each trip/trajectory.
+#   - "trip_duration": Computes the duration of each trip/trajectory.
+#   - "trajectory_speed": Calculates the average speed of each trajectory based on distance and time.
+#   - "trajectory_density": Analyzes the density of points along each trajectory.
+#
+# - Attribute-Based Queries:
+#   - "attribute_value_filter_points": Filters point data where `rider_id` falls within a random interval.
+#   - "attribute_value_filter_trips": Filters trips where `rider_id` falls within a random interval.
+#
+# - Spatiotemporal Queries:
+#   - "time_interval": Retrieves all data within a specific time range.
+#   - "spatiotemporal_surrounding": Combines spatial proximity and a time range filter.
+#   - "interval_around_timestamp": Retrieves all points within 1 hour before and after a random timestamp.
+#   - "count_points_in_time_range": Counts the number of points collected during a specific time interval.
+#   - "average_speed_in_time_range": Calculates the average speed of trips within a specific time range.
+#   - "event_duration_in_region": Measures the duration of events occurring in a defined spatial region.
+#   - "peak_activity_times": Identifies the most active time ranges in the dataset.
+#   - "recurring_time_queries": Checks if a rider visits the same location daily for a week.
+#
+# - Advanced Queries:
+#   - "historical_spatiotemporal": Retrieves past data for a specific location and time range.
+#   - "points_after_timestamp": Retrieves points with a timestamp greater than a random timestamp.
+#   - "trips_starting_after_timestamp": Retrieves trips starting after a random timestamp.
+
+QUERY_TYPES = QueryRegistry()
+# Draws the query parameters and runs the workloads, see benchmarkDriver.py. The period is the
+# timeframe of the spatiotemporal queries, this has to be changed depending on the dataset you use.
+# You can query for the time interval of your dataset with this:
+#
+#     SELECT MIN(startTimestamp(trip)) AS begin, MAX(endTimestamp(trip)) AS end
+#     FROM cycling_trips;
+driver = BenchmarkDriver(QUERY_TYPES, "2021-03-31 17:22:20", "2023-05-31 18:33:25", timedelta(hours=2))
+
+def trips_table():
+    """The trips table of the deployment, the multi-node setup joins against a reference table."""
+    return "cycling_trips_ref" if deployment == "multi" else "cycling_trips"
+
+########################### SPATIAL QUERIES ###########################
+
+@QUERY_TYPES.register("spatial_surrounding")
+def spatial_surrounding(limit):
+    poslong, poslat, radius = driver.selective_shape("surrounding") or (*driver.position(), 5000)
+    query_addition = """
+        WHERE ST_DWithin(
+            cycling_data.point_geom::geography,
+            ST_SetSRID(ST_MakePoint(%(poslong)s, %(poslat)s), 4326)::geography,
+            %(radius)s
+        );
     """
-    Generates a random start and end time within a specified period and duration.
-    You can query for the time interval of your dataset with this:
-
-        SELECT MIN(startTimestamp(trip)) AS begin, MAX(endTimestamp(trip)) AS end
-        FROM cycling_trips;
-
-    :param period_start: Start of the period as a string in 'YYYY-MM-DD HH:MM:SS' format.
-    :param period_end: End of the period as a string in 'YYYY-MM-DD HH:MM:SS' format.
-    :param duration: Duration of the interval as a timedelta object.
-    :return: Tuple containing start and end times as strings in 'YYYY-MM-DD HH:MM:SS' format.
+    return default_query + query_addition, dict(poslong=poslong, poslat=poslat, radius=radius)
+
+@QUERY_TYPES.register("spatial_bounding_box")
+def spatial_bounding_box(limit):
+    poslong, poslat, size = driver.selective_shape("bounding_box") or (*driver.position(), 0.1)
+    query_addition = f"""
+        WHERE ST_Intersects(
+            cycling_data.point_geom::geography,
+            ST_MakeEnvelope(%(xmin)s, %(ymin)s, %(xmax)s, %(ymax)s, 4326)::geography
+        ) LIMIT {limit};
     """
-
-    period_start_dt = datetime.strptime(period_start, "%Y-%m-%d %H:%M:%S")
-    period_end_dt = datetime.strptime(period_end, "%Y-%m-%d %H:%M:%S")
-    total_period_duration = period_end_dt - period_start_dt
-
-    if duration > total_period_duration:
-        raise ValueError("The specified duration exceeds the total period duration.")
-
-    #calculate start_time and end_time
-    latest_start_time = period_end_dt - duration
-    random_seconds = random.randint(0, int((latest_start_time - period_start_dt).total_seconds()))
-    random_start_time = period_start_dt + timedelta(seconds=random_seconds)
-
-    random_end_time = random_start_time + duration
-
-    # Formatting
-    start_time = random_start_time.strftime("%Y-%m-%d %H:%M:%S")
-    end_time = random_end_time.strftime("%Y-%m-%d %H:%M:%S")
-
-    return start_time, end_time
-
-def execute_and_log_query(connection, base_query, query_addition, query_type, limit):
-    """Helper function to execute a query and log its duration."""
-    cursor = connection.cursor()
-    full_query = base_query + query_addition
-    print(full_query)
-    start = time.time()
-    cursor.execute(full_query)
-    end = time.time()
-    duration = end - start
-    with open("mobilitydb-simra-durations.csv", "a") as file:
-        file.write(f"{query_type},{limit},{start},{end},{duration}\n")
-    records = cursor
-    print(records)
-
-
-############################### benchmark cases ###############################
-
-def execute_query(query="SELECT * FROM cycling_data", query_type="surrounding", limit=50):
+    return default_query + query_addition, dict(xmin=poslong - size, ymin=poslat - size, xmax=poslong + size, ymax=poslat + size)
+
+@QUERY_TYPES.register("spatial_polygonal_area")
+def spatial_polygonal_area(limit):
+    lat1, lon1 = driver.position()
+    lat2, lon2 = driver.position()
+    lat3, lon3 = driver.position()
+    query_addition = f"""
+        WHERE ST_Intersects(
+            cycling_data.point_geom::geography,
+            ST_GeomFromText(%(polygon)s, 4326)::geography
+        ) LIMIT {limit};
     """
-    Executes different spatial or spatiotemporal benchmark queries on a PostgreSQL database.
-
-    Parameters:
-    - query (str): Base SQL query to execute (default is "SELECT * FROM cycling_data").
-    - query_type (str): Type of query to execute. It determines the benchmark being run.
-    - limit (int): Maximum number of rows to return (used in specific cases).
-
-Benchmark:
-    - Spatial Queries:
-      - "surrounding": Finds all points within a 5000m radius of a random point in Berlin.
-      - "bounding_box": Finds all points within a dynamically generated bounding box near Berlin.
-      - "polygonal_area": Finds all points inside a static polygon defined by random vertices in Berlin.
-      - "nearest_neighbor": Finds the closest point to a random position in Berlin.
-      - "clustering": Groups data points into spatial clusters using K-Means.
-      - "line_proximity": Finds points within 500m of a randomly generated line in Berlin.
-
-    - Trip Queries:
-      - "ride_traffic": Checks intersections between trips to identify overlapping rides.
-      - "trajectory_intersections": Identifies intersections and intersection geometries between trajectories.
-      - "trip_length": Calculates the total length of each trip/trajectory.
-      - "trip_duration": Computes the duration of each trip/trajectory.
-      - "trajectory_speed": Calculates the average speed of each trajectory based on distance and time.
-      - "trajectory_density": Analyzes the density of points along each trajectory.
-
-    - Attribute-Based Queries:
-      - "attribute_value_filter_points": Filters point data where `rider_id` falls within a random interval.
-      - "attribute_value_filter_trips": Filters trips where `rider_id` falls within a random interval.
-
-    - Spatiotemporal Queries:
-      - "time_interval": Retrieves all data within a specific time range.
-      - "spatiotemporal_surrounding": Combines spatial proximity and a time range filter.
-      - "interval_around_timestamp": Retrieves all points within 1 hour before and after a random timestamp.
-      - "count_points_in_time_range": Counts the number of points collected during a specific time interval.
-      - "average_speed_in_time_range": Calculates the average speed of trips within a specific time range.
-      - "event_duration_in_region": Measures the duration of events occurring in a defined spatial region.
-      - "peak_activity_times": Identifies the most active time ranges in the dataset.
-      - "recurring_time_queries": Checks if a rider visits the same location daily for a week.
-
-    - Advanced Queries:
-      - "historical_spatiotemporal": Retrieves past data for a specific location and time range.
-      - "points_after_timestamp": Retrieves points with a timestamp greater than a random timestamp.
-      - "trips_starting_after_timestamp": Retrieves trips starting after a random timestamp.
-
-    Returns:
-    Writes execution duration and results to "mobilitydb-simra-durations.csv" for benchmarking purposes.
+    polygon = f"POLYGON(({lon1} {lat1}, {lon2} {lat2}, {lon3} {lat3}, {lon1} {lat1}))"
+    return default_query + query_addition, dict(polygon=polygon)
+
+@QUERY_TYPES.register("spatial_nearest_neighbor")
+def spatial_nearest_neighbor(limit):
+    poslong, poslat = driver.position()
+    query_addition = f"""
+        ORDER BY
+            point_geom <-> ST_SetSRID(ST_MakePoint(%(poslong)s, %(poslat)s), 4326)
+        LIMIT {limit};
     """
-
-
-
-    try:
-        connection = psycopg2.connect(
-            dbname="postgres",
-            user="postgres",
-            password="test",
-            host=hostname,
-            port=portnum
+    return default_query + query_addition, dict(poslong=poslong, poslat=poslat)
+
+@QUERY_TYPES.register("spatial_clustering")
+def spatial_clustering(limit):
+    num_clusters = 5  # Define the number of clusters
+    query_addition = f"""
+        SELECT
+            ST_ClusterKMeans(point_geom::geometry, {num_clusters}) OVER () AS cluster_id,
+            *
+        FROM
+            cycling_data
+        LIMIT {limit};
+    """
+    return query_addition, {}
+
+@QUERY_TYPES.register("spatial_line_proximity")
+def spatial_line_proximity(limit):
+    # Define a random line using two points in Berlin
+    poslong1, poslat1 = driver.position()
+    poslong2, poslat2 = driver.position()
+    distance_threshold = 500  # Define proximity distance in meters
+
+    query_addition = f"""
+            WHERE ST_DWithin(
+                cycling_data.point_geom::geography,
+                ST_MakeLine(
+                    ST_SetSRID(ST_MakePoint(%(poslong1)s, %(poslat1)s), 4326),
+                    ST_SetSRID(ST_MakePoint(%(poslong2)s, %(poslat2)s), 4326)
+                )::geography,
+                {distance_threshold}
+            );
+        """
+    return default_query + query_addition, dict(poslong1=poslong1, poslat1=poslat1, poslong2=poslong2, poslat2=poslat2)
+
+########################### TRIP/TRAJECTORY QUERIES ###########################
+
+@QUERY_TYPES.register("spatial_ride_traffic")
+def spatial_ride_traffic(limit):
+    query_table = trips_table()
+    ride_id = driver.integer(1, 596)
+    query_addition = f"""
+        SELECT a.ride_id AS trip_id_1, b.ride_id AS trip_id_2, a.trip && b.trip AS intersects
+        FROM {query_table} a
+        JOIN {query_table} b ON a.ride_id <> b.ride_id
+        WHERE a.ride_id = %(ride_id)s AND a.trip && b.trip
+        LIMIT {limit};
+    """
+    return query_addition, dict(ride_id=ride_id)
+
+@QUERY_TYPES.register("spatial_trajectory_intersections")
+def spatial_trajectory_intersections(limit):
+    query_table = trips_table()
+    # Calculates intersection of two trajectories
+    ride_id = driver.integer(0, 1000)
+    query_addition = f"""
+        SELECT
+            a.ride_id AS trip_id_1,
+            b.ride_id AS trip_id_2,
+            ST_Intersection(a.trip::geometry, b.trip::geometry) AS intersection_geom
+        FROM
+            {query_table} a
+        JOIN
+            {query_table} b ON a.ride_id <> b.ride_id
+        WHERE
+            a.ride_id = %(ride_id)s
+            AND ST_Intersects(a.trip::geometry, b.trip::geometry)
+        LIMIT {limit};
+    """
+    return query_addition, dict(ride_id=ride_id)
+
+@QUERY_TYPES.register("spatial_rip_length")
+def spatial_rip_length(limit):
+    query_table = trips_table()
+    # Calculates the total length of each trip
+    query_addition = f"""
+        SELECT
+            ride_id,
+            lenght(trip)/1000 AS length_kilometers
+        FROM
+            {query_table}
+        LIMIT {limit};
+    """
+    return query_addition, {}
+
+@QUERY_TYPES.register("temporal_trip_duration")
+def temporal_trip_duration(limit):
+    query_table = trips_table()
+    # Computes the duration of each trip
+    query_addition = f"""
+        SELECT
+            ride_id,
+            EXTRACT(EPOCH FROM (MAX(timestamp) - MIN(timestamp))) AS duration_seconds
+        FROM
+            {query_table}
+        GROUP BY
+            ride_id
+        LIMIT {limit};
+    """
+    return query_addition, {}
+
+@QUERY_TYPES.register("spatiotemporal_avg_trip_speed")
+def spatiotemporal_avg_trip_speed(limit):
+    query_table = trips_table()
+    # Determines the average speed of each trip
+    query_addition = f"""
+        SELECT
+            ride_id,
+            length(trip) / NULLIF(EXTRACT(EPOCH FROM duration(trip)), 0) AS avg_speed_mps
+        FROM
+            {query_table}
+        LIMIT {limit};
+    """
+    return query_addition, {}
+
+@QUERY_TYPES.register("attribute_value_filter_points")
+def attribute_value_filter_points(limit):
+    # Filter points with a rider_id within a random interval
+    lower_rider_id = driver.uniform(1, 1000)
+    upper_rider_id = lower_rider_id + driver.uniform(1, 42)
+
+    query_addition = f"""
+        SELECT 
+            ride_id,
+            rider_id,
+            latitude,
+            longitude,
+            timestamp
+        FROM 
+            cycling_data
+        WHERE 
+            rider_id BETWEEN %(lower_rider_id)s::double precision AND %(upper_rider_id)s::double precision
+        LIMIT {limit};
+    """
+    return query_addition, dict(lower_rider_id=lower_rider_id, upper_rider_id=upper_rider_id)
+
+@QUERY_TYPES.register("attribute_value_filter_trips")
+def attribute_value_filter_trips(limit):
+    # Filter trips with a rider_id within a random interval
+    lower_rider_id = driver.uniform(1, 1000)  # Generate random lower bound
+    upper_rider_id = lower_rider_id + driver.uniform(1, 42)  # Generate random upper bound
+
+    query_addition = f"""
+            SELECT 
+                ride_id,
+                rider_id,
+                trip
+            FROM 
+                cycling_trips
+            WHERE 
+                rider_id BETWEEN %(lower_rider_id)s::double precision AND %(upper_rider_id)s::double precision
+            LIMIT {limit};
+        """
+    return query_addition, dict(lower_rider_id=lower_rider_id, upper_rider_id=upper_rider_id)
+
+########################### SPATIOTEMPORAL QUERIES ###########################
+
+@QUERY_TYPES.register("temporal_time_interval")
+def temporal_time_interval(limit):
+    start_time, end_time = driver.time_window(expect=True)
+    query_addition = f"""
+        WHERE timestamp BETWEEN %(start_time)s::timestamp AND %(end_time)s::timestamp LIMIT {limit};
+    """
+    return default_query + query_addition, dict(start_time=start_time, end_time=end_time)
+
+@QUERY_TYPES.register("spatiotemporal_surrounding")
+def spatiotemporal_surrounding(limit):
+    start_time, end_time = driver.time_window()
+    poslong, poslat = driver.position()
+    query_addition = f"""
+        WHERE timestamp BETWEEN %(start_time)s::timestamp AND %(end_time)s::timestamp AND
+        ST_DWithin(
+            cycling_data.point_geom::geography,
+            ST_SetSRID(ST_MakePoint(%(poslong)s, %(poslat)s), 4326)::geography,
+            5000
+        ) LIMIT {limit};
+    """
+    return default_query + query_addition, dict(start_time=start_time, end_time=end_time, poslong=poslong, poslat=poslat)
+
+@QUERY_TYPES.register("temporal_interval_around_timestamp")
+def temporal_interval_around_timestamp(limit):
+    start_time, end_time = driver.time_window()
+    query_addition = f"""
+        WHERE timestamp BETWEEN
+            %(start_time)s::timestamp - INTERVAL '1 hour' AND
+            %(start_time)s::timestamp + INTERVAL '1 hour'
+        LIMIT {limit};
+    """
+    return default_query + query_addition, dict(start_time=start_time)
+
+@QUERY_TYPES.register("temporal_count_points_in_time_range")
+def temporal_count_points_in_time_range(limit):
+    # Counts the number of points collected during a specific time interval
+    start_time, end_time = driver.time_window()
+    query_addition = """
+        SELECT COUNT(*)
+        FROM cycling_data
+        WHERE timestamp BETWEEN %(start_time)s::timestamp AND %(end_time)s::timestamp;
+    """
+    return query_addition, dict(start_time=start_time, end_time=end_time)
+
+@QUERY_TYPES.register("spatiotemporal_average_speed_in_time_range")
+def spatiotemporal_average_speed_in_time_range(limit):
+    # Calculates the average speed of trips occurring within a specific time frame
+    start_time, end_time = driver.time_window()
+    query_addition = """
+            SELECT AVG(distance / NULLIF(time_diff, 0)) AS avg_speed_mps
+            FROM (
+                SELECT
+                    ride_id,
+                    ST_Length(ST_MakeLine(point_geom::geometry ORDER BY timestamp)::geography) AS distance,  
+                    EXTRACT(EPOCH FROM (MAX(timestamp) - MIN(timestamp))) AS time_diff  
+                FROM
+                    cycling_data
+                WHERE
+                    timestamp BETWEEN %(start_time)s::timestamp AND %(end_time)s::timestamp
+                GROUP BY
+                    ride_id
+            ) subquery;
+        """
+    return query_addition, dict(start_time=start_time, end_time=end_time)
+
+@QUERY_TYPES.register("spatiotemporal_event_duration_in_region")
+def spatiotemporal_event_duration_in_region(limit):
+    # Measures the duration of events (e.g., trips) occurring in a defined region
+    start_time, end_time = driver.time_window()
+    poslong, poslat = driver.position()
+    query_addition = """
+        SELECT ride_id, MAX(timestamp) - MIN(timestamp) AS duration
+        FROM cycling_data
+        WHERE timestamp BETWEEN %(start_time)s::timestamp AND %(end_time)s::timestamp
+        AND ST_DWithin(
+            point_geom::geography,
+            ST_SetSRID(ST_MakePoint(%(poslong)s, %(poslat)s), 4326)::geography,
+            1000
+        )
+        GROUP BY ride_id;
+    """
+    return query_addition, dict(start_time=start_time, end_time=end_time, poslong=poslong, poslat=poslat)
+
+@QUERY_TYPES.register("temporal_peak_activity_times")
+def temporal_peak_activity_times(limit):
+    # Most active time ranges in the dataset
+    query_addition = f"""
+        SELECT date_trunc('hour', timestamp) AS hour, COUNT(*)
+        FROM cycling_data
+        GROUP BY hour
+        ORDER BY COUNT(*) DESC
+        LIMIT {limit};
+    """
+    return query_addition, {}
+
+@QUERY_TYPES.register("spatiotemporal_recurring_time_queries")
+def spatiotemporal_recurring_time_queries(limit):
+    # Check if a rider_id has points within 50m of the start point daily for a week
+    rider_id = driver.integer(1, 1000)
+    start_time, _ = driver.time_window(timedelta(days=7))
+    query_addition = """
+        WITH start_point AS (
+            SELECT point_geom, timestamp
+            FROM cycling_data
+            WHERE rider_id = %(rider_id)s
+            ORDER BY timestamp
+            LIMIT 1
+        ),
+        proximity_checks AS (
+            SELECT
+                COUNT(DISTINCT date_trunc('day', cd.timestamp)) AS days_in_proximity
+            FROM
+                cycling_data cd,
+                start_point sp
+            WHERE
+                cd.rider_id = %(rider_id)s
+                AND ST_DWithin(cd.point_geom::geography, sp.point_geom::geography, 50)  
+                AND cd.timestamp BETWEEN %(start_time)s::timestamp AND %(start_time)s::timestamp + INTERVAL '7 days'
         )
-        query_table = "cycling_trips_ref" if deployment == "multi" else "cycling_trips"
-
-        match query_type:
-            ########################### SPATIAL QUERIES ###########################
-            case "spatial_surrounding":
-                poslong, poslat = generate_random_position_in_Berlin()
-                query_addition = f"""
-                    WHERE ST_DWithin(
-                        cycling_data.point_geom::geography,
-                        ST_SetSRID(ST_MakePoint({poslong}, {poslat}), 4326)::geography,
-                        5000
-                    );
-                """
-                execute_and_log_query(connection, query, query_addition, query_type, limit)
-
-            case "spatial_bounding_box":
-                poslong, poslat = generate_random_position_in_Berlin()
-                query_addition = f"""
-                    WHERE ST_Intersects(
-                        cycling_data.point_geom::geography,
-                        ST_MakeEnvelope({poslong - 0.1}, {poslat - 0.1}, {poslong + 0.1}, {poslat + 0.1}, 4326)::geography
-                    ) LIMIT {limit};
-                """
-                execute_and_log_query(connection, query, query_addition, query_type, limit)
-
-            case "spatial_polygonal_area":
-                lat1, lon1 = generate_random_position_in_Berlin()
-                lat2, lon2 = generate_random_position_in_Berlin()
-                lat3, lon3 = generate_random_position_in_Berlin()
-                query_addition = f"""
-                    WHERE ST_Intersects(
-                        cycling_data.point_geom::geography,
-                        ST_GeomFromText(
-                            'POLYGON(({lon1} {lat1}, {lon2} {lat2}, {lon3} {lat3}, {lon1} {lat1}))',
-                            4326
-                        )::geography
-                    ) LIMIT {limit};
-                """
-                execute_and_log_query(connection, query, query_addition, query_type, limit)
-
-            case "spatial_nearest_neighbor":
-                poslong, poslat = generate_random_position_in_Berlin()
-                query_addition = f"""
-                    ORDER BY
-                        point_geom <-> ST_SetSRID(ST_MakePoint({poslong}, {poslat}), 4326)
-                    LIMIT {limit};
-                """
-                execute_and_log_query(connection, query, query_addition, query_type, limit)
-
-            case "spatial_clustering":
-                num_clusters = 5  # Define the number of clusters
-                query_addition = f"""
-                    SELECT
-                        ST_ClusterKMeans(point_geom::geometry, {num_clusters}) OVER () AS cluster_id,
-                        *
-                    FROM
-                        cycling_data
-                    LIMIT {limit};
-                """
-                execute_and_log_query(connection, query_addition, "", query_type, limit)
-
-            case "spatial_line_proximity":
-                # Define a random line using two points in Berlin
-                poslong1, poslat1 = generate_random_position_in_Berlin()
-                poslong2, poslat2 = generate_random_position_in_Berlin()
-                distance_threshold = 500  # Define proximity distance in meters
-
-                query_addition = f"""
-                        WHERE ST_DWithin(
-                            cycling_data.point_geom::geography,
-                            ST_MakeLine(
-                                ST_SetSRID(ST_MakePoint({poslong1}, {poslat1}), 4326),
-                                ST_SetSRID(ST_MakePoint({poslong2}, {poslat2}), 4326)
-                            )::geography,
-                            {distance_threshold}
-                        );
-                    """
-                execute_and_log_query(connection, query, query_addition, query_type, limit)
-
-    ########################### TRIP/TRAJECTORY QUERIES ###########################
-
-            case "spatial_ride_traffic":
-                ride_id = random.randint(1, 596)
-                query_addition = f"""
-                    SELECT a.ride_id AS trip_id_1, b.ride_id AS trip_id_2, a.trip && b.trip AS intersects
-                    FROM {query_table} a
-                    JOIN {query_table} b ON a.ride_id <> b.ride_id
-                    WHERE a.ride_id = {ride_id} AND a.trip && b.trip
-                    LIMIT {limit};
-                """
-                execute_and_log_query(connection, "", query_addition, query_type, limit)
-
-            case "spatial_trajectory_intersections":
-                # Calculates intersection of two trajectories
-                ride_id = random.randint(0, 1000)
-                query_addition = f"""
-                    SELECT
-                        a.ride_id AS trip_id_1,
-                        b.ride_id AS trip_id_2,
-                        ST_Intersection(a.trip::geometry, b.trip::geometry) AS intersection_geom
-                    FROM
-                        {query_table} a
-                    JOIN
-                        {query_table} b ON a.ride_id <> b.ride_id
-                    WHERE
-                        a.ride_id = {ride_id}
-                        AND ST_Intersects(a.trip::geometry, b.trip::geometry)
-                    LIMIT {limit};
-                """
-                execute_and_log_query(connection, "", query_addition, query_type, limit)
-
-
-            case "spatial_rip_length":
-                # Calculates the total length of each trip
-                query_addition = f"""
-                    SELECT
-                        ride_id,
-                        lenght(trip)/1000 AS length_kilometers
-                    FROM
-                        {query_table}
-                    LIMIT {limit};
-                """
-                execute_and_log_query(connection, "", query_addition, query_type, limit)
-
-            case "temporal_trip_duration":
-                # Computes the duration of each trip
-                query_addition = f"""
-                    SELECT
-                        ride_id,
-                        EXTRACT(EPOCH FROM (MAX(timestamp) - MIN(timestamp))) AS duration_seconds
-                    FROM
-                        {query_table}
-                    GROUP BY
-                        ride_id
-                    LIMIT {limit};
-                """
-                execute_and_log_query(connection, "", query_addition, query_type, limit)
-
-            case "spatiotemporal_avg_trip_speed":
-                # Determines the average speed of each trip
-                query_addition = f"""
-                    SELECT
-                        ride_id,
-                        length(trip) / NULLIF(EXTRACT(EPOCH FROM duration(trip)), 0) AS avg_speed_mps
-                    FROM
-                        {query_table}
-                    LIMIT {limit};
-                """
-                execute_and_log_query(connection, "", query_addition, query_type, limit)
-
-            case "attribute_value_filter_points":
-                # Filter points with a rider_id within a random interval
-                lower_rider_id = random.uniform(1, 1000)
-                upper_rider_id = lower_rider_id + random.uniform(1, 42)
-
-                query_addition = f"""
-                    SELECT 
-                        ride_id,
-                        rider_id,
-                        latitude,
-                        longitude,
-                        timestamp
-                    FROM 
-                        cycling_data
-                    WHERE 
-                        rider_id BETWEEN {lower_rider_id} AND {upper_rider_id}
-                    LIMIT {limit};
-                """
-                execute_and_log_query(connection, "", query_addition, query_type, limit)
-
-            case "attribute_value_filter_trips":
-                # Filter trips with a rider_id within a random interval
-                lower_rider_id = random.uniform(1, 1000)  # Generate random lower bound
-                upper_rider_id = lower_rider_id + random.uniform(1, 42)  # Generate random upper bound
-
-                query_addition = f"""
-                        SELECT 
-                            ride_id,
-                            rider_id,
-                            trip
-                        FROM 
-                            cycling_trips
-                        WHERE 
-                            rider_id BETWEEN {lower_rider_id} AND {upper_rider_id}
-                        LIMIT {limit};
-                    """
-                execute_and_log_query(connection, "", query_addition, query_type, limit)
-
-
-
-    ########################### SPATIOTEMPORAL QUERIES ###########################
-            case "temporal_time_interval":
-                start_time, end_time = generate_random_time_interval(period_start, period_end, duration)
-                query_addition = f"""
-                    WHERE timestamp BETWEEN '{start_time}' AND '{end_time}' LIMIT {limit};
-                """
-                execute_and_log_query(connection, query, query_addition, query_type, limit)
-
-            case "spatiotemporal_surrounding":
-                start_time, end_time = generate_random_time_interval(period_start, period_end, duration)
-                poslong, poslat = generate_random_position_in_Berlin()
-                query_addition = f"""
-                    WHERE timestamp BETWEEN '{start_time}' AND '{end_time}' AND
-                    ST_DWithin(
-                        cycling_data.point_geom::geography,
-                        ST_SetSRID(ST_MakePoint({poslong}, {poslat}), 4326)::geography,
-                        5000
-                    ) LIMIT {limit};
-                """
-                execute_and_log_query(connection, query, query_addition, query_type, limit)
-
-            case "temporal_interval_around_timestamp":
-                start_time, end_time = generate_random_time_interval(period_start, period_end, duration)
-                query_addition = f"""
-                    WHERE timestamp BETWEEN
-                        TIMESTAMP '{start_time}' - INTERVAL '1 hour' AND
-                        TIMESTAMP '{start_time}' + INTERVAL '1 hour'
-                    LIMIT {limit};
-                """
-                execute_and_log_query(connection, query, query_addition, query_type, limit)
-
-            case "temporal_count_points_in_time_range":
-                # Counts the number of points collected during a specific time interval
-                start_time, end_time = generate_random_time_interval(period_start, period_end, duration)
-                query_addition = f"""
-                    SELECT COUNT(*)
-                    FROM cycling_data
-                    WHERE timestamp BETWEEN '{start_time}' AND '{end_time}';
-                """
-                execute_and_log_query(connection, "", query_addition, query_type, limit)
-
-            case "spatiotemporal_average_speed_in_time_range":
-                # Calculates the average speed of trips occurring within a specific time frame
-                start_time, end_time = generate_random_time_interval(period_start, period_end, duration)
-                query_addition = f"""
-                        SELECT AVG(distance / NULLIF(time_diff, 0)) AS avg_speed_mps
-                        FROM (
-                            SELECT
-                                ride_id,
-                                ST_Length(ST_MakeLine(point_geom::geometry ORDER BY timestamp)::geography) AS distance,  
-                                EXTRACT(EPOCH FROM (MAX(timestamp) - MIN(timestamp))) AS time_diff  
-                            FROM
-                                cycling_data
-                            WHERE
-                                timestamp BETWEEN '{start_time}' AND '{end_time}'
-                            GROUP BY
-                                ride_id
-                        ) subquery;
-                    """
-                execute_and_log_query(connection, "", query_addition, query_type, limit)
-
-            case "spatiotemporal_event_duration_in_region":
-                # Measures the duration of events (e.g., trips) occurring in a defined region
-                start_time, end_time = generate_random_time_interval(period_start, period_end, duration)
-                poslong, poslat = generate_random_position_in_Berlin()
-                query_addition = f"""
-                    SELECT ride_id, MAX(timestamp) - MIN(timestamp) AS duration
-                    FROM cycling_data
-                    WHERE timestamp BETWEEN '{start_time}' AND '{end_time}'
-                    AND ST_DWithin(
-                        point_geom::geography,
-                        ST_SetSRID(ST_MakePoint({poslong}, {poslat}), 4326)::geography,
-                        1000
-                    )
-                    GROUP BY ride_id;
-                """
-                execute_and_log_query(connection, "", query_addition, query_type, limit)
-
-            case "temporal_peak_activity_times":
-                # Most active time ranges in the dataset
-                query_addition = f"""
-                    SELECT date_trunc('hour', timestamp) AS hour, COUNT(*)
-                    FROM cycling_data
-                    GROUP BY hour
-                    ORDER BY COUNT(*) DESC
-                    LIMIT {limit};
-                """
-                execute_and_log_query(connection, "", query_addition, query_type, limit)
-
-            case "spatiotemporal_recurring_time_queries":
-                # Check if a rider_id has points within 50m of the start point daily for a week
-                rider_id = random.randint(1, 1000)
-                start_time, _ = generate_random_time_interval(period_start, period_end, duration=timedelta(days=7))
-                query_addition = f"""
-                    WITH start_point AS (
-                        SELECT point_geom, timestamp
-                        FROM cycling_data
-                        WHERE rider_id = {rider_id}
-                        ORDER BY timestamp
-                        LIMIT 1
-                    ),
-                    proximity_checks AS (
-                        SELECT
-                            COUNT(DISTINCT date_trunc('day', cd.timestamp)) AS days_in_proximity
-                        FROM
-                            cycling_data cd,
-                            start_point sp
-                        WHERE
-                            cd.rider_id = {rider_id}
-                            AND ST_DWithin(cd.point_geom::geography, sp.point_geom::geography, 50)  
-                            AND cd.timestamp BETWEEN '{start_time}' AND '{start_time}' + INTERVAL '7 days'
-                    )
-                    SELECT
-                        {rider_id} AS rider_id,
-                        '{start_time}' AS start_time,
-                        '{start_time}' + INTERVAL '7 days' AS end_time,
-                        CASE
-                            WHEN days_in_proximity = 7 THEN 'Recurring Proximity Found'
-                            ELSE 'Recurring Proximity Not Found'
-                        END AS result
-                    FROM proximity_checks;
-                """
-                execute_and_log_query(connection, "", query_addition, query_type, limit)
-
-
-            case "spatiotemporal_historical_spatiotemporal":
-                # Retrieve past data for a specific location and time range
-                start_time, end_time = generate_random_time_interval(period_start, period_end, duration)
-                poslong, poslat = generate_random_position_in_Berlin()
-                query_addition = f"""
-                    WHERE timestamp BETWEEN '{start_time}' AND '{end_time}'
-                    AND ST_DWithin(
-                        cycling_data.point_geom::geography,
-                        ST_SetSRID(ST_MakePoint({poslong}, {poslat}), 4326)::geography,
-                        5000
-                    )
-                    LIMIT {limit};
-                """
-                execute_and_log_query(connection, query, query_addition, query_type, limit)
+        SELECT
+            %(rider_id)s AS rider_id,
+            %(start_time)s::timestamp AS start_time,
+            %(start_time)s::timestamp + INTERVAL '7 days' AS end_time,
+            CASE
+                WHEN days_in_proximity = 7 THEN 'Recurring Proximity Found'
+                ELSE 'Recurring Proximity Not Found'
+            END AS result
+        FROM proximity_checks;
+    """
+    return query_addition, dict(rider_id=rider_id, start_time=start_time)
+
+@QUERY_TYPES.register("spatiotemporal_historical_spatiotemporal")
+def spatiotemporal_historical_spatiotemporal(limit):
+    # Retrieve past data for a specific location and time range
+    start_time, end_time = driver.time_window()
+    poslong, poslat = driver.position()
+    query_addition = f"""
+        WHERE timestamp BETWEEN %(start_time)s::timestamp AND %(end_time)s::timestamp
+        AND ST_DWithin(
+            cycling_data.point_geom::geography,
+            ST_SetSRID(ST_MakePoint(%(poslong)s, %(poslat)s), 4326)::geography,
+            5000
+        )
+        LIMIT {limit};
+    """
+    return default_query + query_addition, dict(start_time=start_time, end_time=end_time, poslong=poslong, poslat=poslat)
 
 ################################ Temporal queries ################################
 
-            case "temporal_points_after_timestamp":
-                # Retrieves all points with a timestamp greater than a random timestamp
-                random_timestamp, _ = generate_random_time_interval(period_start, period_end, duration)
-                query_addition = f"""
-                        WHERE timestamp > '{random_timestamp}'
-                        LIMIT {limit};
-                    """
-                execute_and_log_query(connection, query, query_addition, query_type, limit)
+@QUERY_TYPES.register("temporal_points_after_timestamp")
+def temporal_points_after_timestamp(limit):
+    # Retrieves all points with a timestamp greater than a random timestamp
+    random_timestamp, _ = driver.time_window()
+    query_addition = f"""
+            WHERE timestamp > %(random_timestamp)s::timestamp
+            LIMIT {limit};
+        """
+    return default_query + query_addition, dict(random_timestamp=random_timestamp)
+
+@QUERY_TYPES.register("temporal_trips_starting_after_timestamp")
+def temporal_trips_starting_after_timestamp(limit):
+    query_table = trips_table()
+    # Retrieves all trips that start after a random timestamp
+    random_timestamp, _ = driver.time_window()
+    query_addition = f"""
+        SELECT * 
+        FROM {query_table}
+        WHERE startTimestamp(trip) > %(random_timestamp)s::timestamp
+        LIMIT {limit};
+    """
+    return query_addition, dict(random_timestamp=random_timestamp)
 
 
-            case "temporal_trips_starting_after_timestamp":
-                # Retrieves all trips that start after a random timestamp
-                random_timestamp, _ = generate_random_time_interval(period_start, period_end, duration)
-                query_addition = query_addition = f"""
-                    SELECT * 
-                    FROM {query_table}
-                    WHERE startTimestamp(trip) > '{random_timestamp}'
-                    LIMIT {limit};
-                """
-                execute_and_log_query(connection, "", query_addition, query_type, limit)
 
 
 
 
+############################### benchmark execution ###############################
 
-    except (Exception, psycopg2.Error) as error:
-        print(f"Error executing query '{query_type}':", error)
+def run_workload(num_threads, label, queries):
+    """
+    Runs one query type or mix like BenchmarkDriver.run_workload, with --processes the
+    threads, workers or the rate are split across several driver processes (see run_shard).
+    """
+    options = driver.options
+    workers = options.workers or num_threads
+    if options.processes > 1:
+        records = run_in_processes(run_shard, options.processes, (options, num_threads, label, queries))
+        merge_part_files(DURATIONS_FILE, options.processes, start_column=2)
+        for shard_index in range(options.processes):
+            shard_histograms = part_file(HISTOGRAMS_FILE, shard_index)
+            if os.path.exists(shard_histograms):
+                record_writer.histograms.merge(load_runs(shard_histograms)[options.run_id])
+                os.remove(shard_histograms)
+    else:
+        records = driver.run_load(num_threads, label, queries)
+    driver.summarize(label, queries, records, workers)
+
+def run_shard(shard_index, processes, start_at, shard_options, num_threads, label, queries):
+    """
+    Runs this process's share of one query type or mix, called in each driver process by
+    processDriver.run_in_processes.
+
+    The shard opens its own connections, logs to its own part of the durations file and
+    takes an even share of the threads (batch), workers (closed_loop) or the rate
+    (open_loop). Closed-loop workers are numbered and seeded globally, so --seed gives the
+    same query parameters for any number of processes. Evenly spaced open-loop arrivals of
+    the shards are interleaved by offsetting their start.
+    """
+    global options, hostname, portnum, deployment, record_writer
+    options = shard_options
+    hostname = options.hostname
+    portnum = options.portnum
+    deployment = options.deployment
+    driver.configure_shard(options, shard_index, processes)
+    record_writer = RecordWriter(part_file(DURATIONS_FILE, shard_index), options.run_id)
+    driver.record_writer = record_writer
+
+    workers = options.workers or num_threads
+    first_worker = first_index(workers, processes, shard_index)
+    # closed-loop workers derive their seeds from their global id, open-loop arrivals differ per shard
+    seed = options.seed
+    if seed is not None and options.mode == "open_loop":
+        seed += shard_index
+    phase = shard_index / options.rate if options.mode == "open_loop" and options.arrival == CONSTANT else 0.0
+
+    open_connections()
+    try:
+        late = wait_until(start_at + phase)
+        if late > 1.0:
+            print(f"Warning: driver process {shard_index} started {late:.1f}s late")
+        return driver.run_load(
+            split_evenly(num_threads, processes, shard_index), label, queries,
+            split_evenly(workers, processes, shard_index), first_worker, options.rate / processes, seed
+        )
     finally:
-        if connection:
-            connection.close()
-
-
-
-############################### benchmark execution ###############################
-# List of queries to execute
-def run_threads(num_threads, query, query_type, limit):
-    threads = []
-    for i in range(num_threads):
-        thread = threading.Thread(target=execute_query, args=(query, query_type, limit))
-        thread.start()
-        threads.append(thread)
-
-    for thread in threads:
-        thread.join()
-        # clear the threads list
-        threads.clear()
+        close_connections()
+        driver.close()
+        record_writer.close()
+        save_run(part_file(HISTOGRAMS_FILE, shard_index), options.run_id, record_writer.histograms)
+
+def connect_kwargs():
+    return dict(dbname="postgres", user="postgres", password="test", host=hostname, port=portnum)
+
+def open_connections():
+    """Creates the engine adapter of --engine from options and connects it, for --backend asyncio on the event loop."""
+    global adapter, event_loop
+    adapter = ADAPTERS[options.engine](
+        connect_kwargs(),
+        pool_size=options.pool_size,
+        mode=options.connection_mode,
+        reconnect=not options.no_reconnect,
+        fetch_size=options.fetch_size,
+        execution=options.execution,
+        plan_cache_mode=options.plan_cache_mode,
+        result_transfer=options.result_transfer
+    )
+    adapter.connect()
+    if options.backend == "asyncio":
+        event_loop = asyncio.new_event_loop()
+        event_loop.run_until_complete(adapter.connect_async())
+    driver.adapter = adapter
+    driver.event_loop = event_loop
+
+def close_connections():
+    if options.backend == "asyncio":
+        event_loop.run_until_complete(adapter.close_async())
+        event_loop.close()
+    adapter.close()
+
+def start_ingest(rate, templates):
+    """
+    Starts inserting rides at rate rides per second in the background (--ingest-rates),
+    they are logged as ingest_ride. None for a rate of 0.
+    """
+    if not rate:
+        return None
+    stream = IngestStream(
+        connect_kwargs(), rate, record_writer,
+        writers=options.ingest_writers,
+        strategy=options.ingest_strategy,
+        templates=templates,
+        points=options.ingest_points,
+        # the trip queries of a multi-node deployment read cycling_trips_ref
+        trips_table=trips_table(),
+        seed=options.seed
+    )
+    stream.start()
+    return stream
+
+def print_ingest_report(results):
+    """Prints the read latency of every query type per ingest rate, and the write rate each run achieved."""
+    query_types = sorted({
+        query_type for _, _, histograms in results for query_type in histograms.histograms
+        if query_type != INGEST_QUERY_TYPE
+    })
+    print("Read latency p50 / p99 in ms by ingest rate (rides/s):")
+    print(f"{'query_type':<45}" + "".join(f"{format(rate, 'g'):>20}" for rate, _, _ in results))
+    for query_type in query_types:
+        cells = []
+        for _, _, histograms in results:
+            histogram = histograms.histograms.get(query_type)
+            if histogram is None or not histogram.total_count:
+                cells.append(f"{'-':>20}")
+            else:
+                cells.append(f"{histogram.percentile(50.0) * 1000:>9.1f} / {histogram.percentile(99.0) * 1000:<8.1f}")
+        print(f"{query_type:<45}" + "".join(cells))
+    print(f"{'achieved rides/s':<45}" + "".join(
+        f"{(stream.rides / max(stream.elapsed, 1e-9) if stream else 0.0):>20.2f}" for _, stream, _ in results
+    ))
 
 ###################################### Configure the benchmark ######################################
 
-# --------------------- SPATIAL QUERIES ---------------------
-run_threads(2, default_query, "spatial_surrounding", 50)
-run_threads(2, default_query, "spatial_bounding_box", 50)
-#run_threads(2, default_query, "spatial_clustering", 50)
-run_threads(2, default_query, "spatial_polygonal_area", 50)
-run_threads(2, default_query, "attribute_value_filter_points", 50)
-run_threads(2, default_query, "spatial_nearest_neighbor", 50)
-
-# --------------------- TRIP/TRAJECTORY QUERIES ---------------------
-run_threads(2, default_query, "spatial_line_proximity", 50)
-run_threads(2, default_query, "spatial_ride_traffic", 50)
-run_threads(2, default_query, "spatial_trajectory_intersections", 50)
-run_threads(2, default_query, "spatial_rip_length", 50)
-run_threads(2, default_query, "temporal_trip_duration", 50)
-run_threads(2, default_query, "spatiotemporal_avg_trip_speed", 50)
-run_threads(2, default_query, "attribute_value_filter_trips", 50)
-
-# --------------------- SPATIOTEMPORAL QUERIES ---------------------
-run_threads(2, default_query, "temporal_time_interval", 50)
-run_threads(2, default_query, "spatiotemporal_surrounding", 50)
-run_threads(2, default_query, "temporal_interval_around_timestamp", 50)
-run_threads(2, default_query, "temporal_count_points_in_time_range", 50)
-run_threads(2, default_query, "spatiotemporal_average_speed_in_time_range", 50)
-run_threads(2, default_query, "spatiotemporal_event_duration_in_region", 50)
-run_threads(2, default_query, "temporal_peak_activity_times", 50)
-run_threads(2, default_query, "spatiotemporal_recurring_time_queries", 50)
-run_threads(2, default_query, "spatiotemporal_historical_spatiotemporal", 50)
-
-# --------------------- TEMPORAL QUERIES ---------------------
-run_threads(2, default_query, "temporal_points_after_timestamp", 50)
-run_threads(2, default_query, "temporal_trips_starting_after_timestamp", 50)
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs the SimRa benchmark queries against MobilityDB.")
+    parser.add_argument("hostname", help="IP of the MobilityDB (manager) instance")
+    parser.add_argument("portnum", help="PostgreSQL port, usually 5432")
+    parser.add_argument("deployment", nargs="?", default="multi", choices=["single", "multi"])
+    parser.add_argument("--engine", choices=sorted(ADAPTERS), default="mobilitydb",
+                        help="Engine adapter the queries run through, 'postgis' for a PostGIS-only database")
+    parser.add_argument("--workload", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "simra_workload.yaml"),
+                        help="Workload spec with the query types, their mix and settings (see benchmark/common/workloadSpec.py)")
+    parser.add_argument("--connection-mode", choices=CONNECTION_MODES, default=POOLED,
+                        help="'pooled' keeps connections open, 'per_query' connects for every query")
+    parser.add_argument("--pool-size", type=int, default=4, help="Maximum number of pooled connections")
+    parser.add_argument("--no-reconnect", action="store_true",
+                        help="Fail instead of reconnecting when a pooled connection is lost")
+    add_load_arguments(parser, rate=10.0, max_workers=64,
+                       backend_help="Run clients as threads (psycopg2) or as coroutines on one event loop (asyncpg)")
+    parser.add_argument("--fetch-size", type=int, default=DEFAULT_FETCH_SIZE,
+                        help="Rows fetched per round trip from the server-side cursor results are streamed through")
+    parser.add_argument("--execution", choices=EXECUTION_MODES, default=LITERAL,
+                        help="'literal' inlines the parameters into every query, 'prepared' runs each query type as a "
+                             "server-side prepared statement")
+    parser.add_argument("--result-transfer", choices=RESULT_TRANSFERS, default=STREAMED,
+                        help="'streamed' fetches literal results from a server-side cursor, 'buffered' transfers them in "
+                             "one piece like prepared statements, to compare --execution literal and prepared")
+    parser.add_argument("--plan-cache-mode", choices=["auto", "force_custom_plan", "force_generic_plan"], default=None,
+                        help="PostgreSQL plan_cache_mode of the benchmark connections (default: server setting)")
+    add_parameter_arguments(parser, "spatial_surrounding and spatial_bounding_box", DATA_FILES)
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Number of driver processes the threads, workers or rate are split across, "
+                             "each with its own connections (--pool-size is per process)")
+    parser.add_argument("--ingest-rates", nargs="+", type=float, default=None,
+                        help="Run the workload once per rate while rides are inserted at that many rides per second, "
+                             "0 for a run without writes, e.g. 0 1 5 20")
+    parser.add_argument("--ingest-strategy", choices=STRATEGIES, default=COPY,
+                        help="How the points and trip of an ingested ride are inserted (--ingest-rates)")
+    parser.add_argument("--ingest-writers", type=int, default=4,
+                        help="Maximum number of rides inserted at the same time, each with its own connection (--ingest-rates)")
+    parser.add_argument("--ingest-files", default=None,
+                        help="Replay rides of the prepared point files instead of synthetic ones, e.g. '../../data/merged*.csv' "
+                             "(--ingest-rates)")
+    parser.add_argument("--ingest-points", type=int, default=DEFAULT_RIDE_POINTS, help="Points of a synthetic ride (--ingest-rates)")
+    parser.add_argument("--keep-ingested", action="store_true",
+                        help="Keep the ingested rides instead of deleting them after every rate (--ingest-rates)")
+    options = parser.parse_args()
+    workload_spec = load_workload_spec(options.workload)
+    driver.configure(parser, options, workload_spec)
+    if options.connection_mode == POOLED and driver.closed_loop_workers(workload_spec, options.processes) > options.pool_size:
+        options.pool_size = driver.closed_loop_workers(workload_spec, options.processes)
+        print(f"Pool size raised to {options.pool_size}, every closed-loop worker holds a pooled connection")
+    base_options = options
+
+    hostname = options.hostname
+    portnum = options.portnum
+    deployment = options.deployment
+    base_run_id = options.run_id or new_run_id()
+    ingest_templates = None
+    if options.ingest_files:
+        ingest_templates = list(read_rides(sorted(glob.glob(options.ingest_files)), INGEST_TEMPLATE_RIDES))
+        if not ingest_templates:
+            parser.error(f"No rides in {options.ingest_files}.")
+    open_connections()
+
+    # Without --ingest-rates the spec runs once, otherwise once per ingest rate with a run id of its own
+    ingest_results = []
+    for ingest_rate in base_options.ingest_rates or [None]:
+        options = base_options
+        options.run_id = base_run_id if ingest_rate is None else f"{base_run_id}-ingest{ingest_rate:g}"
+        record_writer = RecordWriter(DURATIONS_FILE, options.run_id)
+        driver.record_writer = record_writer
+        driver.corrected_histograms = HistogramSet()
+        stream = start_ingest(ingest_rate, ingest_templates)
+        try:
+            driver.run_workloads(workload_spec, base_options, run_workload)
+        finally:
+            if stream is not None:
+                stream.stop(remove=not base_options.keep_ingested)
+                print(f"Ingest at {ingest_rate:g} rides/s: {stream.summary()}")
+
+        driver.save_histograms(HISTOGRAMS_FILE)
+        print(f"Run {options.run_id} finished, measurements were appended to {DURATIONS_FILE}, histograms saved to {HISTOGRAMS_FILE}")
+        if ingest_rate is not None:
+            ingest_results.append((ingest_rate, stream, record_writer.histograms))
+
+    close_connections()
+    misses = driver.close()
+    if misses is not None:
+        print(f"Parameter blocks generated on the request path: {misses}")
+    if ingest_results:
+        print_ingest_report(ingest_results)
+    connection_pool = adapter.connection_pool
+    print(f"Connections opened: {connection_pool.connections_opened} ({connection_pool.mode}), reconnects: {connection_pool.reconnects}")